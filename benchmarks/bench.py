@@ -0,0 +1,306 @@
+"""
+Benchmark suite for `Simulator.run`.
+
+Runs reproducible application graphs (see benchmarks/graphs.py) on meshes of
+different sizes and traffic densities and reports
+    - cycles simulated per second
+    - peak memory (tracemalloc, measured in a separate run)
+    - setup time (simulator creation, graph_to_task and mapping)
+
+Usage:
+    python -m benchmarks.bench --preset quick --save baseline.json
+    python -m benchmarks.bench --preset quick --compare baseline.json --threshold 0.1
+"""
+
+import gc
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import tracemalloc
+
+from dataclasses import dataclass, asdict, field
+
+from src.simulator      import Simulator, GraphMap
+from src.router         import SWITCHING_MODES
+from src.routing        import ROUTING_ALGORITHMS
+from src.arbitration    import SWITCH_ALLOCATORS
+from .graphs            import GRAPH_GENERATORS
+
+# Version of the baseline files, bumped when the same case no longer runs the same graph
+# 2: graphs drawn with src/graph_generator.py
+BASELINE_VERSION = 2
+
+
+@dataclass
+class BenchmarkCase:
+    mesh_size   : int
+    graph_type  : str
+    num_tasks   : int
+    density     : str
+    seed        : int = 0
+    routing     : str = "xy"
+    switching   : str = "store_and_forward"
+    num_vcs     : int = 1
+    arbitration : str = "fixed_priority"
+
+    @property
+    def name(self) -> str:
+        name = f"{self.mesh_size}x{self.mesh_size}/{self.graph_type}/{self.num_tasks}/{self.density}"
+        if self.routing != "xy":
+            name += f"/{self.routing}"
+        if self.switching != "store_and_forward":
+            name += f"/{self.switching}"
+        if self.num_vcs != 1:
+            name += f"/{self.num_vcs}vc"
+        if self.arbitration != "fixed_priority":
+            name += f"/{self.arbitration}"
+        return name
+
+
+@dataclass
+class BenchmarkResult:
+    name                : str
+    case                : BenchmarkCase
+    simulated_cycles    : int
+    run_time_s          : float
+    cycles_per_second   : float
+    setup_time_s        : float
+    peak_memory_bytes   : int = None
+    regressions         : list[str] = field(default_factory=list)
+
+
+PRESETS = {
+    "quick" : dict( mesh_sizes  = ( 3, 4, 8 ),
+                    graph_sizes = ( 8, ),
+                    densities   = ( "low", "high" ) ),
+
+    "full"  : dict( mesh_sizes  = ( 3, 4, 8, 16, 32 ),
+                    graph_sizes = ( 8, 32, 128 ),
+                    densities   = ( "low", "medium", "high" ) ),
+}
+
+# Metric name -> True if higher is better
+METRICS = { "cycles_per_second" : True,
+            "setup_time_s"      : False,
+            "peak_memory_bytes" : False }
+
+
+def get_cases(mesh_sizes: tuple, graph_sizes: tuple, densities: tuple, seed: int = 0,
+              routing: str = "xy", switching: str = "store_and_forward", num_vcs: int = 1,
+              arbitration: str = "fixed_priority") -> list[BenchmarkCase]:
+    """
+    Cross product of the arguments.
+    Skips the cases with more tasks than PEs (one-to-one mapping).
+    """
+    cases = []
+    for mesh_size in mesh_sizes:
+        for graph_type in GRAPH_GENERATORS:
+            for num_tasks in graph_sizes:
+                if num_tasks > mesh_size * mesh_size:
+                    continue
+                for density in densities:
+                    cases.append( BenchmarkCase( mesh_size, graph_type, num_tasks, density, seed, routing, switching, num_vcs,
+                                                 arbitration ) )
+    return cases
+
+
+def setup_simulator(case: BenchmarkCase) -> Simulator:
+    """
+    Creates the simulator and maps the graph one-to-one on random PEs.
+    The mapping is seeded so each case is reproducible.
+    """
+    rng         = random.Random(case.seed)
+    graph       = GRAPH_GENERATORS[case.graph_type]( case.num_tasks, case.density, case.seed )
+
+    sim         = Simulator( num_rows   = case.mesh_size,
+                             num_cols   = case.mesh_size,
+                             max_cycles = sys.maxsize,
+                             routing    = case.routing,
+                             switching  = case.switching,
+                             num_vcs    = case.num_vcs,
+                             arbitration = case.arbitration )
+
+    task_list   = sim.graph_to_task( graph )
+    pe_list     = rng.sample( [ (x, y) for x in range(case.mesh_size) for y in range(case.mesh_size) ],
+                              len(task_list) )
+
+    mapping     = [ GraphMap( task_id=task.task_id, assigned_pe=pe ) for task, pe in zip(task_list, pe_list) ]
+    sim.map( sim.set_assigned_mapping_list( task_list, mapping ) )
+
+    return sim
+
+
+def run_case(case: BenchmarkCase, repeat: int = 1, measure_memory: bool = True) -> BenchmarkResult:
+    """
+    Best of `repeat` runs for the timings.
+    Memory is measured in an extra run since tracemalloc slows down the simulation.
+    """
+    best_setup_time = float("inf")
+    best_run_time   = float("inf")
+
+    for _ in range(repeat):
+        gc.collect()
+
+        start_time          = time.perf_counter()
+        sim                 = setup_simulator(case)
+        setup_time          = time.perf_counter() - start_time
+
+        start_time          = time.perf_counter()
+        simulated_cycles    = sim.run()
+        run_time            = time.perf_counter() - start_time
+
+        best_setup_time     = min(best_setup_time, setup_time)
+        best_run_time       = min(best_run_time, run_time)
+
+    peak_memory = None
+    if measure_memory:
+        gc.collect()
+        tracemalloc.start()
+        sim = setup_simulator(case)
+        sim.run()
+        _, peak_memory = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return BenchmarkResult( name                = case.name,
+                            case                = case,
+                            simulated_cycles    = simulated_cycles,
+                            run_time_s          = best_run_time,
+                            cycles_per_second   = simulated_cycles / best_run_time,
+                            setup_time_s        = best_setup_time,
+                            peak_memory_bytes   = peak_memory )
+
+
+def run_benchmarks(cases: list[BenchmarkCase], repeat: int = 1, measure_memory: bool = True, show: bool = True) -> list[BenchmarkResult]:
+    results = []
+
+    if show:
+        print(f"{'Case':<32}{'Cycles':>10}{'Cycles/s':>12}{'Setup (ms)':>12}{'Peak (KiB)':>12}")
+
+    for case in cases:
+        result = run_case(case, repeat=repeat, measure_memory=measure_memory)
+        results.append(result)
+
+        if show:
+            peak_kib = f"{result.peak_memory_bytes / 1024:.0f}" if result.peak_memory_bytes is not None else "-"
+            print(f"{result.name:<32}{result.simulated_cycles:>10}{result.cycles_per_second:>12.1f}"
+                  f"{result.setup_time_s * 1e3:>12.2f}{peak_kib:>12}")
+
+    return results
+
+
+def save_baseline(results: list[BenchmarkResult], filename: str) -> None:
+    data = { "version"  : BASELINE_VERSION,
+             "python"   : platform.python_version(),
+             "machine"  : platform.machine(),
+             "results"  : [ asdict(result) for result in results ] }
+
+    with open(filename, "w") as file:
+        json.dump(data, file, indent=4)
+
+
+def load_baseline(filename: str) -> dict[str, dict]:
+    """
+    Returns the baseline results with the case name as the key.
+    Baselines of another version ran other graphs and are refused (ValueError), save a new one.
+    """
+    with open(filename, "r") as file:
+        data = json.load(file)
+
+    version = data.get("version", 1)
+    if version != BASELINE_VERSION:
+        raise ValueError(f"{filename} is a version {version} baseline, expected version {BASELINE_VERSION}: save a new baseline")
+
+    return { result["name"]: result for result in data["results"] }
+
+
+def compare_to_baseline(results: list[BenchmarkResult], baseline: dict[str, dict], threshold: float = 0.1) -> list[BenchmarkResult]:
+    """
+    Flags the results that are worse than the baseline by more than `threshold` (relative).
+    A change in the number of simulated cycles is also flagged since the timings are
+    then not comparable. Returns the results with regressions.
+    """
+    regressed_results = []
+
+    for result in results:
+        if result.name not in baseline:
+            continue
+
+        base = baseline[result.name]
+
+        if result.simulated_cycles != base["simulated_cycles"]:
+            result.regressions.append( f"simulated_cycles changed {base['simulated_cycles']} -> {result.simulated_cycles}" )
+
+        for metric, higher_is_better in METRICS.items():
+            value       = getattr(result, metric)
+            base_value  = base.get(metric)
+
+            if value is None or not base_value:
+                continue
+
+            change = (value - base_value) / base_value
+            if higher_is_better:
+                change = -change
+
+            if change > threshold:
+                result.regressions.append( f"{metric} {base_value:.4g} -> {value:.4g} ({100 * change:+.1f}% worse)" )
+
+        if result.regressions:
+            regressed_results.append(result)
+
+    return regressed_results
+
+
+def main(args: list[str] = None) -> int:
+    parser = argparse.ArgumentParser( description="Benchmark Simulator.run across mesh sizes, graph sizes and traffic densities" )
+    parser.add_argument( "--preset",     choices=PRESETS.keys(), default="quick" )
+    parser.add_argument( "--mesh-sizes", type=int, nargs="+", help="Overrides the mesh sizes of the preset" )
+    parser.add_argument( "--repeat",     type=int, default=3 )
+    parser.add_argument( "--seed",       type=int, default=0 )
+    parser.add_argument( "--routing",    choices=ROUTING_ALGORITHMS.keys(), default="xy" )
+    parser.add_argument( "--switching",  choices=SWITCHING_MODES, default="store_and_forward" )
+    parser.add_argument( "--num-vcs",    type=int, default=1, help="Virtual channels per port (wormhole or virtual cut-through)" )
+    parser.add_argument( "--arbitration", choices=SWITCH_ALLOCATORS.keys(), default="fixed_priority" )
+    parser.add_argument( "--no-memory",  action="store_true", help="Skip the peak memory measurement" )
+    parser.add_argument( "--save",       help="Save the results as a baseline JSON file" )
+    parser.add_argument( "--compare",    help="Baseline JSON file to compare against" )
+    parser.add_argument( "--threshold",  type=float, default=0.1, help="Relative regression threshold" )
+    args = parser.parse_args(args)
+
+    preset = dict( PRESETS[args.preset] )
+    if args.mesh_sizes:
+        preset["mesh_sizes"] = tuple(args.mesh_sizes)
+
+    cases   = get_cases( **preset, seed=args.seed, routing=args.routing, switching=args.switching, num_vcs=args.num_vcs,
+                         arbitration=args.arbitration )
+    results = run_benchmarks( cases, repeat=args.repeat, measure_memory=not args.no_memory )
+
+    if args.save:
+        save_baseline( results, args.save )
+        print(f"Baseline saved to {args.save}")
+
+    if args.compare:
+        try:
+            baseline = load_baseline(args.compare)
+        except ValueError as error:
+            print(f"ERROR {error}")
+            return 2
+
+        regressed_results = compare_to_baseline( results, baseline, args.threshold )
+
+        for result in regressed_results:
+            for regression in result.regressions:
+                print(f"REGRESSION {result.name}: {regression}")
+
+        if regressed_results:
+            return 1
+
+        print(f"No regressions beyond {100 * args.threshold:.0f}%")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
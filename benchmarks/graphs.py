@@ -0,0 +1,50 @@
+"""
+Reproducible application graphs for the benchmarks, drawn with src/graph_generator.py. 
+All graphs follow the rules of `Simulator.graph_to_task`: 
+    - every node has a `processing_time` 
+    - every edge has a `weight` (number of packets) 
+    - only the terminal nodes have a `generate` count
+The traffic density selects the range of the edge weights. Baselines saved before the graphs came from
+src/graph_generator.py ran other graphs, bench.py refuses them (BASELINE_VERSION).
+"""
+
+import networkx as nx
+
+from src import graph_generator
+
+
+DENSITY_WEIGHT_RANGE = graph_generator.DENSITY_WEIGHT_RANGES
+
+
+def chain_graph(num_tasks: int, density: str = "medium", seed: int = 0) -> nx.DiGraph:
+    """ 0 -> 1 -> ... -> num_tasks-1 """
+    return graph_generator.chain( num_tasks, seed=seed, weight_range=DENSITY_WEIGHT_RANGE[density] ).to_networkx()
+
+
+def fork_join_graph(num_tasks: int, density: str = "medium", seed: int = 0) -> nx.DiGraph:
+    r"""
+    Generalization of the graph in symmetry_test.py 
+    with num_tasks - 2 branches between the fork and the join node.
+
+       - 1 -
+      /     \
+     0 - 2 - n-1
+      \     /
+       - . -
+    """
+    return graph_generator.fork_join( num_tasks, seed=seed, weight_range=DENSITY_WEIGHT_RANGE[density] ).to_networkx()
+
+
+def random_dag(num_tasks: int, density: str = "medium", seed: int = 0, edge_probability: float = 0.2) -> nx.DiGraph:
+    """
+    Random DAG (similar to tests/test_graphs/*.json). 
+    Edges only go from a lower to a higher node id, every node except 0 
+    has atleast one predecessor so that the graph is connected. 
+    """
+    return graph_generator.random_dag( num_tasks, edge_probability=edge_probability, seed=seed,
+                                       weight_range=DENSITY_WEIGHT_RANGE[density] ).to_networkx()
+
+
+GRAPH_GENERATORS = { "chain"        : chain_graph, 
+                     "fork_join"    : fork_join_graph, 
+                     "random_dag"   : random_dag }
@@ -0,0 +1,34 @@
+import networkx as nx
+
+from dataclasses import dataclass, field
+
+
+@dataclass
+class Application:
+    """
+    One application (tenant) in a multi-application run. 
+    Node ids of the graph and the task ids in the mapping are local to the application, 
+    in the simulator they become (app_id, node_id). 
+    Source tasks of the application start after `start_offset` cycles.
+    """
+    app_id          : int
+    graph           : nx.DiGraph
+    mapping         : list          # list[GraphMap] with local task ids
+    start_offset    : int = 0
+
+
+@dataclass
+class ApplicationReport:
+    app_id              : int
+    start_offset        : int
+    start_cycle         : int               # first task start
+    end_cycle           : int               # last task end
+    makespan            : int               # end_cycle - start_offset
+    isolated_makespan   : int   = None      # makespan when the application runs alone on the mesh
+    slowdown            : float = None      # makespan / isolated_makespan
+    interference_cycles : int   = None      # makespan - isolated_makespan
+    task_ids            : list  = field(default_factory=list)
+
+
+def get_global_task_id(app_id: int, task_id: int) -> tuple:
+    return (app_id, task_id)
@@ -0,0 +1,83 @@
+FIXED_PRIORITY  = "fixed_priority"
+ROUND_ROBIN     = "round_robin"
+AGE             = "age"
+
+
+class SwitchAllocator:
+    """
+    Base class of the switch allocation policies.
+
+    Each cycle the router asks for the order in which its inputs are served,
+    the earlier inputs win the outputs they compete for.
+    `get_order` gets the number of inputs and `get_age`, which returns the age
+    of the packet at the front of an input (lower is older, see HeaderFlit.get_sequence).
+    `record_grant` is called for each input that moved a flit.
+
+    Allocators keep state between cycles, so every router gets its own instance.
+    """
+    name = "base"
+
+    def get_order(self, num_inputs: int, get_age) -> list[int]:
+        raise NotImplementedError
+
+    def record_grant(self, index: int) -> None:
+        pass
+
+    def clear(self) -> None:
+        pass
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}()"
+
+
+class FixedPriorityAllocator(SwitchAllocator):
+    """ Inputs in declaration order of the router buffers, local first """
+    name = FIXED_PRIORITY
+
+    def __init__(self):
+        self._orders = {}
+
+    def get_order(self, num_inputs: int, get_age) -> list[int]:
+        order = self._orders.get( num_inputs )
+        if order is None:
+            order = self._orders[num_inputs] = list( range(num_inputs) )
+        return order
+
+
+class RoundRobinAllocator(SwitchAllocator):
+    """ The input after the last one served gets the highest priority """
+    name = ROUND_ROBIN
+
+    def __init__(self):
+        self._pointer = 0
+
+    def get_order(self, num_inputs: int, get_age) -> list[int]:
+        start = self._pointer if self._pointer < num_inputs else 0
+        return list( range(start, num_inputs) ) + list( range(start) )
+
+    def record_grant(self, index: int) -> None:
+        self._pointer = index + 1
+
+    def clear(self) -> None:
+        self._pointer = 0
+
+
+class AgeAllocator(SwitchAllocator):
+    """ Oldest packet first, ties (and empty inputs) in declaration order """
+    name = AGE
+
+    def get_order(self, num_inputs: int, get_age) -> list[int]:
+        return sorted( range(num_inputs), key=get_age )
+
+
+SWITCH_ALLOCATORS = { allocator.name: allocator for allocator in ( FixedPriorityAllocator,
+                                                                   RoundRobinAllocator,
+                                                                   AgeAllocator ) }
+
+
+def get_switch_allocator(arbitration: str) -> SwitchAllocator:
+    """ Returns a new allocator, `arbitration` is one of SWITCH_ALLOCATORS """
+    if arbitration not in SWITCH_ALLOCATORS:
+        raise ValueError(f"Unknown arbitration {arbitration}. Available: {list(SWITCH_ALLOCATORS)}")
+
+    return SWITCH_ALLOCATORS[arbitration]()
@@ -5,6 +5,7 @@ from collections    import deque
 
 from .flit import HeaderFlit, PayloadFlit, TailFlit, EmptyFlit
 from .packet import Packet
+from .profiler import call_counter
 
 class Buffer:
     def __init__(self, size: int, name: str = "Buffer"):
@@ -112,6 +113,8 @@ class Buffer:
         To add to buffer that already has 2 uuid in the acceptable list,  
         top uid should be popped when the tail of that packet is not in the buffer anymore. 
         """
+        if call_counter.active:
+            call_counter._can_accept_new_packet += 1
         empty_count     = 0
         has_tail        = False
 
@@ -225,6 +228,8 @@ class Buffer:
         Returns True if the buffer is full  
         Full is defined as having all non - EmptyFlit.
         """
+        if call_counter.active:
+            call_counter.is_full += 1
         if len(self.queue) == 0:
             return False
 
@@ -236,6 +241,14 @@ class Buffer:
 
         return True
 
+    def get_occupancy(self) -> int:
+        """Returns the number of non - EmptyFlit in the buffer."""
+        occupancy = 0
+        for flit in self.queue:
+            if not isinstance(flit, EmptyFlit):
+                occupancy += 1
+        return occupancy
+
     def is_empty(self) -> bool:
         """
         Returns True if the buffer is all EmptyFlit.
@@ -261,6 +274,97 @@ class Buffer:
         queue_str = [str(item) for item in self.queue]
         return f"{self._name} {queue_str}"
 
+class FlitCounter:
+    """Running count of the flits in a group of FifoBuffers, lets the router skip idle stages."""
+    __slots__ = ( "count", )
+
+    def __init__(self):
+        self.count = 0
+
+
+class FifoBuffer(Buffer):
+    """
+    Buffer used by the wormhole and virtual cut-through switching.  
+    Plain FIFO of flits without EmptyFlit padding, so a flit can leave as soon as 
+    it reaches the front, without waiting for the rest of its packet. 
+    Packets are not interleaved, the router allocates the buffer to one packet 
+    at a time (see Router._switch_input_buffer_flits).
+
+    Flits that are delayed on their way to the buffer (link latency, router pipeline)
+    reserve their slot when they are sent, see `reserve` and `add_reserved_flit`.
+    """
+    def __init__(self, size: int, name: str = "Buffer", counter: FlitCounter = None):
+        self.size               = size
+        self.queue              = deque()
+        self._name              = name
+        self._counter           = counter if counter is not None else FlitCounter()
+        self._reserved          = 0
+
+    def clear(self) -> None:
+        self._counter.count -= len(self.queue)
+        self.queue.clear()
+        self._reserved = 0
+
+    def add_flit(self, flit: Union[HeaderFlit, PayloadFlit, TailFlit]) -> bool:
+        if len(self.queue) + self._reserved >= self.size:
+            raise Exception( "Cannot add flit to full buffer." )
+
+        self.queue.append( flit )
+        self._counter.count += 1
+        return True
+
+    def reserve(self) -> None:
+        """Reserves a slot for a flit that arrives later."""
+        if len(self.queue) + self._reserved >= self.size:
+            raise Exception( "Cannot reserve a slot in full buffer." )
+        self._reserved += 1
+
+    def add_reserved_flit(self, flit: Union[HeaderFlit, PayloadFlit, TailFlit]) -> None:
+        self._reserved -= 1
+        self.queue.append( flit )
+        self._counter.count += 1
+
+    def can_accept_flit(self, flit: Union[HeaderFlit, PayloadFlit, TailFlit]) -> bool:
+        return len(self.queue) + self._reserved < self.size
+
+    def _can_accept_new_packet(self) -> bool:
+        if call_counter.active:
+            call_counter._can_accept_new_packet += 1
+        return len(self.queue) + self._reserved < self.size
+
+    def get_free_slots(self) -> int:
+        return self.size - len(self.queue) - self._reserved
+
+    def peek(self) -> Union[HeaderFlit, PayloadFlit, TailFlit, None]:
+        if self.queue:
+            return self.queue[0]
+        return None
+
+    def remove(self) -> Union[HeaderFlit, PayloadFlit, TailFlit, None]:
+        if self.queue:
+            self._counter.count -= 1
+            return self.queue.popleft()
+        return None
+
+    def fill_emtpy_slots(self, n: int = 0) -> None:
+        pass
+
+    def manager(self) -> None:
+        pass
+
+    def is_full(self) -> bool:
+        if call_counter.active:
+            call_counter.is_full += 1
+        return len(self.queue) + self._reserved >= self.size
+
+    def is_empty(self) -> bool:
+        return len(self.queue) == 0 and self._reserved == 0
+
+    def get_occupancy(self) -> int:
+        """Flits in the buffer and on their way to it."""
+        return len(self.queue) + self._reserved
+
+
 if __name__ == "__main__":
 
     from .packet import Packet
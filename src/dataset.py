@@ -0,0 +1,209 @@
+"""
+Training data for the latency predictors: random application graphs and mappings, simulated in parallel workers.
+
+The dataset is a directory of shards, each one a JSON Lines file of `samples_per_shard` samples
+(graph, mapping, per-task start and end cycle, latency and the makespan), or with `format="columnar"`
+a shard of a ResultStore (src/result_store.py, memory mapped columns). A shard is written to a
+temporary file and renamed when complete, the finished shards are the checkpoint: an interrupted run
+started again with the same directory only generates the missing shards. Each shard has its own seed
+derived from the dataset seed, so a shard is the same whichever worker generates it and when.
+
+Usage:
+    python -m src.dataset --output data/ --num-shards 100 --samples-per-shard 1000 --workers 8 [--format columnar]
+"""
+
+import os
+import json
+import random
+import argparse
+import multiprocessing
+
+import numpy as np
+
+from dataclasses import dataclass, asdict, field
+
+from .                  import result_store
+from .simulator         import Simulator, GraphMap
+from .graph_generator   import GENERATORS, DENSITY_WEIGHT_RANGES
+
+CONFIG_FILE = "dataset.json"
+
+JSONL       = "jsonl"
+COLUMNAR    = "columnar"
+FORMATS     = ( JSONL, COLUMNAR )
+
+
+@dataclass
+class DatasetConfig:
+    num_shards          : int   = 1
+    samples_per_shard   : int   = 100
+    seed                : int   = 0
+    mesh_size           : int   = 4
+    min_tasks           : int   = 4
+    max_tasks           : int   = 12
+    graph_types         : list  = field(default_factory=lambda: [ "chain", "fork_join", "random_dag" ])
+    densities           : list  = field(default_factory=lambda: [ "low", "medium", "high" ])
+    switching           : str   = "store_and_forward"
+    max_cycles          : int   = 100000
+    format              : str   = JSONL
+
+
+def get_shard_seed(seed: int, shard_index: int) -> int:
+    """ Independent seed of a shard, only depends on the dataset seed and the shard index """
+    return int(np.random.SeedSequence(seed, spawn_key=(shard_index,)).generate_state(1)[0])
+
+
+def get_shard_path(output_dir: str, shard_index: int, format: str = JSONL) -> str:
+    if format == COLUMNAR:
+        return result_store.get_shard_path(output_dir, shard_index)
+    return os.path.join(output_dir, f"shard_{shard_index:05d}.jsonl")
+
+
+def generate_sample(sim: Simulator, config: DatasetConfig, rng: random.Random) -> dict:
+    """ Simulates a random graph on a random mapping (several tasks can share a PE) """
+    graph_type  = rng.choice(config.graph_types)
+    density     = rng.choice(config.densities)
+    num_tasks   = rng.randint(max(config.min_tasks, 3), config.max_tasks) # fork-join needs 3 tasks
+    graph_seed  = rng.getrandbits(32)
+    graph       = GENERATORS[graph_type](num_tasks, seed=graph_seed, weight_range=DENSITY_WEIGHT_RANGES[density]).to_networkx()
+
+    positions   = [ (x, y) for x in range(config.mesh_size) for y in range(config.mesh_size) ]
+    task_list   = sim.graph_to_task(graph)
+    mapping     = [ GraphMap(task_id=task.task_id, assigned_pe=rng.choice(positions)) for task in task_list ]
+
+    sim.map(sim.set_assigned_mapping_list(task_list, mapping))
+    makespan = sim.run()
+
+    # Mapping in task order, the state has the cycles of the tasks in the same order
+    start_cycles, end_cycles = sim.get_task_state().get_cycles()
+
+    sample = dict( graph_type   = graph_type,
+                   density      = density,
+                   graph_seed   = graph_seed,
+                   nodes        = [ [ node_id, data["processing_time"], data.get("generate", 0) ] for node_id, data in graph.nodes(data=True) ],
+                   edges        = [ [ src, dst, data["weight"] ] for src, dst, data in graph.edges(data=True) ],
+                   mapping      = [ [ graph_map.task_id, *graph_map.assigned_pe ] for graph_map in mapping ],
+                   start_cycles = start_cycles.tolist(),
+                   end_cycles   = end_cycles.tolist(),
+                   latencies    = ( end_cycles - start_cycles ).tolist(),
+                   makespan     = makespan )
+
+    sim.reset()
+    return sample
+
+
+def generate_shard(config: DatasetConfig, shard_index: int) -> list[dict]:
+    rng = random.Random(get_shard_seed(config.seed, shard_index))
+    sim = Simulator(num_rows=config.mesh_size, num_cols=config.mesh_size, max_cycles=config.max_cycles, switching=config.switching)
+
+    return [ generate_sample(sim, config, rng) for _ in range(config.samples_per_shard) ]
+
+
+def write_shard(output_dir: str, shard_index: int, samples: list[dict], format: str = JSONL) -> str:
+    """ Written to a temporary file first, the shard only exists once it is complete """
+    if format == COLUMNAR:
+        return result_store.write_shard(output_dir, shard_index, samples)
+
+    path        = get_shard_path(output_dir, shard_index)
+    temp_path   = f"{path}.{os.getpid()}.tmp"
+
+    with open(temp_path, "w") as file:
+        for sample in samples:
+            file.write(json.dumps(sample) + "\n")
+
+    os.replace(temp_path, path)
+    return path
+
+
+def load_shard(path: str) -> list[dict]:
+    with open(path, "r") as file:
+        return [ json.loads(line) for line in file ]
+
+
+def _generate_and_write_shard(args: tuple) -> int:
+    output_dir, config, shard_index = args
+    write_shard(output_dir, shard_index, generate_shard(config, shard_index), config.format)
+    return shard_index
+
+
+def _check_config(output_dir: str, config: DatasetConfig) -> None:
+    """ Saves the configuration with the dataset, a resumed run needs the same one """
+    if config.format not in FORMATS:
+        raise ValueError(f"Unknown dataset format {config.format}, expected one of {FORMATS}")
+
+    path = os.path.join(output_dir, CONFIG_FILE)
+
+    if os.path.exists(path):
+        with open(path, "r") as file:
+            saved_config = { **asdict(DatasetConfig()), **json.load(file) } # fields added since the dataset was made
+
+        if saved_config != asdict(config):
+            raise ValueError(f"{output_dir} has a dataset with another configuration: {saved_config}")
+        return
+
+    with open(path, "w") as file:
+        json.dump(asdict(config), file, indent=4)
+
+
+def generate_dataset(output_dir: str, config: DatasetConfig, num_workers: int = 1) -> list[int]:
+    """
+    Generates the shards of the dataset that are not in `output_dir` yet, in `num_workers` processes.
+    Returns the indices of the generated shards. The temporary files of interrupted workers are removed first,
+    the index of a columnar dataset is written at the end.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    _check_config(output_dir, config)
+
+    pending = [ shard_index for shard_index in range(config.num_shards)
+                if not os.path.exists(get_shard_path(output_dir, shard_index, config.format)) ]
+    tasks   = [ (output_dir, config, shard_index) for shard_index in pending ]
+
+    result_store.remove_temporary_shards(output_dir)
+
+    if num_workers == 1 or len(tasks) <= 1:
+        generated = [ _generate_and_write_shard(task) for task in tasks ]
+    else:
+        with multiprocessing.get_context("fork").Pool(num_workers) as pool:
+            generated = sorted(pool.imap_unordered(_generate_and_write_shard, tasks))
+
+    if config.format == COLUMNAR:
+        result_store.write_index(output_dir)
+    return generated
+
+
+def main(args: list[str] = None) -> int:
+    defaults = DatasetConfig()
+
+    parser = argparse.ArgumentParser( description="Generate simulated latencies of random graphs and mappings" )
+    parser.add_argument( "--output",            required=True, help="Directory of the shards, resumed if it exists" )
+    parser.add_argument( "--num-shards",        type=int, default=defaults.num_shards )
+    parser.add_argument( "--samples-per-shard", type=int, default=defaults.samples_per_shard )
+    parser.add_argument( "--workers",           type=int, default=os.cpu_count() )
+    parser.add_argument( "--seed",              type=int, default=defaults.seed )
+    parser.add_argument( "--mesh-size",         type=int, default=defaults.mesh_size )
+    parser.add_argument( "--min-tasks",         type=int, default=defaults.min_tasks )
+    parser.add_argument( "--max-tasks",         type=int, default=defaults.max_tasks )
+    parser.add_argument( "--graph-types",       nargs="+", default=defaults.graph_types )
+    parser.add_argument( "--densities",         nargs="+", default=defaults.densities )
+    parser.add_argument( "--switching",         default=defaults.switching )
+    parser.add_argument( "--format",            choices=FORMATS, default=defaults.format, help="JSON Lines or a columnar ResultStore" )
+    args = parser.parse_args(args)
+
+    config = DatasetConfig( num_shards          = args.num_shards,
+                            samples_per_shard   = args.samples_per_shard,
+                            seed                = args.seed,
+                            mesh_size           = args.mesh_size,
+                            min_tasks           = args.min_tasks,
+                            max_tasks           = args.max_tasks,
+                            graph_types         = args.graph_types,
+                            densities           = args.densities,
+                            switching           = args.switching,
+                            format              = args.format )
+
+    generated = generate_dataset(args.output, config, args.workers)
+    print(f"Generated {len(generated)} shards, {config.num_shards - len(generated)} already in {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
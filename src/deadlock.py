@@ -0,0 +1,142 @@
+import networkx as nx
+
+
+class DeadlockError(RuntimeError):
+    """
+    Raised when the buffers in the network are blocked on each other in a cycle.
+    `blocked_buffers` is the cycle as a list of buffer labels.
+    """
+    def __init__(self, cycle_count: int, blocked_buffers: list[str]):
+        self.cycle_count        = cycle_count
+        self.blocked_buffers    = blocked_buffers
+
+        cycle_str = " -> ".join(blocked_buffers + blocked_buffers[:1])
+        super().__init__(f"Deadlock at cycle {cycle_count}: {cycle_str}")
+
+    def __reduce__(self):
+        # Rebuilt from the arguments when sent between processes (see parallel.py)
+        return ( DeadlockError, ( self.cycle_count, self.blocked_buffers ) )
+
+
+class StallError(RuntimeError):
+    """
+    Raised when nothing has progressed for `stall_threshold` cycles but there is
+    no cycle in the wait-for graph. (e.g. a task waiting for packets that are never sent)
+    """
+    def __init__(self, cycle_count: int, stalled_cycles: int, blocked_edges: list[tuple[str, str]]):
+        self.cycle_count    = cycle_count
+        self.stalled_cycles = stalled_cycles
+        self.blocked_edges  = blocked_edges
+
+        blocked_str = ", ".join(f"{blocked} -> {waits_on}" for blocked, waits_on in blocked_edges) or "None"
+        super().__init__(f"No progress for {stalled_cycles} cycles at cycle {cycle_count}. "
+                         f"Blocked buffers: {blocked_str}")
+
+    def __reduce__(self):
+        return ( StallError, ( self.cycle_count, self.stalled_cycles, self.blocked_edges ) )
+
+
+class LivelockError(RuntimeError):
+    """
+    Raised when flits keep moving, but no task has progressed for `livelock_threshold` cycles.
+    """
+    def __init__(self, cycle_count: int, livelock_cycles: int):
+        self.cycle_count        = cycle_count
+        self.livelock_cycles    = livelock_cycles
+        super().__init__(f"Flits are moving but no task progressed for {livelock_cycles} cycles "
+                         f"at cycle {cycle_count}")
+
+    def __reduce__(self):
+        return ( LivelockError, ( self.cycle_count, self.livelock_cycles ) )
+
+
+def get_wait_for_graph(routers: dict, pes: dict) -> nx.DiGraph:
+    """
+    Nodes are buffer labels, an edge A -> B means the top flit of A is waiting for space in B.
+    """
+    graph = nx.DiGraph()
+
+    for router in routers.values():
+        graph.add_edges_from( router.get_wait_for_edges( routers, pes ) )
+
+    for pe in pes.values():
+        graph.add_edges_from( pe.get_wait_for_edges() )
+
+    return graph
+
+
+def find_blocked_cycle(graph: nx.DiGraph) -> list[str]:
+    """Returns the buffers in a cycle of the wait-for graph, empty list if there is none."""
+    try:
+        cycle = nx.find_cycle(graph)
+    except nx.NetworkXNoCycle:
+        return []
+
+    return [ blocked for blocked, _ in cycle ]
+
+
+def check_wait_for_graph(graph: nx.DiGraph, cycle_count: int, stalled_cycles: int, stall_threshold: int = None) -> None:
+    """Raises DeadlockError for a cycle in the wait-for graph, StallError once `stalled_cycles` reaches the threshold."""
+    blocked_cycle = find_blocked_cycle(graph)
+
+    if blocked_cycle:
+        raise DeadlockError(cycle_count, blocked_cycle)
+
+    if stall_threshold is not None and stalled_cycles >= stall_threshold:
+        raise StallError(cycle_count, stalled_cycles, list(graph.edges))
+
+
+class ProgressMonitor:
+    """
+    Tracks the number of cycles since the last flit movement or task state change.
+
+    - On a cycle without any progress, the wait-for graph of the buffers is checked.
+      A cycle in it is a genuine deadlock and raises DeadlockError right away.
+    - If there is no progress for `stall_threshold` cycles, StallError is raised.
+    - If flits move but no task progresses for `livelock_threshold` cycles, LivelockError is raised.
+
+    Either threshold can be None to disable the check.
+    """
+    def __init__(self, stall_threshold: int = 20, livelock_threshold: int = 10000):
+        self._stall_threshold       = stall_threshold
+        self._livelock_threshold    = livelock_threshold
+        self.reset()
+
+    def reset(self) -> None:
+        self._last_flit_move_count  = 0
+        self._last_task_event_count = 0
+        self._stalled_cycles        = 0
+        self._livelock_cycles       = 0
+
+    def get_stalled_cycles(self) -> int:
+        return self._stalled_cycles
+
+    def update(self, cycle_count: int, flit_move_count: int, task_event_count: int, routers: dict, pes: dict) -> None:
+        """
+        Counts are the running totals over the network, only the change since the last cycle matters.
+        """
+        flits_moved     = flit_move_count  != self._last_flit_move_count
+        task_progressed = task_event_count != self._last_task_event_count
+
+        self._last_flit_move_count  = flit_move_count
+        self._last_task_event_count = task_event_count
+
+        if task_progressed:
+            self._stalled_cycles    = 0
+            self._livelock_cycles   = 0
+            return
+
+        if flits_moved:
+            self._stalled_cycles    = 0
+            self._livelock_cycles  += 1
+
+            if self._livelock_threshold is not None and self._livelock_cycles >= self._livelock_threshold:
+                raise LivelockError(cycle_count, self._livelock_cycles)
+            return
+
+        self._stalled_cycles += 1
+        self._check_stall(cycle_count, routers, pes)
+
+    def _check_stall(self, cycle_count: int, routers: dict, pes: dict) -> None:
+        """Called on each cycle without progress, `routers` and `pes` are the ones the counts are taken from."""
+        check_wait_for_graph(get_wait_for_graph(routers, pes), cycle_count, self._stalled_cycles, self._stall_threshold)
@@ -33,9 +33,23 @@ class NextHop:
         )
 
 
+@dataclass(frozen=True)
+class Multicast:
+    """
+    Destination of a multicast packet, the tasks it is delivered to. 
+    The routers fork the packet where the routes to the tasks split (see Router._get_multicast_branches).
+    """
+    task_ids: tuple
+
+    def __str__(self):
+        return f"multicast{self.task_ids}"
+
+
 class HeaderFlit: 
-    def __init__( self, src_xy: tuple, dest_id: int, packet_uid: uuid.UUID, source_task_id: int ): 
+    def __init__( self, src_xy: tuple, dest_id: int, packet_uid: uuid.UUID, source_task_id: int, sequence: tuple = ( 0, ) ): 
         """
+        - "sequence" orders the packets by creation (a tuple, compared element by element), 
+          used as the age by the switch allocator.
         - When HeaderFlit is created, it is assigned a next_hop attribute.
         - The next_hop attribute include the x,y coordinates of the next hop. 
         - Since all the packets are created at a core attached to the router 
@@ -48,6 +62,7 @@ class HeaderFlit:
         self._dest_id           = dest_id
         self._packet_uid        = packet_uid
         self._source_task_id    = source_task_id
+        self._sequence          = sequence
         self._next_hop          = NextHop( 
                                     x=src_xy[0], 
                                     y=src_xy[1], 
@@ -56,6 +71,9 @@ class HeaderFlit:
     def update_routing_info( self, next_hop: NextHop ) -> None:
         self._next_hop = next_hop
 
+    def get_source_xy( self ) -> tuple:
+        return self._src_xy
+
     def get_destination( self ) -> tuple:
         """ returns destination (x, y) coordinates"""
         return self._dest_id
@@ -73,6 +91,9 @@ class HeaderFlit:
     def get_source_task_id( self ) -> int:  
         return self._source_task_id
 
+    def get_sequence( self ) -> tuple:
+        return self._sequence
+
     def __eq__(self, value):
         if isinstance(value, HeaderFlit):
             return self._packet_uid == value.get_uid()
@@ -94,6 +115,9 @@ class BaseFlit:
     def get_routing_info(self) -> NextHop:
         return self._header_flit.get_routing_info()
 
+    def get_sequence(self) -> tuple:
+        return self._header_flit.get_sequence()
+
     def __eq__(self, value):
         if type(value) == type(self):
             return self.get_uid() == value.get_uid()
@@ -0,0 +1,221 @@
+"""
+Random application graphs for the simulator: chains, fork-join, layered DAGs, series-parallel graphs
+and DAGs with the nodes in a random order. All the graphs follow the rules of `Simulator.graph_to_task`:
+    - every node has a `processing_time`
+    - every edge has a `weight` (number of packets)
+    - only the terminal nodes have a `generate` count
+The values are drawn from the (inclusive) ranges given to the generators. The structure is drawn with
+NumPy into arrays (GraphArrays), the networkx graph is built from them in bulk.
+"""
+
+import numpy as np
+import networkx as nx
+
+from dataclasses import dataclass
+
+
+PROCESSING_TIME_RANGE   = ( 2, 8 )
+WEIGHT_RANGE            = ( 2, 5 )
+GENERATE_RANGE          = ( 1, 3 )
+
+DENSITY_WEIGHT_RANGES   = { "low"       : ( 1, 2  ),
+                            "medium"    : ( 2, 5  ),
+                            "high"      : ( 5, 10 ) }   # weight_range of a traffic density
+
+
+@dataclass
+class GraphArrays:
+    """
+    A graph as arrays: node i takes processing_times[i] cycles and, if it is a terminal node, generates
+    generate[i] packets (0 for the other nodes). Edge j goes from sources[j] to targets[j] with weights[j] packets.
+    """
+    processing_times    : np.ndarray
+    sources             : np.ndarray
+    targets             : np.ndarray
+    weights             : np.ndarray
+    generate            : np.ndarray
+
+    def get_num_tasks(self) -> int:
+        return len(self.processing_times)
+
+    def to_networkx(self) -> nx.DiGraph:
+        graph = nx.DiGraph()
+
+        graph.add_nodes_from( ( node_id, { "processing_time": processing_time } if generate == 0 else
+                                         { "processing_time": processing_time, "generate": generate } )
+                              for node_id, ( processing_time, generate ) in
+                              enumerate( zip( self.processing_times.tolist(), self.generate.tolist() ) ) )
+
+        graph.add_weighted_edges_from( zip( self.sources.tolist(), self.targets.tolist(), self.weights.tolist() ) )
+        return graph
+
+
+def _check_ranges(**ranges: tuple) -> None:
+    """ Processing times, weights and generate counts of 0 make graphs that graph_to_task rejects """
+    for name, ( low, high ) in ranges.items():
+        if not 1 <= low <= high:
+            raise ValueError(f"{name} must be (low, high) with 1 <= low <= high, got {( low, high )}")
+
+
+def _get_graph_arrays(num_tasks: int, sources: np.ndarray, targets: np.ndarray, rng: np.random.Generator,
+                      processing_time_range: tuple, weight_range: tuple, generate_range: tuple) -> GraphArrays:
+    """ Draws the attributes of the structure (sources, targets) """
+    _check_ranges( processing_time_range=processing_time_range, weight_range=weight_range, generate_range=generate_range )
+
+    is_terminal = np.bincount(sources, minlength=num_tasks) == 0
+    generate    = np.where(is_terminal, rng.integers(generate_range[0], generate_range[1] + 1, num_tasks), 0)
+
+    return GraphArrays( processing_times    = rng.integers(processing_time_range[0], processing_time_range[1] + 1, num_tasks),
+                        sources             = sources,
+                        targets             = targets,
+                        weights             = rng.integers(weight_range[0], weight_range[1] + 1, len(sources)),
+                        generate            = generate )
+
+
+def _add_missing_predecessors(sources: np.ndarray, targets: np.ndarray, positions: np.ndarray,
+                              rng: np.random.Generator) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Every node but the first (in topological order, `positions` of the nodes in that order)
+    gets a predecessor among the earlier nodes, the graph is connected.
+    """
+    num_tasks       = len(positions)
+    has_predecessor = np.bincount(targets, minlength=num_tasks) > 0
+    missing         = positions[1:][ ~has_predecessor[positions[1:]] ]
+
+    order_of        = np.empty(num_tasks, dtype=np.int64)
+    order_of[positions] = np.arange(num_tasks)
+
+    earlier         = ( rng.random(len(missing)) * order_of[missing] ).astype(np.int64)
+    return np.concatenate([ sources, positions[earlier] ]), np.concatenate([ targets, missing ])
+
+
+def chain(num_tasks: int, seed: int = 0, processing_time_range: tuple = PROCESSING_TIME_RANGE,
+          weight_range: tuple = WEIGHT_RANGE, generate_range: tuple = GENERATE_RANGE) -> GraphArrays:
+    """ 0 -> 1 -> ... -> num_tasks-1 """
+    rng = np.random.default_rng(seed)
+    return _get_graph_arrays( num_tasks, np.arange(num_tasks - 1), np.arange(1, num_tasks), rng,
+                              processing_time_range, weight_range, generate_range )
+
+
+def fork_join(num_tasks: int, seed: int = 0, processing_time_range: tuple = PROCESSING_TIME_RANGE,
+              weight_range: tuple = WEIGHT_RANGE, generate_range: tuple = GENERATE_RANGE) -> GraphArrays:
+    """ Node 0 forks to num_tasks - 2 branches, joined by node num_tasks - 1 """
+    if num_tasks < 3:
+        raise ValueError(f"Fork-join graph needs atleast 3 tasks, got {num_tasks}")
+
+    rng         = np.random.default_rng(seed)
+    branches    = np.arange(1, num_tasks - 1)
+    sources     = np.concatenate([ np.zeros(len(branches), dtype=np.int64), branches ])
+    targets     = np.concatenate([ branches, np.full(len(branches), num_tasks - 1) ])
+
+    return _get_graph_arrays( num_tasks, sources, targets, rng, processing_time_range, weight_range, generate_range )
+
+
+def layered_dag(num_tasks: int, num_layers: int = None, edge_probability: float = 0.3, seed: int = 0,
+                processing_time_range: tuple = PROCESSING_TIME_RANGE, weight_range: tuple = WEIGHT_RANGE,
+                generate_range: tuple = GENERATE_RANGE) -> GraphArrays:
+    """
+    Nodes split in `num_layers` layers (about sqrt(num_tasks) by default, atleast a node each), edges between
+    consecutive layers with `edge_probability`. Every node after the first layer has a predecessor in the layer before
+    and every node before the last layer a successor in the layer after, the sinks are the last layer.
+    """
+    num_layers = num_layers or max(1, round(np.sqrt(num_tasks)))
+    if not 1 <= num_layers <= num_tasks:
+        raise ValueError(f"Cannot split {num_tasks} tasks in {num_layers} layers")
+
+    rng         = np.random.default_rng(seed)
+    cuts        = np.sort(rng.choice(np.arange(1, num_tasks), num_layers - 1, replace=False))
+    bounds      = np.concatenate([ [ 0 ], cuts, [ num_tasks ] ])
+
+    sources, targets = [], []
+    for layer in range(num_layers - 1):
+        upper   = np.arange(bounds[layer], bounds[layer + 1])
+        lower   = np.arange(bounds[layer + 1], bounds[layer + 2])
+
+        is_edge = rng.random((len(upper), len(lower))) < edge_probability
+        is_edge[ rng.integers(0, len(upper), len(lower)), np.arange(len(lower)) ] = True
+        is_edge[ np.arange(len(upper)), rng.integers(0, len(lower), len(upper)) ] = True
+
+        upper_index, lower_index = np.nonzero(is_edge)
+        sources.append(upper[upper_index])
+        targets.append(lower[lower_index])
+
+    sources = np.concatenate(sources) if sources else np.zeros(0, dtype=np.int64)
+    targets = np.concatenate(targets) if targets else np.zeros(0, dtype=np.int64)
+
+    return _get_graph_arrays( num_tasks, sources, targets, rng, processing_time_range, weight_range, generate_range )
+
+
+def series_parallel(num_tasks: int, parallel_probability: float = 0.5, seed: int = 0,
+                    processing_time_range: tuple = PROCESSING_TIME_RANGE, weight_range: tuple = WEIGHT_RANGE,
+                    generate_range: tuple = GENERATE_RANGE) -> GraphArrays:
+    """
+    Two terminal series-parallel graph from 0 to 1: starting from the edge 0 -> 1, each new node w takes a random
+    edge u -> v and either splits it (u -> w -> v, series) or adds a path next to it (u -> w -> v, keeping u -> v, parallel).
+    """
+    if num_tasks < 2:
+        raise ValueError(f"Series-parallel graph needs atleast 2 tasks, got {num_tasks}")
+
+    rng         = np.random.default_rng(seed)
+    max_edges   = 2 * num_tasks
+    sources     = np.zeros(max_edges, dtype=np.int64)
+    targets     = np.zeros(max_edges, dtype=np.int64)
+    targets[0]  = 1
+    num_edges   = 1
+
+    edge_choices    = rng.random(num_tasks)
+    is_parallel     = rng.random(num_tasks) < parallel_probability
+
+    for node_id in range(2, num_tasks):
+        edge        = int(edge_choices[node_id] * num_edges)
+        source      = sources[edge]
+        target      = targets[edge]
+
+        if is_parallel[node_id]:
+            sources[num_edges], targets[num_edges]          = source, node_id
+            sources[num_edges + 1], targets[num_edges + 1]  = node_id, target
+            num_edges += 2
+        else:
+            targets[edge] = node_id
+            sources[num_edges], targets[num_edges]          = node_id, target
+            num_edges += 1
+
+    return _get_graph_arrays( num_tasks, sources[:num_edges], targets[:num_edges], rng,
+                              processing_time_range, weight_range, generate_range )
+
+
+def random_dag(num_tasks: int, edge_probability: float = 0.2, seed: int = 0, random_order: bool = False,
+               processing_time_range: tuple = PROCESSING_TIME_RANGE, weight_range: tuple = WEIGHT_RANGE,
+               generate_range: tuple = GENERATE_RANGE) -> GraphArrays:
+    """
+    Edges from each node to the nodes after it with `edge_probability`, every node but the first has atleast one
+    predecessor. The order is the node id order, or a random permutation of the ids with `random_order`.
+    """
+    rng         = np.random.default_rng(seed)
+    positions   = rng.permutation(num_tasks) if random_order else np.arange(num_tasks) # node id at each position
+
+    # Upper triangle of the adjacency, drawn one row (source position) at a time
+    sources, targets = [], []
+    for position in range(num_tasks - 1):
+        later = np.flatnonzero(rng.random(num_tasks - position - 1) < edge_probability) + position + 1
+        sources.append(np.full(len(later), positions[position]))
+        targets.append(positions[later])
+
+    sources = np.concatenate(sources) if sources else np.zeros(0, dtype=np.int64)
+    targets = np.concatenate(targets) if targets else np.zeros(0, dtype=np.int64)
+    sources, targets = _add_missing_predecessors(sources, targets, positions, rng)
+
+    return _get_graph_arrays( num_tasks, sources, targets, rng, processing_time_range, weight_range, generate_range )
+
+
+GENERATORS = { "chain"              : chain,
+               "fork_join"          : fork_join,
+               "layered_dag"        : layered_dag,
+               "series_parallel"    : series_parallel,
+               "random_dag"         : random_dag }
+
+
+def generate_graphs(generator: str, count: int, num_tasks: int, seed: int = 0, **kwargs) -> list[nx.DiGraph]:
+    """ `count` graphs of `generator` (see GENERATORS), each with its own seed derived from `seed` """
+    seeds = np.random.SeedSequence(seed).spawn(count)
+    return [ GENERATORS[generator](num_tasks, seed=graph_seed, **kwargs).to_networkx() for graph_seed in seeds ]
@@ -0,0 +1,225 @@
+"""
+Simulated samples as graph tensors for GNN training, without building NetworkX objects.
+
+A batch of samples is one disjoint graph of their tasks (the layout of a PyTorch Geometric batch):
+    node_features   float32 (num_tasks, len(NODE_FEATURES))     processing time, generate, coordinates of the PE
+    edge_index      int64   (2, num_edges)                      source and target task of each edge, batch positions
+    edge_features   float32 (num_edges, len(EDGE_FEATURES))     weight, hops between the PEs of the two tasks
+    targets         int64   (num_tasks, len(TARGETS))           start and end cycle
+    node_offsets    int64   (num_samples + 1)                   tasks of sample i: [node_offsets[i]:node_offsets[i + 1]]
+    edge_offsets    int64   (num_samples + 1)
+    makespan        int64   (num_samples)
+The hop distance is the one of the mesh (XY routing). export_batches writes the batches of a ResultStore
+(src/result_store.py) as directories of .npy files listed in batches.json, load_batch and iter_batches read
+them back memory mapped.
+
+Usage:
+    python -m src.graph_tensor --store data/ --output tensors/ --batch-size 1024
+"""
+
+import os
+import json
+import shutil
+import argparse
+
+import numpy as np
+
+from dataclasses import dataclass, fields
+
+from .simulator     import Map
+from .result_store  import ResultStore, samples_to_columns
+
+NODE_FEATURES   = ( "processing_time", "generate", "pe_x", "pe_y" )
+EDGE_FEATURES   = ( "weight", "hop_distance" )
+TARGETS         = ( "start_cycle", "end_cycle" )
+
+BATCHES_FILE    = "batches.json"
+EDGE_COLUMNS    = ( "source", "target", "weight" )  # store columns of the edge tensors
+
+
+@dataclass
+class GraphTensors:
+    node_features   : np.ndarray
+    edge_index      : np.ndarray
+    edge_features   : np.ndarray
+    targets         : np.ndarray
+    node_offsets    : np.ndarray
+    edge_offsets    : np.ndarray
+    makespan        : np.ndarray
+
+    def get_num_samples(self) -> int:
+        return len(self.makespan)
+
+    def get_batch_vector(self) -> np.ndarray:
+        """ Sample of each task """
+        return np.repeat(np.arange(self.get_num_samples()), np.diff(self.node_offsets))
+
+
+def columns_to_tensors(columns: dict[str, np.ndarray]) -> GraphTensors:
+    """
+    Tensors of consecutive samples in the columns of a ResultStore (see samples_to_columns). The offsets
+    may start anywhere (a slice of the columns of a store), the tensors of the batch start at 0.
+    """
+    node_offsets    = np.asarray(columns["node_offsets"]) - columns["node_offsets"][0]
+    edge_offsets    = np.asarray(columns["edge_offsets"]) - columns["edge_offsets"][0]
+
+    # Edges refer to the tasks of their sample, moved to the position of the sample in the batch
+    edge_samples    = np.repeat(np.arange(len(node_offsets) - 1), np.diff(edge_offsets))
+    sources         = np.asarray(columns["source"]) + node_offsets[edge_samples]
+    targets         = np.asarray(columns["target"]) + node_offsets[edge_samples]
+
+    pe_x, pe_y      = np.asarray(columns["pe_x"]), np.asarray(columns["pe_y"])
+    hop_distance    = np.abs(pe_x[sources] - pe_x[targets]) + np.abs(pe_y[sources] - pe_y[targets])
+
+    return GraphTensors( node_features  = np.stack([ columns[name] for name in NODE_FEATURES ], axis=1).astype(np.float32),
+                         edge_index     = np.stack([ sources, targets ]).astype(np.int64),
+                         edge_features  = np.stack([ columns["weight"], hop_distance ], axis=1).astype(np.float32),
+                         targets        = np.stack([ columns[name] for name in TARGETS ], axis=1).astype(np.int64),
+                         node_offsets   = node_offsets.astype(np.int64),
+                         edge_offsets   = edge_offsets.astype(np.int64),
+                         makespan       = np.asarray(columns["makespan"], dtype=np.int64) )
+
+
+def samples_to_tensors(samples: list[dict]) -> GraphTensors:
+    """ Tensors of samples in the format of src/dataset.py """
+    return columns_to_tensors(samples_to_columns(samples))
+
+
+def get_graph_tensors(graph, mapping_list: list[Map], makespan: int) -> GraphTensors:
+    """ Tensors of a simulated application graph, `mapping_list` from Simulator.get_mapping_list() after the run """
+    map_of = { graph_map.task.task_id: graph_map for graph_map in mapping_list }
+    mapped = [ map_of[node_id] for node_id in graph.nodes ]
+
+    sample = dict( nodes        = [ [ node_id, data["processing_time"], data.get("generate", 0) ] for node_id, data in graph.nodes(data=True) ],
+                   edges        = [ [ src, dst, weight ] for src, dst, weight in graph.edges(data="weight") ],
+                   mapping      = [ [ graph_map.task.task_id, *graph_map.assigned_pe ] for graph_map in mapped ],
+                   start_cycles = [ graph_map.task.start_cycle for graph_map in mapped ],
+                   end_cycles   = [ graph_map.task.end_cycle for graph_map in mapped ],
+                   makespan     = makespan )
+
+    return samples_to_tensors([ sample ])
+
+
+def get_batch_path(output_dir: str, batch_index: int) -> str:
+    return os.path.join(output_dir, f"batch_{batch_index:05d}")
+
+
+def write_batch(output_dir: str, batch_index: int, tensors: GraphTensors) -> str:
+    """ Written to a temporary directory first, the batch only exists once it is complete """
+    path        = get_batch_path(output_dir, batch_index)
+    temp_path   = f"{path}.{os.getpid()}.tmp"
+
+    os.makedirs(temp_path, exist_ok=True)
+    for field in fields(GraphTensors):
+        np.save(os.path.join(temp_path, f"{field.name}.npy"), np.ascontiguousarray(getattr(tensors, field.name)))
+
+    if os.path.exists(path):
+        shutil.rmtree(path)
+
+    os.replace(temp_path, path)
+    return path
+
+
+def load_batch(path: str) -> GraphTensors:
+    """ The arrays are read only memory maps of the files """
+    return GraphTensors(**{ field.name: np.load(os.path.join(path, f"{field.name}.npy"), mmap_mode="r") for field in fields(GraphTensors) })
+
+
+def iter_batches(output_dir: str):
+    """ The batches listed in the manifest of the last export """
+    with open(os.path.join(output_dir, BATCHES_FILE), "r") as file:
+        batches = json.load(file)["batches"]
+
+    for batch in batches:
+        yield load_batch(os.path.join(output_dir, batch["name"]))
+
+
+def _remove_batches(output_dir: str) -> None:
+    """ Batches (and leftovers) of a previous export """
+    for name in os.listdir(output_dir):
+        path = os.path.join(output_dir, name)
+        if name.startswith("batch_") and os.path.isdir(path):
+            shutil.rmtree(path)
+        elif name.startswith(BATCHES_FILE):
+            os.remove(path)
+
+
+def _get_batch_columns(store: ResultStore, start: int, end: int) -> dict[str, np.ndarray]:
+    """
+    Columns of the samples [start:end] of `store`, sliced from the memory maps of the shards they are in
+    (a batch can span several shards). Only the rows of the batch are read.
+    """
+    pieces          = { name: [] for name in ( "makespan", ) + EDGE_COLUMNS + NODE_FEATURES + TARGETS }
+    node_offsets    = [ np.zeros(1, dtype=np.int64) ]
+    edge_offsets    = [ np.zeros(1, dtype=np.int64) ]
+
+    for shard_index in range(store.get_num_shards()):
+        shard_start, shard_end = store.get_shard_samples(shard_index)
+        if shard_end <= start:
+            continue
+        if shard_start >= end:
+            break
+
+        first, last         = max(start, shard_start) - shard_start, min(end, shard_end) - shard_start
+        column              = lambda name: store.get_shard_column(shard_index, name)
+        shard_node_offsets  = column("node_offsets")[first:last + 1]
+        shard_edge_offsets  = column("edge_offsets")[first:last + 1]
+        nodes               = slice(shard_node_offsets[0], shard_node_offsets[-1])
+        edges               = slice(shard_edge_offsets[0], shard_edge_offsets[-1])
+
+        pieces["makespan"].append(column("makespan")[first:last])
+        for name in NODE_FEATURES + TARGETS:
+            pieces[name].append(column(name)[nodes])
+        for name in EDGE_COLUMNS:
+            pieces[name].append(column(name)[edges])
+
+        # Offsets of the shard continue from the ones of the previous shard
+        node_offsets.append(shard_node_offsets[1:] - shard_node_offsets[0] + node_offsets[-1][-1])
+        edge_offsets.append(shard_edge_offsets[1:] - shard_edge_offsets[0] + edge_offsets[-1][-1])
+
+    columns = { name: np.concatenate(piece) for name, piece in pieces.items() }
+    columns.update( node_offsets=np.concatenate(node_offsets), edge_offsets=np.concatenate(edge_offsets) )
+    return columns
+
+
+def export_batches(store: ResultStore, output_dir: str, batch_size: int) -> int:
+    """
+    Writes the samples of `store` in batches of `batch_size` samples, returns the number of batches.
+    The batches of a previous export to `output_dir` are removed first.
+    """
+    if batch_size < 1:
+        raise ValueError(f"Batch size must be atleast 1, got {batch_size}")
+
+    os.makedirs(output_dir, exist_ok=True)
+    _remove_batches(output_dir)
+
+    batches = []
+    for start in range(0, len(store), batch_size):
+        end     = min(start + batch_size, len(store))
+        path    = write_batch(output_dir, len(batches), columns_to_tensors(_get_batch_columns(store, start, end)))
+        batches.append(dict( name=os.path.basename(path), num_samples=end - start ))
+
+    path        = os.path.join(output_dir, BATCHES_FILE)
+    temp_path   = f"{path}.{os.getpid()}.tmp"
+
+    with open(temp_path, "w") as file:
+        json.dump(dict( batch_size=batch_size, batches=batches ), file, indent=4)
+
+    os.replace(temp_path, path)
+    return len(batches)
+
+
+def main(args: list[str] = None) -> int:
+    parser = argparse.ArgumentParser( description="Export the samples of a ResultStore as graph tensors" )
+    parser.add_argument( "--store",         required=True, help="Directory of the ResultStore (dataset with --format columnar)" )
+    parser.add_argument( "--output",        required=True, help="Directory of the batches" )
+    parser.add_argument( "--batch-size",    type=int, default=1024 )
+    args = parser.parse_args(args)
+
+    num_batches = export_batches(ResultStore(args.store), args.output, args.batch_size)
+    print(f"Wrote {num_batches} batches to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -3,9 +3,16 @@ from typing import Optional, Union
 from collections import deque
 
 import uuid 
+import itertools
 
 from .flit import HeaderFlit, PayloadFlit, TailFlit, BufferLocation
 
+PAYLOAD_SIZE    = 2
+PACKET_SIZE     = PAYLOAD_SIZE + 2 # Header and Tail
+
+_packet_sequence = itertools.count() # Creation order of the packets made outside a PE, see HeaderFlit.get_sequence
+
+
 class PacketStatus(Enum):
     IDLE            = "idle"
     TRANSMITTING    = "transmitting"
@@ -13,8 +20,12 @@ class PacketStatus(Enum):
 
 
 class Packet:
-    def __init__( self, source_xy: tuple, dest_id: Optional[int], source_task_id: int ):
-        self._payload_size              = 2
+    def __init__( self, source_xy: tuple, dest_id: Optional[int], source_task_id: int, sequence: tuple = None ):
+        """
+        "sequence" orders the packets by creation (see HeaderFlit), the PEs pass ( cycle, position, count ) 
+        so that the order does not depend on the process the packet was made in (see parallel.py).
+        """
+        self._payload_size              = PAYLOAD_SIZE
         num_header_tail_flits           = 2
 
         self._source_task_id            = source_task_id
@@ -22,7 +33,10 @@ class Packet:
         self._size                      = self._payload_size + num_header_tail_flits 
         self._packet_content            = deque( maxlen=self._size )
 
-        self._init_packet( self._packet_content, source_xy, dest_id, source_task_id )
+        if sequence is None:
+            sequence = ( next(_packet_sequence), )
+
+        self._init_packet( self._packet_content, source_xy, dest_id, source_task_id, sequence )
 
         self._status                    = PacketStatus.IDLE
         self._pointer                   = 0
@@ -30,14 +44,16 @@ class Packet:
         self._flits_transmitted_count   = 0
 
 
-    def _init_packet( self, packet_content: deque, source_xy: tuple , dest_id: Optional[int], source_task_id: int) -> None: 
+    def _init_packet( self, packet_content: deque, source_xy: tuple , dest_id: Optional[int], source_task_id: int, 
+                      sequence: tuple ) -> None: 
         """ Initialize the packet with the header and payload information.
             "packet_content" is a member variable of the Packet class.
         """
 
         uid         = uuid.uuid4()
 
-        header_flit = HeaderFlit( src_xy=source_xy, dest_id=dest_id, packet_uid=uid, source_task_id=source_task_id )
+        header_flit = HeaderFlit( src_xy=source_xy, dest_id=dest_id, packet_uid=uid, source_task_id=source_task_id,
+                                  sequence=sequence )
         packet_content.append(header_flit)
 
         for i in range(self._payload_size):
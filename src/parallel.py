@@ -0,0 +1,422 @@
+import time
+import pickle
+import struct
+import queue
+import threading
+import multiprocessing
+
+import networkx as nx
+
+from dataclasses            import dataclass
+from multiprocessing        import shared_memory
+
+from .router                import STORE_AND_FORWARD
+from .processing_element    import READINESS
+from .deadlock              import ProgressMonitor, get_wait_for_graph, check_wait_for_graph
+
+RING_SIZE = 1 << 20 # Bytes per direction between two regions
+
+# Messages between the regions, ( kind, router position, port index, vc index, flit, cycle )
+_FLIT   = 0
+_CREDIT = 1
+
+
+@dataclass(frozen=True)
+class Region:
+    """ Rectangle of router positions, bounds included, simulated by one worker process """
+    x_min : int
+    x_max : int
+    y_min : int
+    y_max : int
+
+    def contains(self, pos: tuple[int, int]) -> bool:
+        return self.x_min <= pos[0] <= self.x_max and self.y_min <= pos[1] <= self.y_max
+
+
+def get_regions(positions: list[tuple[int, int]], num_workers: int) -> list[Region]:
+    """
+    Splits the positions in `num_workers` rectangles of about the same size,
+    num_x columns of regions by num_y rows with the shortest boundary.
+    """
+    xs = sorted( { x for x, _ in positions } )
+    ys = sorted( { y for _, y in positions } )
+
+    best = None
+    for num_x in range(1, num_workers + 1):
+        if num_workers % num_x:
+            continue
+
+        num_y = num_workers // num_x
+        if num_x > len(xs) or num_y > len(ys):
+            continue
+
+        boundary = ( num_x - 1 ) * len(ys) + ( num_y - 1 ) * len(xs)
+        if best is None or boundary < best[0]:
+            best = ( boundary, num_x, num_y )
+
+    if best is None:
+        raise ValueError(f"Cannot split {len(xs)}x{len(ys)} routers in {num_workers} rectangular regions")
+
+    _, num_x, num_y = best
+    x_ranges = [ xs[ i * len(xs) // num_x : ( i + 1 ) * len(xs) // num_x ] for i in range(num_x) ]
+    y_ranges = [ ys[ i * len(ys) // num_y : ( i + 1 ) * len(ys) // num_y ] for i in range(num_y) ]
+
+    return [ Region( x_range[0], x_range[-1], y_range[0], y_range[-1] ) for x_range in x_ranges for y_range in y_ranges ]
+
+
+class RingBuffer:
+    """
+    Single producer, single consumer queue of byte messages in shared memory.
+    The first 16 bytes hold the running totals of the bytes read (head) and written (tail),
+    the producer only moves the tail and the consumer only the head.
+    """
+    _INDEX  = struct.Struct("q")
+    _LENGTH = struct.Struct("I")
+    _HEAD   = 0
+    _TAIL   = 8
+    _DATA   = 16
+
+    def __init__(self, size: int = RING_SIZE):
+        self._size      = size
+        self._memory    = shared_memory.SharedMemory( create=True, size=self._DATA + size )
+        self._buf       = self._memory.buf
+
+        self._INDEX.pack_into( self._buf, self._HEAD, 0 )
+        self._INDEX.pack_into( self._buf, self._TAIL, 0 )
+
+    def write(self, data: bytes) -> None:
+        """ Waits for the consumer when the ring is full """
+        record = self._LENGTH.pack( len(data) ) + data
+        if len(record) > self._size:
+            raise ValueError(f"Message of {len(record)} bytes does not fit in a ring buffer of {self._size} bytes")
+
+        tail = self._get( self._TAIL )
+        while tail - self._get( self._HEAD ) + len(record) > self._size:
+            time.sleep(0)
+
+        self._copy_in( tail, record )
+        self._INDEX.pack_into( self._buf, self._TAIL, tail + len(record) )
+
+    def read(self) -> bytes:
+        """ Returns the oldest message, None if the ring is empty """
+        head = self._get( self._HEAD )
+        if head == self._get( self._TAIL ):
+            return None
+
+        length, = self._LENGTH.unpack( self._copy_out( head, self._LENGTH.size ) )
+        data    = self._copy_out( head + self._LENGTH.size, length )
+        self._INDEX.pack_into( self._buf, self._HEAD, head + self._LENGTH.size + length )
+
+        return data
+
+    def close(self, unlink: bool = False) -> None:
+        self._buf = None
+        self._memory.close()
+        if unlink:
+            self._memory.unlink()
+
+    def _get(self, offset: int) -> int:
+        return self._INDEX.unpack_from( self._buf, offset )[0]
+
+    def _copy_in(self, position: int, data: bytes) -> None:
+        start   = position % self._size
+        first   = min( len(data), self._size - start )
+
+        self._buf[ self._DATA + start : self._DATA + start + first ] = data[:first]
+        self._buf[ self._DATA : self._DATA + len(data) - first ]     = data[first:]
+
+    def _copy_out(self, position: int, length: int) -> bytes:
+        start   = position % self._size
+        first   = min( length, self._size - start )
+
+        return bytes( self._buf[ self._DATA + start : self._DATA + start + first ] ) + \
+               bytes( self._buf[ self._DATA : self._DATA + length - first ] )
+
+
+class _RemoteRouter:
+    """
+    Stands for a router of another region. The flits and credits sent to it go to the outbox of
+    that region, the rest (buffer labels for the wait-for graph) comes from the local copy of the router.
+    """
+    def __init__(self, router, outbox: list):
+        self._router    = router
+        self._pos       = router.get_pos()
+        self._outbox    = outbox
+
+    def _receive_link_flit(self, port_index: int, vc_index: int, flit, cycle: int = None) -> None:
+        self._outbox.append( ( _FLIT, self._pos, port_index, vc_index, flit, cycle ) )
+
+    def _return_credit(self, port_index: int, vc_index: int, cycle: int) -> None:
+        self._outbox.append( ( _CREDIT, self._pos, port_index, vc_index, None, cycle ) )
+
+    def __getattr__(self, name):
+        return getattr( self._router, name )
+
+
+class _StopRegion(Exception):
+    """ The stall threshold is reached, the parent process raises the error """
+
+
+class _RegionMonitor(ProgressMonitor):
+    """ The stalled cycles go to the parent process with the wait-for edges of the region """
+    def __init__(self, stall_threshold: int, livelock_threshold: int, index: int, results):
+        super().__init__( stall_threshold, livelock_threshold )
+        self._index     = index
+        self._results   = results
+
+    def _check_stall(self, cycle_count: int, routers: dict, pes: dict) -> None:
+        edges = list( get_wait_for_graph( routers, pes ).edges )
+        self._results.put( ( "stall", self._index, cycle_count, self._stalled_cycles, edges ) )
+
+        if self._stall_threshold is not None and self._stalled_cycles >= self._stall_threshold:
+            raise _StopRegion()
+
+
+def check_partition(sim, regions: list[Region]) -> None:
+    """
+    Raises ValueError if the configuration of `sim` cannot be simulated in `regions`:
+    flits cross a region boundary atleast one cycle after they were sent (link latency >= 1),
+    which needs wormhole or virtual cut-through. Adaptive routing reads the credits in the switch stage,
+    the credits coming back over a boundary are only there in the next cycle (credit_delay >= 1).
+    """
+    args = sim._init_args
+
+    if args["switching"] == STORE_AND_FORWARD:
+        raise ValueError("Partitioned simulation needs wormhole or virtual cut-through switching")
+
+    if sim._debug_mode or sim._profiler is not None:
+        raise ValueError("Partitioned simulation does not support the debug mode and the profiler")
+
+    if args["transmit_order"] == READINESS:
+        raise ValueError("Partitioned simulation does not support the readiness transmit order, it reads the tasks of other regions")
+
+    routing = next( iter( sim._routers.values() ) ).get_routing_algorithm()
+    if routing.is_adaptive and args["credit_delay"] < 1:
+        raise ValueError(f"Partitioned simulation with {routing.name} routing needs credit_delay >= 1")
+
+    region_of = _get_region_lookup( sim, regions )
+
+    for pos, router in sim._routers.items():
+        for port_index, ( direction, _, neighbour, _ ) in enumerate( router._output_ports ):
+            if neighbour is None or region_of[ neighbour.get_pos() ] == region_of[pos]:
+                continue
+
+            if router._link_latencies[port_index] < 1:
+                raise ValueError(f"Link {pos} -> {neighbour.get_pos()} crosses a region boundary, "
+                                 f"it needs a link latency >= 1")
+
+
+def run_partitioned(sim, num_workers: int, ring_size: int = RING_SIZE) -> int:
+    """
+    Runs the mapped `sim` in `num_workers` processes (forked), each simulates the routers and PEs
+    of a rectangular region. The cycles are the same as in `Simulator.run`, a conservative synchronous
+    simulation: the regions run a cycle, send the flits and credits that cross a boundary to the
+    neighbouring regions (one message per cycle in a shared memory ring buffer) and wait on a barrier.
+    The flits reach the next router after atleast one cycle on the link, so they are delivered in time.
+    The done PEs and the progress counts are summed over the regions after the barrier, each region
+    takes the same decision to stop. On a cycle without progress the wait-for graph is checked by this process.
+
+    Returns the cycle count. The tasks of the mapping list and the starvation report are updated.
+    """
+    assert sim._mapping_list, "Tasks have not been assigned to PEs"
+
+    regions = get_regions( list( sim._routers ), num_workers )
+    check_partition( sim, regions )
+
+    region_of   = _get_region_lookup( sim, regions )
+    links       = set()
+    for pos, router in sim._routers.items():
+        for neighbour in router.get_neighbours().values():
+            if region_of[ neighbour.get_pos() ] != region_of[pos]:
+                links.add( ( region_of[pos], region_of[ neighbour.get_pos() ] ) )
+
+    context = multiprocessing.get_context("fork")
+    rings   = { link: RingBuffer( ring_size ) for link in sorted(links) }
+    barrier = context.Barrier( num_workers )
+    stats   = context.RawArray( "q", 2 * num_workers * 3 ) # ( done PEs, flit events, task events ) per cycle parity
+    results = context.Queue()
+
+    workers = [ context.Process( target=_run_region, args=( sim, regions, index, rings, stats, barrier, results ),
+                                 daemon=True ) for index in range(num_workers) ]
+    try:
+        for worker in workers:
+            worker.start()
+
+        finished = _collect_results( sim, workers, results )
+    finally:
+        for worker in workers:
+            if worker.is_alive():
+                worker.terminate()
+            worker.join()
+
+        for ring in rings.values():
+            ring.close( unlink=True )
+
+    cycle_counts = { cycle_count for cycle_count, _, _ in finished.values() }
+    assert len(cycle_counts) == 1, f"Regions finished at different cycles {cycle_counts}"
+
+    for _, tasks, starvation in finished.values():
+        _update_parent( sim, tasks, starvation )
+
+    sim._pe_done_count = sim._pe_active_count
+    return cycle_counts.pop()
+
+
+def _get_region_lookup(sim, regions: list[Region]) -> dict[tuple[int, int], int]:
+    region_of = {}
+    for pos in sim._routers:
+        region_of[pos] = next( index for index, region in enumerate(regions) if region.contains(pos) )
+    return region_of
+
+
+def _collect_results(sim, workers: list, results) -> dict[int, tuple]:
+    """
+    Waits for the regions to finish. The first error of a region is raised here, the wait-for edges
+    of a stalled cycle are merged once all the regions have sent theirs.
+    """
+    finished    = {}
+    stalls      = {} # cycle -> [ regions, stalled cycles, wait-for graph ]
+    threshold   = sim._monitor._stall_threshold
+
+    while len(finished) < len(workers):
+        try:
+            message = results.get( timeout=1.0 )
+        except queue.Empty:
+            for index, worker in enumerate(workers):
+                if worker.exitcode not in ( None, 0 ) and index not in finished:
+                    raise RuntimeError(f"Worker of region {index} exited with code {worker.exitcode}")
+            continue
+
+        kind, index = message[0], message[1]
+
+        if kind == "error":
+            raise message[2]
+
+        if kind == "done":
+            finished[index] = message[2:]
+            continue
+
+        _, _, cycle_count, stalled_cycles, edges = message
+        stall = stalls.setdefault( cycle_count, [ 0, stalled_cycles, nx.DiGraph() ] )
+        stall[0] += 1
+        stall[2].add_edges_from( edges )
+
+        if stall[0] == len(workers):
+            check_wait_for_graph( stall[2], cycle_count, stalled_cycles, threshold )
+            del stalls[cycle_count]
+
+    return finished
+
+
+def _update_parent(sim, tasks: dict, starvation: dict) -> None:
+    """ Copies the task state and the starvation counts of a region to the simulator of this process """
+    for pos, task_states in tasks.items():
+        for task, state in zip( sim._pes[pos].compute_list, task_states ):
+            task.__dict__.update( state )
+
+    for pos, counts in starvation.items():
+        router = sim._routers[pos]
+        for port_index, vc_index, cycles in counts:
+            router._starvation_cycles[ router._input_ports[port_index][vc_index] ] = cycles
+
+
+def _run_region(sim, regions: list[Region], index: int, rings: dict, stats, barrier, results) -> None:
+    """ Worker process, the same cycle loop as Simulator._run_cycles on the routers and PEs of a region """
+    try:
+        cycle_count = _run_region_cycles( sim, regions, index, rings, stats, barrier, results )
+    except ( threading.BrokenBarrierError, _StopRegion ):
+        return # Another region failed or the parent raises the StallError
+    except Exception as error:
+        try:
+            pickle.dumps( error )
+        except Exception:
+            error = RuntimeError( f"Region {index}: {error!r}" )
+        results.put( ( "error", index, error ) )
+        barrier.abort()
+        return
+
+    region  = regions[index]
+    tasks   = { pos: [ dict( vars(task) ) for task in pe.compute_list ]
+                for pos, pe in sim._pes.items() if region.contains(pos) and pe.compute_list is not None }
+
+    starvation = {}
+    for pos, router in sim._routers.items():
+        if region.contains(pos) and router._starvation_cycles:
+            starvation[pos] = [ ( port_index, vc_index, router._starvation_cycles[buffer] )
+                                for port_index, input_vcs in enumerate( router._input_ports )
+                                for vc_index, buffer in enumerate(input_vcs) if buffer in router._starvation_cycles ]
+
+    results.put( ( "done", index, cycle_count, tasks, starvation ) )
+
+
+def _run_region_cycles(sim, regions: list[Region], index: int, rings: dict, stats, barrier, results) -> int:
+    region      = regions[index]
+    num_regions = len(regions)
+    routers     = { pos: router for pos, router in sim._routers.items() if region.contains(pos) }
+    pes         = { pos: pe for pos, pe in sim._pes.items() if region.contains(pos) }
+
+    outboxes    = { dest: [] for src, dest in rings if src == index }
+    inputs      = [ ring for ( src, dest ), ring in rings.items() if dest == index ]
+    region_of   = _get_region_lookup( sim, regions )
+
+    # Flits and credits for the routers of the other regions go to the outboxes
+    for router in routers.values():
+        output_ports    = router._output_ports
+        upstream_ports  = router._upstream_ports
+
+        for port_index, ( direction, output_vcs, neighbour, next_port ) in enumerate(output_ports):
+            if neighbour is not None and region_of[ neighbour.get_pos() ] != index:
+                outbox                  = outboxes[ region_of[ neighbour.get_pos() ] ]
+                output_ports[port_index] = ( direction, output_vcs, _RemoteRouter( neighbour, outbox ), next_port )
+                upstream_ports[port_index] = ( _RemoteRouter( neighbour, outbox ), upstream_ports[port_index][1] )
+
+    monitor         = _RegionMonitor( sim._monitor._stall_threshold, sim._monitor._livelock_threshold, index, results )
+    max_cycles      = sim._max_cycles
+    done_count      = sim._pe_done_count
+    cycle_count     = 0
+
+    while True:
+        cycle_count += 1
+
+        region_done = 0
+        for pe in pes.values():
+            if pe.process(None) == True:
+                region_done += 1
+
+        for router in routers.values():
+            router.forward_output_buffer_flits( sim._routers, sim._pes )
+
+        for router in routers.values():
+            router.process()
+
+        for dest, outbox in outboxes.items():
+            rings[ ( index, dest ) ].write( pickle.dumps( outbox, pickle.HIGHEST_PROTOCOL ) )
+            outbox.clear()
+
+        # Two sets of counts, a region can be one cycle ahead of the others once it passed the barrier
+        offset = ( cycle_count % 2 ) * num_regions * 3
+        stats[ offset + index * 3 : offset + index * 3 + 3 ] = [
+            region_done,
+            sum( router.get_flit_event_count() for router in routers.values() ),
+            sum( pe.task_event_count for pe in pes.values() ) ]
+
+        barrier.wait()
+
+        for ring in inputs:
+            for kind, pos, port_index, vc_index, flit, cycle in pickle.loads( ring.read() ):
+                if kind == _FLIT:
+                    routers[pos]._receive_link_flit( port_index, vc_index, flit, cycle )
+                else:
+                    routers[pos]._return_credit( port_index, vc_index, cycle )
+
+        counts = stats[ offset : offset + num_regions * 3 ]
+
+        # Same as Simulator.is_stop_condition_met and Simulator._check_progress
+        if max_cycles is not None:
+            assert cycle_count < max_cycles, f"Simulation did not finish in {max_cycles} cycles"
+
+        done_count += sum( counts[0::3] )
+        if done_count == sim._pe_active_count:
+            return cycle_count - 1
+
+        monitor.update( cycle_count - 1, sum( counts[1::3] ), sum( counts[2::3] ), routers, pes )
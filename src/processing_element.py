@@ -1,10 +1,22 @@
+import math
+
+from collections    import deque
 from enum           import Enum
 from dataclasses    import dataclass 
 from typing         import Optional, Union
 
 from .packet        import Packet
 from .buffer        import Buffer
-from .flit          import HeaderFlit, PayloadFlit, TailFlit
+from .flit          import HeaderFlit, PayloadFlit, TailFlit, Multicast
+
+
+# Order in which a task sends its packets to its successors (the transmit list)
+SHORTEST_FIRST      = "shortest_first"  # all the packets of a successor, the one that requires the least packets first
+ROUND_ROBIN         = "round_robin"     # one packet per successor in turn
+CRITICAL_PATH       = "critical_path"   # successors on the longest path to a sink first (sorted in Simulator.graph_to_task)
+READINESS           = "readiness"       # the successor that needs the fewest packets before it can start
+
+TRANSMIT_ORDERS     = ( SHORTEST_FIRST, ROUND_ROBIN, CRITICAL_PATH, READINESS )
 
 
 class TaskStatus(Enum):
@@ -47,6 +59,40 @@ class TaskInfo:
 
     is_transmit_task:           bool                = False # Final node in the graph assigned to this PE
     transmit_list:              list[TransmitInfo]  = None  # List of task ids that require the packets generated by this task
+    iteration:                  int                 = 0     # Current iteration in the streaming mode
+    start_offset:               int                 = 0     # Source tasks do not start before this cycle
+    affinity:                   dict[str, float]    = None  # Speed-up of the task on each PE type, {pe_type: factor}
+
+    def __post_init__(self):
+        # The transmit list is consumed during a run, its entries are kept to re-arm the task
+        self._transmit_template = tuple(self.transmit_list) if self.transmit_list is not None else None
+
+    def reset(self) -> None:
+        """ 
+        Run state back to the start of a simulation. The static fields (task_id, processing_cycles, 
+        expected_generated_packets, required_packets, the transmit entries ...) are kept, so the same 
+        task can be mapped and run again without rebuilding it. 
+        """
+        self.current_processing_cycle   = 0
+        self.generated_packet_count     = 0
+        self.sent_generated_packets     = 0
+        self.status                     = TaskStatus.IDLE
+        self.start_cycle                = None
+        self.end_cycle                  = None
+        self.iteration                  = 0
+
+        for require in self.require_list:
+            require.received_packet_count = 0
+
+        self.reset_transmit_list()
+
+    def reset_transmit_list(self) -> None:
+        if self._transmit_template is None:
+            return
+
+        self.transmit_list[:] = self._transmit_template
+        for transmit in self.transmit_list:
+            transmit.count = 0
 
 
 class ProcessingElement:
@@ -56,33 +102,94 @@ class ProcessingElement:
             computing_list      : list  [TaskInfo]  = None, 
             debug_mode          : bool              = False, 
             shortest_job_first  : bool              = False, 
-            router_lookup       : dict              = None
+            router_lookup       : dict              = None, 
+            speed               : float             = 1.0, 
+            pe_type             : str               = None, 
+            num_slots           : int               = 1, 
+            ni_depth            : int               = 1, 
+            transmit_order      : str               = SHORTEST_FIRST, 
+            task_lookup         : dict              = None
         ):
+        """
+        "speed" divides the processing cycles of the tasks (2.0 is twice as fast), 
+        "pe_type" selects the entry of the task affinity tables (see get_processing_cycles).
+        "num_slots" is the number of tasks that can process at the same time (cores behind the router),
+        they share the network interfaces.
+        "ni_depth" is the number of packets the output NI holds. With more than one, the finished packets queue 
+        in the NI and drain to the router one flit per cycle (DMA) while the task computes its next packet.
+        "transmit_order" is one of TRANSMIT_ORDERS, READINESS reads the state of the successors from "task_lookup" (task id -> TaskInfo).
+        """
+        if speed <= 0:
+            raise ValueError(f"Speed of PE{xy} should be positive, got {speed}")
+
+        if num_slots < 1:
+            raise ValueError(f"PE{xy} needs atleast one compute slot, got {num_slots}")
+
+        if ni_depth < 1:
+            raise ValueError(f"Output NI of PE{xy} should hold atleast one packet, got {ni_depth}")
+
+        if transmit_order not in TRANSMIT_ORDERS:
+            raise ValueError(f"Unknown transmit order {transmit_order}. Available: {TRANSMIT_ORDERS}")
 
         self.xy                         = xy 
         self.compute_list               = computing_list
-        self.compute_is_busy            = False
+        self.num_slots                  = num_slots
+        self.busy_slots                 = 0     # Tasks processing or waiting to send their packet, until done
         self.shortest_job_first         = shortest_job_first    
         self.debug_mode                 = debug_mode
         self.current_processing_cycle   = 0   # Might have to move this to instantiation later
         self.router_lookup              = router_lookup
+        self.task_lookup                = task_lookup
+        self.transmit_order             = transmit_order
+        self.speed                      = speed
+        self.pe_type                    = pe_type
 
         self.current_id_transmitted_count = 0
+        self.task_event_count           = 0   # Running total of task progress, used for deadlock detection
+        self._packet_count              = 0   # Packets made by this PE, part of the packet sequence
+
+        self.stream                     = None  # StreamControl in the streaming mode (see stream.py)
 
         self.input_network_interface    = Buffer(size=4, name= f"NI[Input]")
         self.output_network_interface   = Buffer(size=4, name= f"NI[Output]")
+        self._output_owner              = None  # Task of the packet in the output NI
+        self.ni_depth                   = ni_depth
+        self._outbound_packets          = deque()   # (task, packet) queued in the output NI, the first one is draining (ni_depth > 1)
         
         if self.compute_list is not None:
             self.required_packet_types  = self._get_unique_required_packet_type()
 
     def clear(self) -> None:
+        self._reset_state()
         self.compute_list = None
-        self.compute_is_busy = False
+        self.required_packet_types = None
+
+    def reset(self, reset_tasks: bool = True) -> None:
+        """ 
+        Run state of the PE back to the start of a simulation, the tasks stay assigned. 
+        With `reset_tasks` their run state too (Simulator.reset restores all the tasks at once instead).
+        """
+        self._reset_state()
+
+        if reset_tasks and self.compute_list is not None:
+            for compute_task in self.compute_list:
+                compute_task.reset()
+
+    def _reset_state(self) -> None:
+        self.busy_slots = 0
+        self._output_owner = None
+        self._outbound_packets.clear()
         self.current_processing_cycle = 0
         self.input_network_interface.clear()
         self.output_network_interface.clear()
         self.current_id_transmitted_count = 0
-        self.required_packet_types = None
+        self.task_event_count = 0
+        self._packet_count = 0
+        self.set_stream(None)
+
+    @property
+    def compute_is_busy(self) -> bool:
+        return self.busy_slots > 0
 
     def assign_task(self, computing_list: list [ TaskInfo ]) -> None:
         if self.compute_list is not None:
@@ -91,6 +198,12 @@ class ProcessingElement:
             self.compute_list = computing_list
         self.required_packet_types = self._get_unique_required_packet_type()
 
+    def set_stream(self, stream) -> None:
+        """
+        Enables the streaming mode, the tasks are re-armed after each iteration (see TaskInfo.reset_transmit_list).
+        """
+        self.stream = stream
+
     def _debug_print(self, string: str, with_tag: bool = True) -> None: 
 
         if self.debug_mode:
@@ -99,6 +212,20 @@ class ProcessingElement:
             else:
                 print(string)
 
+    def get_processing_cycles(self, compute_task: TaskInfo) -> int:
+        """
+        Cycles of a run of the task on this PE: its processing cycles divided by the speed of the PE 
+        and by the affinity of the task for the PE type. Rounded up, atleast one cycle.
+        """
+        speed = self.speed
+        if compute_task.affinity is not None:
+            speed *= compute_task.affinity.get(self.pe_type, 1.0)
+
+        if speed == 1.0:
+            return compute_task.processing_cycles
+
+        return max(1, math.ceil(round(compute_task.processing_cycles / speed, 9)))
+
     def _increment_processing_cycle(self) -> None:
         """Increments the processing cycle for the PE"""
         self.current_processing_cycle += 1
@@ -123,12 +250,13 @@ class ProcessingElement:
         - If this behavior is not desired, that is all the tasks that require getting their 
             copy of packet (having a cache in PE) the function can be modified by returning 
             after the first increment. Uncomment the return statement.
+        - In the streaming mode, packets beyond the required count belong to the next iteration
         """
 
         for compute_task in self.compute_list:
             for require in compute_task.require_list:
 
-                if require.required_packets == require.received_packet_count:
+                if self.stream is None and require.required_packets == require.received_packet_count:
                     # skipping if required packets have been received
                     continue
 
@@ -174,26 +302,30 @@ class ProcessingElement:
 
         if isinstance(flit, TailFlit):
             self._update_TaskInfo( flit_source_id )
+            self.task_event_count += 1
             self.input_network_interface.empty()
             self._debug_print(f"Packet fully recieved. Emptying the input buffer")
 
     def _reset_received_packet_task(self, compute_task: TaskInfo) -> None:
         """
-        Resets the current processing cycle to 0
+        Consumes the required packets when the task starts. 
+        Packets beyond the required count are only received in the streaming mode (next iteration).
         """
         for require in compute_task.require_list:
-            require.received_packet_count = 0
+            require.received_packet_count -= require.required_packets
 
-    def _can_start_new_processing(self) -> None:
+    def _can_start_new_processing(self, free_slots: int = 1) -> list[TaskInfo]:
         """
         Checks if all the required packets for a task have been received
             Processing can only start if all required packets (w/ task_id) have been received
             > Room for optimization here
         Also does scheduling based on the number of required packets. 
         Priority is given to the task that requires the least number of packets. 
+        Starts upto `free_slots` tasks, returns them.
         """
 
-        tasks_ready_to_execute = []
+        tasks_ready_to_execute  = []
+        started_tasks           = []
         
         for compute_task in self.compute_list:
             readiness_check     = []
@@ -205,11 +337,27 @@ class ProcessingElement:
                 # if task has generated the expected count of packets
                 continue
 
+            if compute_task.status is not TaskStatus.IDLE:
+                # Already in a compute slot
+                continue
+
+            if not compute_task.require_list and self.current_processing_cycle <= compute_task.start_offset:
+                # Source tasks wait for the start offset of their application
+                self.task_event_count += 1 # Waiting for a timer is not a stall
+                continue
+
+            if self.stream is not None and not compute_task.require_list:
+                # Source tasks wait for the release of their iteration
+                if not self.stream.is_released(compute_task.iteration, self.current_processing_cycle):
+                    if self.stream.is_waiting_for_period(compute_task.iteration, self.current_processing_cycle):
+                        self.task_event_count += 1 # Waiting for a timer is not a stall
+                    continue
+
             total_require_count = 0  # for scheduling
             for require in compute_task.require_list:
                 total_require_count += require.required_packets
                 if compute_task.status is TaskStatus.IDLE:
-                    if require.received_packet_count == require.required_packets:
+                    if require.received_packet_count >= require.required_packets:
                         readiness_check.append(True)
 
             if len(readiness_check) == require_list_len:
@@ -220,29 +368,37 @@ class ProcessingElement:
 
                 else:
                     # Randomly scheduling the task for processing
-                    compute_task.status         = TaskStatus.PROCESSING
-                    compute_task.start_cycle    = self.current_processing_cycle
-
-                    self.compute_is_busy = True
-                    self._reset_received_packet_task(compute_task)
+                    self._start_task(compute_task)
                     self._debug_print(f"Scheduling (random) task {compute_task.task_id} for processing")
 
-                    return 
+                    started_tasks.append(compute_task)
+                    if len(started_tasks) == free_slots:
+                        return started_tasks
 
         # Shortest Job First Scheduling 
         if self.shortest_job_first and  tasks_ready_to_execute:
 
-            execute_task = min(tasks_ready_to_execute, key=lambda x: x[0])[1]
-            execute_task.status = TaskStatus.PROCESSING 
-            execute_task.start_cycle = self.current_processing_cycle
-
             if self.debug_mode:
                 debug_tasks_ready_to_execute = [(task_info.task_id, count) for count, task_info in tasks_ready_to_execute]
                 self._debug_print(f"Tasks ready to execute (id, require count): {debug_tasks_ready_to_execute}")
 
-            self.compute_is_busy = True
-            self._reset_received_packet_task(execute_task)
-            self._debug_print(f"Scheduling (SJF) task {execute_task.task_id} for processing")
+            tasks_ready_to_execute.sort(key=lambda x: x[0])
+            for _, execute_task in tasks_ready_to_execute[:free_slots]:
+                self._start_task(execute_task)
+                self._debug_print(f"Scheduling (SJF) task {execute_task.task_id} for processing")
+                started_tasks.append(execute_task)
+
+        return started_tasks
+
+    def _start_task(self, compute_task: TaskInfo) -> None:
+        """ The task takes a free compute slot """
+        compute_task.status         = TaskStatus.PROCESSING
+        compute_task.start_cycle    = self.current_processing_cycle
+
+        self.busy_slots         += 1
+        self.task_event_count   += 1
+        self._reset_received_packet_task(compute_task)
+        self._record_stream_start(compute_task)
 
 
     def _update_task_as_complete(self, compute_task: TaskInfo) -> None:
@@ -251,7 +407,33 @@ class ProcessingElement:
         """
         compute_task.status     = TaskStatus.DONE
         compute_task.end_cycle  = self.current_processing_cycle
-        self.compute_is_busy    = False
+        self.busy_slots        -= 1
+
+        if self.stream is not None:
+            self._complete_stream_iteration(compute_task)
+
+    def _record_stream_start(self, compute_task: TaskInfo) -> None:
+        if self.stream is not None and not compute_task.require_list:
+            self.stream.record_start(compute_task.iteration, self.current_processing_cycle)
+
+    def _complete_stream_iteration(self, compute_task: TaskInfo) -> None:
+        """
+        Records the end of the iteration for sink tasks and re-arms the task 
+        for the next iteration. The same TaskInfo object is reused. 
+        """
+        if compute_task.task_id in self.stream.sink_task_ids:
+            self.stream.record_sink_done(compute_task.iteration, self.current_processing_cycle)
+
+        if compute_task.iteration + 1 == self.stream.num_iterations:
+            return
+
+        compute_task.iteration                  += 1
+        compute_task.status                     = TaskStatus.IDLE
+        compute_task.generated_packet_count     = 0
+        compute_task.current_processing_cycle   = 0
+        compute_task.reset_transmit_list()
+
+        self._debug_print(f"Task {compute_task.task_id} re-armed for iteration {compute_task.iteration}")
 
     
     def _check_generate_for_inter_task_dependency(self, current_task: TaskInfo) -> None:  
@@ -277,6 +459,14 @@ class ProcessingElement:
 
                     return 
 
+        if self.stream is not None:
+            # Streaming: packet belongs to the next iteration of the first task that requires it
+            for task_in_compute_list in self.compute_list:
+                for require in task_in_compute_list.require_list:
+                    if require.require_type_id == current_task.task_id:
+                        require.received_packet_count += 1
+                        return
+
     def _process_compute_task(self, compute_task: TaskInfo) -> None:
         """
         Tasks generate packets here  
@@ -303,7 +493,7 @@ class ProcessingElement:
         Hope this makes sense. xo for reading this.
         """
 
-        if compute_task.status is TaskStatus.IN_BUFFER: 
+        if compute_task.status is TaskStatus.IN_BUFFER and self.ni_depth == 1: 
 
             # Check if the PE output buffer has been emptied 
             is_buffer_empty = self.output_network_interface.is_empty()
@@ -325,6 +515,8 @@ class ProcessingElement:
             if is_buffer_empty:
                 # Packer already sent to the output buffer
                 # Below are the things to do after that
+                self.task_event_count += 1
+                self._output_owner     = None
 
                 if compute_task.generated_packet_count < compute_task.expected_generated_packets:
                     # If total generate count is not achieved, continue generating packets (PROCESSING)
@@ -346,13 +538,22 @@ class ProcessingElement:
         if compute_task.status is TaskStatus.PROCESSING:
             # Second condition 
 
+            processing_cycles = self.get_processing_cycles(compute_task)
+
+            if (compute_task.is_transmit_task and self._is_output_interface_full() and 
+                compute_task.current_processing_cycle + 1 == processing_cycles):
+                # Another slot has its packet in the output NI (several compute slots), or the NI queue is full
+                self._debug_print(f"NI[Output] is full, task {compute_task.task_id} waits")
+                return
+
             compute_task.current_processing_cycle += 1  
+            self.task_event_count += 1
 
-            if compute_task.current_processing_cycle == compute_task.processing_cycles:
+            if compute_task.current_processing_cycle == processing_cycles:
 
                 self._debug_print(
                     f"Task {compute_task.task_id} is done processing "
-                    f"{compute_task.current_processing_cycle}/{compute_task.processing_cycles}"
+                    f"{compute_task.current_processing_cycle}/{processing_cycles}"
                 )
 
                 if compute_task.is_transmit_task:
@@ -378,9 +579,39 @@ class ProcessingElement:
             else :
                 self._debug_print(
                     f"Task {compute_task.task_id} is processing at cycle "
-                    f"{compute_task.current_processing_cycle}/{compute_task.processing_cycles}"
+                    f"{compute_task.current_processing_cycle}/{processing_cycles}"
                 )
 
+    def _is_output_interface_full(self) -> bool:
+        if self.ni_depth == 1:
+            return self._output_owner is not None
+        return len(self._outbound_packets) == self.ni_depth
+
+    def _drain_output_interface(self) -> None:
+        """
+        Output NI with several packets (ni_depth > 1): sends the queued packets to the router, 
+        independently of the tasks. A task is done once its last packet has left the NI.
+        """
+        if not self._outbound_packets or self.router_lookup is None:
+            return
+
+        if not self._move_flits_to_router_buffer():
+            return
+
+        compute_task, _ = self._outbound_packets.popleft()
+        compute_task.generated_packet_count += 1
+        self._debug_print(
+            f"Generated {compute_task.generated_packet_count}/{compute_task.expected_generated_packets} " 
+            f"packets of task id {compute_task.task_id}"
+        )
+
+        if (compute_task.status is TaskStatus.IN_BUFFER and 
+            compute_task.generated_packet_count == compute_task.expected_generated_packets):
+            self._update_task_as_complete(compute_task)
+
+        if self._outbound_packets:
+            self.output_network_interface.fill_with_packet(self._outbound_packets[0][1])
+
     def _empty_output_buffer(self, compute_task: TaskInfo) -> None:
         """
         Used for emptying  the output buffer of the PE in test conditions 
@@ -402,6 +633,7 @@ class ProcessingElement:
             flit = self.output_network_interface.remove()
             self.output_network_interface.fill_emtpy_slots()
             router.add_flit_to_local_input_buffer(flit)
+            self.task_event_count += 1
 
             self._debug_print(f"\t-> {router._local_input_buffer}", with_tag=False)
 
@@ -412,6 +644,24 @@ class ProcessingElement:
 
     def is_input_buffer_full(self) -> bool:
         return self.input_network_interface.is_full()
+
+    def get_wait_for_edges(self) -> list[tuple[str, str]]:
+        """
+        Returns (blocked buffer, buffer it waits on) pairs for the network interfaces.
+        The output NI is blocked when the local input buffer of the router is full.
+        """
+        if self.router_lookup is None or self.output_network_interface.is_empty():
+            return []
+
+        router = self.router_lookup[self.xy]
+        if router.is_local_input_buffer_full():
+            return [ ( self.get_buffer_label(self.output_network_interface), 
+                       router.get_buffer_label(router._local_input_buffer) ) ]
+
+        return []
+
+    def get_buffer_label(self, buffer: Buffer) -> str:
+        return f"[PE{self.xy}] {buffer.get_name()}"
             
 
     def _process_trasmit_generate_packets(self, compute_task: TaskInfo) -> Packet:
@@ -425,46 +675,96 @@ class ProcessingElement:
         assert len(compute_task.transmit_list) > 0, "Transmit id list is empty"
 
         # Add transmit information here .
-        transmit_id         = compute_task.transmit_list[0].id
-        transmit_require    = compute_task.transmit_list[0].require
-        compute_task.transmit_list[0].count += 1
+        transmit_index      = self._get_transmit_index(compute_task)
+        transmit            = compute_task.transmit_list[transmit_index]
+        transmit_id         = transmit.id
+        transmit_require    = transmit.require
+        transmit.count     += 1
 
         packet = Packet(
                     source_xy       = self.xy,
                     dest_id         = transmit_id,
-                    source_task_id  = compute_task.task_id
+                    source_task_id  = compute_task.task_id, 
+                    sequence        = ( self.current_processing_cycle, self.xy, self._packet_count )
                 )
-                
-        self.output_network_interface.fill_with_packet(packet)
-        compute_task.status = TaskStatus.IN_BUFFER
+        self._packet_count += 1
 
-        transmit_count = compute_task.transmit_list[0].count
+        if self.ni_depth > 1:
+            self._queue_outbound_packet(compute_task, packet)
+        else:
+            self.output_network_interface.fill_with_packet(packet)
+            self._output_owner  = compute_task
+            compute_task.status = TaskStatus.IN_BUFFER
+
+        transmit_count = transmit.count
 
         if transmit_count == transmit_require:
             self._debug_print(f"Transmitted all packet for task {transmit_id}")
-            compute_task.transmit_list.pop(0)
+            compute_task.transmit_list.pop(transmit_index)
 
         else: 
             self._debug_print(f"Transmitting {transmit_count}/{transmit_require} packets for task {transmit_id}")
 
+            if self.transmit_order == ROUND_ROBIN:
+                compute_task.transmit_list.append(compute_task.transmit_list.pop(transmit_index))
+
+    def _get_transmit_index(self, compute_task: TaskInfo) -> int:
+        """ Entry of the transmit list the next packet goes to, see TRANSMIT_ORDERS """
+        if self.transmit_order != READINESS or len(compute_task.transmit_list) == 1:
+            return 0
+
+        remaining_packets = [ self._get_missing_packet_count(transmit.id) for transmit in compute_task.transmit_list ]
+        return remaining_packets.index(min(remaining_packets))
+
+    def _get_missing_packet_count(self, transmit_id) -> int:
+        """ Packets the successor(s) `transmit_id` still need from all their predecessors before they can start """
+        task_ids    = transmit_id.task_ids if isinstance(transmit_id, Multicast) else (transmit_id,)
+        count       = 0
+
+        for task_id in task_ids:
+            for require in self.task_lookup[task_id].require_list:
+                count += max(0, require.required_packets - require.received_packet_count)
+
+        return count
+
+
+    def _queue_outbound_packet(self, compute_task: TaskInfo, packet: Packet) -> None:
+        """
+        Queues the packet in the output NI (ni_depth > 1). The task computes its next packet right away, 
+        or waits in IN_BUFFER for its last packets to drain.
+        """
+        if not self._outbound_packets:
+            self.output_network_interface.fill_with_packet(packet)
+        self._outbound_packets.append((compute_task, packet))
+
+        queued_count = sum(1 for task, _ in self._outbound_packets if task is compute_task)
+
+        if compute_task.generated_packet_count + queued_count < compute_task.expected_generated_packets:
+            compute_task.current_processing_cycle   = 0
+        else:
+            compute_task.status                     = TaskStatus.IN_BUFFER
 
     def _can_generate_packets(self) -> bool:
         output_buffer_full = self.output_network_interface.is_full()    
         return not output_buffer_full
         
 
-    def _process_tasks(self) -> None:
+    def _process_tasks(self, started_tasks: list[TaskInfo] = ()) -> None:
         """
-        Checks if multiple tasks are processing at the same time
-        Increment the processing cycle for the task (in compute_list) that is processing
+        Checks if more tasks are processing than there are compute slots
+        Increment the processing cycle for the tasks (in compute_list) that are processing, 
+        except the `started_tasks` that got their slot in this cycle
         """
 
         processing_tasks = [task for task in self.compute_list if task.status == TaskStatus.PROCESSING]
-        if len(processing_tasks) > 1:
-            raise ValueError("Multiple tasks are processing at the same time")
+        if len(processing_tasks) > self.num_slots:
+            raise ValueError("More tasks are processing at the same time than there are compute slots")
+
+        self._drain_output_interface()
 
         for compute_task in self.compute_list:
-            self._process_compute_task(compute_task)
+            if compute_task not in started_tasks:
+                self._process_compute_task(compute_task)
 
     def _get_packet_count(self) -> None:
         # print(f"{self}Require List:")
@@ -505,12 +805,16 @@ class ProcessingElement:
         if packet is not None: 
             self._recieve_packets(packet)
 
-        if not self.compute_is_busy:
-            self._can_start_new_processing()    # status: IDLE     -> PROCESSING
-            return None
+        busy_slots      = self.busy_slots
+        started_tasks   = ()
 
-        if self.compute_is_busy:
-            self._process_tasks()               # status: PROCESSING  -> IN_BUFFER or DONE
+        if busy_slots < self.num_slots:
+            started_tasks = self._can_start_new_processing(self.num_slots - busy_slots)   # status: IDLE -> PROCESSING
+
+            if busy_slots == 0:
+                return None
+
+        self._process_tasks(started_tasks)      # status: PROCESSING  -> IN_BUFFER or DONE
 
         if self._check_task_requirements_met(): # stops the simulation now 
             return True
@@ -0,0 +1,153 @@
+import json
+import time
+
+from contextlib import contextmanager
+
+
+HOT_FUNCTIONS = ( "is_full",                    # Buffer, FifoBuffer
+                  "_can_accept_new_packet",     # Buffer, FifoBuffer
+                  "_compute_next_hop",          # Router, store and forward routing
+                  "_allocate_output_vc",        # Router, flit-level routing
+                  "_allocate_multicast_route" ) # Router, flit-level multicast routing
+
+
+class CallCounter:
+    """
+    Calls of the hot functions, one plain integer per function. The functions count themselves
+    behind a single `call_counter.active` check: no wrapper and no extra call frame.
+    """
+    __slots__ = ( "active", ) + HOT_FUNCTIONS
+
+    def __init__(self):
+        self.active = False
+        self.reset()
+
+    def reset(self) -> None:
+        for name in HOT_FUNCTIONS:
+            setattr(self, name, 0)
+
+
+call_counter = CallCounter() # shared by the hot functions, only active during a profiled run
+
+
+class Profiler:
+    """
+    Lightweight profiler for `Simulator.run`.
+
+    - Each cycle is split into three phases (PE process, output buffer forwarding
+      and router process/management). Phases are timed with `time.perf_counter_ns`
+      accumulators, so the overhead is a couple of clock reads per phase per cycle.
+    - Calls to the hot functions listed in `HOT_FUNCTIONS` are counted by the functions
+      themselves in `call_counter`, which is only active while a run is instrumented.
+    """
+
+    PHASES          = ( "pe_process", "forward_output_buffer_flits", "router_process" )
+
+    def __init__(self):
+        self._phase_time_ns = { phase: 0 for phase in self.PHASES }
+        self._call_counts   = { name: 0 for name in HOT_FUNCTIONS }
+        self._cycle_count   = 0
+        self._run_count     = 0
+        self._run_time_ns   = 0
+
+    def reset(self) -> None:
+        for phase in self._phase_time_ns:
+            self._phase_time_ns[phase] = 0
+
+        for name in self._call_counts:
+            self._call_counts[name] = 0
+
+        self._cycle_count   = 0
+        self._run_count     = 0
+        self._run_time_ns   = 0
+
+    def now(self) -> int:
+        return time.perf_counter_ns()
+
+    def add_phase_time(self, phase: str, start_ns: int) -> int:
+        """
+        Accumulates the time elapsed since `start_ns` to `phase`.
+        Returns the current time so that the next phase can be timed from it.
+        """
+        now_ns = time.perf_counter_ns()
+        self._phase_time_ns[phase] += now_ns - start_ns
+        return now_ns
+
+    def add_cycle(self) -> None:
+        self._cycle_count += 1
+
+    @contextmanager
+    def instrument(self):
+        """
+        Activates the call counters for the duration of a run.
+        Also times the whole run, so the untimed part of the loop shows up as "other".
+        """
+        call_counter.reset()
+        call_counter.active = True
+
+        start_ns = time.perf_counter_ns()
+        try:
+            yield self
+        finally:
+            self._run_time_ns   += time.perf_counter_ns() - start_ns
+            self._run_count     += 1
+            call_counter.active = False
+
+            for name in HOT_FUNCTIONS:
+                self._call_counts[name] += getattr(call_counter, name)
+
+    def get_report(self) -> dict:
+        """
+        Returns the profile as a dictionary (JSON serializable).
+        Percentages are relative to the total run time.
+        """
+        total_ns    = self._run_time_ns
+        cycles      = self._cycle_count
+        phases      = {}
+
+        for phase, time_ns in self._phase_time_ns.items():
+            phases[phase] = self._get_time_entry(time_ns, total_ns, cycles)
+
+        other_ns        = max(total_ns - sum(self._phase_time_ns.values()), 0)
+        phases["other"] = self._get_time_entry(other_ns, total_ns, cycles)
+
+        calls = {}
+        for name, count in self._call_counts.items():
+            calls[name] = {
+                "count"             : count,
+                "calls_per_cycle"   : count / cycles if cycles else 0.0 }
+
+        return {
+            "runs"              : self._run_count,
+            "cycles"            : cycles,
+            "total_time_ns"     : total_ns,
+            "cycles_per_second" : cycles / (total_ns * 1e-9) if total_ns else 0.0,
+            "phases"            : phases,
+            "calls"             : calls,
+        }
+
+    def _get_time_entry(self, time_ns: int, total_ns: int, cycles: int) -> dict:
+        return {
+            "time_ns"           : time_ns,
+            "ns_per_cycle"      : time_ns / cycles if cycles else 0.0,
+            "percent"           : 100.0 * time_ns / total_ns if total_ns else 0.0 }
+
+    def show_report(self) -> None:
+        report = self.get_report()
+
+        print("---------Profile Report---------")
+        print(f"Runs: {report['runs']} \t Cycles: {report['cycles']} \t "
+              f"Cycles/s: {report['cycles_per_second']:.1f}")
+
+        print(f"{'Phase':<30}{'Total (ms)':>12}{'ns/cycle':>12}{'%':>8}")
+        for phase, entry in report["phases"].items():
+            print(f"{phase:<30}{entry['time_ns'] * 1e-6:>12.3f}"
+                  f"{entry['ns_per_cycle']:>12.0f}{entry['percent']:>8.1f}")
+
+        print(f"{'Function':<30}{'Calls':>12}{'Calls/cycle':>12}")
+        for name, entry in report["calls"].items():
+            print(f"{name:<30}{entry['count']:>12}{entry['calls_per_cycle']:>12.1f}")
+
+    def save_report(self, filename: str) -> None:
+        with open(filename, "w") as file:
+            json.dump(self.get_report(), file, indent=4)
@@ -0,0 +1,221 @@
+"""
+Append-only columnar store of simulated samples (graph, mapping and per-task timings), read with memory maps.
+
+A store is a directory of shards and an index:
+    index.json              shards and their sample, node and edge counts
+    shard_00000/            one .npy file per column, see SAMPLE_COLUMNS, NODE_COLUMNS and EDGE_COLUMNS
+    shard_00001/
+    ...
+The nodes (and their mapping and timings) and the edges of sample i of a shard are the rows
+[node_offsets[i]:node_offsets[i + 1]] and [edge_offsets[i]:edge_offsets[i + 1]] of the node and edge columns.
+Edges refer to their nodes by position in the sample. A shard is written to a temporary directory and renamed
+when complete, so shards can be written by several processes; the index is updated afterwards (write_index).
+Reading a column is a memory map of its files, no parsing: loading a million samples is bounded by the disk.
+"""
+
+import os
+import json
+import shutil
+
+import numpy as np
+
+INDEX_FILE      = "index.json"
+FORMAT_VERSION  = 1
+
+SAMPLE_COLUMNS  = ( "graph_type", "density", "graph_seed", "makespan", "node_offsets", "edge_offsets" )
+NODE_COLUMNS    = ( "node_id", "processing_time", "generate", "pe_x", "pe_y", "start_cycle", "end_cycle" )
+EDGE_COLUMNS    = ( "source", "target", "weight" )
+
+NO_CYCLE        = -1 # start or end cycle of a task that did not run
+
+
+def get_shard_path(store_dir: str, shard_index: int) -> str:
+    return os.path.join(store_dir, f"shard_{shard_index:05d}")
+
+
+def _get_cycles(cycles: list) -> list:
+    return [ NO_CYCLE if cycle is None else cycle for cycle in cycles ]
+
+
+def samples_to_columns(samples: list[dict]) -> dict[str, np.ndarray]:
+    """
+    Columns of samples in the format of src/dataset.py: "nodes" [node_id, processing_time, generate],
+    "edges" [source, target, weight], and "mapping" [task_id, x, y], "start_cycles" and "end_cycles" in node order.
+    """
+    nodes       = [ node for sample in samples for node in sample["nodes"] ]
+    mapping     = [ graph_map for sample in samples for graph_map in sample["mapping"] ]
+    edges       = []
+
+    for sample in samples:
+        position_of = { node[0]: position for position, node in enumerate(sample["nodes"]) }
+        edges.extend( ( position_of[source], position_of[target], weight ) for source, target, weight in sample["edges"] )
+
+    nodes       = np.array(nodes, dtype=np.int64).reshape(-1, 3)
+    mapping     = np.array(mapping, dtype=np.int64).reshape(-1, 3)
+    edges       = np.array(edges, dtype=np.int64).reshape(-1, 3)
+
+    return dict( graph_type         = np.array([ sample.get("graph_type", "") for sample in samples ], dtype=str),
+                 density            = np.array([ sample.get("density", "") for sample in samples ], dtype=str),
+                 graph_seed         = np.array([ sample.get("graph_seed", 0) for sample in samples ], dtype=np.int64),
+                 makespan           = np.array([ sample["makespan"] for sample in samples ], dtype=np.int64),
+                 node_offsets       = np.cumsum([ 0 ] + [ len(sample["nodes"]) for sample in samples ], dtype=np.int64),
+                 edge_offsets       = np.cumsum([ 0 ] + [ len(sample["edges"]) for sample in samples ], dtype=np.int64),
+                 node_id            = nodes[:, 0],
+                 processing_time    = nodes[:, 1],
+                 generate           = nodes[:, 2],
+                 pe_x               = mapping[:, 1],
+                 pe_y               = mapping[:, 2],
+                 start_cycle        = np.array(_get_cycles([ cycle for sample in samples for cycle in sample["start_cycles"] ]), dtype=np.int64),
+                 end_cycle          = np.array(_get_cycles([ cycle for sample in samples for cycle in sample["end_cycles"] ]), dtype=np.int64),
+                 source             = edges[:, 0],
+                 target             = edges[:, 1],
+                 weight             = edges[:, 2] )
+
+
+def write_shard(store_dir: str, shard_index: int, samples: list[dict]) -> str:
+    """ Written to a temporary directory first, the shard only exists once it is complete """
+    path        = get_shard_path(store_dir, shard_index)
+    temp_path   = f"{path}.{os.getpid()}.tmp"
+
+    os.makedirs(temp_path, exist_ok=True)
+    for name, column in samples_to_columns(samples).items():
+        np.save(os.path.join(temp_path, f"{name}.npy"), np.ascontiguousarray(column))
+
+    os.replace(temp_path, path)
+    return path
+
+
+def write_index(store_dir: str) -> dict:
+    """ Index of the complete shards of `store_dir` (the temporary ones are ignored) """
+    shards = []
+
+    for name in sorted(os.listdir(store_dir)):
+        path = os.path.join(store_dir, name)
+        if not name.startswith("shard_") or name.endswith(".tmp") or not os.path.isdir(path):
+            continue
+
+        node_offsets = np.load(os.path.join(path, "node_offsets.npy"), mmap_mode="r")
+        edge_offsets = np.load(os.path.join(path, "edge_offsets.npy"), mmap_mode="r")
+        shards.append(dict( name        = name,
+                            num_samples = len(node_offsets) - 1,
+                            num_nodes   = int(node_offsets[-1]),
+                            num_edges   = int(edge_offsets[-1]) ))
+
+    index       = dict( version=FORMAT_VERSION, shards=shards )
+    path        = os.path.join(store_dir, INDEX_FILE)
+    temp_path   = f"{path}.{os.getpid()}.tmp"
+
+    with open(temp_path, "w") as file:
+        json.dump(index, file, indent=4)
+
+    os.replace(temp_path, path)
+    return index
+
+
+def append_samples(store_dir: str, samples: list[dict]) -> str:
+    """ Writes `samples` as a new shard after the last one and updates the index """
+    os.makedirs(store_dir, exist_ok=True)
+
+    shard_index = 0
+    while os.path.exists(get_shard_path(store_dir, shard_index)):
+        shard_index += 1
+
+    path = write_shard(store_dir, shard_index, samples)
+    write_index(store_dir)
+    return path
+
+
+def remove_temporary_shards(store_dir: str) -> None:
+    """ Leftovers of interrupted writers, temporary shard directories or files (JSON Lines shards of src/dataset.py) """
+    for name in os.listdir(store_dir):
+        path = os.path.join(store_dir, name)
+        if not ( name.startswith("shard_") and name.endswith(".tmp") ):
+            continue
+
+        if os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+        else:
+            os.remove(path)
+
+
+class ResultStore:
+    """
+    Reader of a store written by write_shard/append_samples. The columns are memory mapped,
+    get_column() concatenates a column over all the shards (node_offsets and edge_offsets are made global).
+    """
+    def __init__(self, store_dir: str):
+        with open(os.path.join(store_dir, INDEX_FILE), "r") as file:
+            self.index = json.load(file)
+
+        if self.index["version"] != FORMAT_VERSION:
+            raise ValueError(f"{store_dir} has version {self.index['version']} of the store, expected {FORMAT_VERSION}")
+
+        self.store_dir          = store_dir
+        self._shards            = [ shard["name"] for shard in self.index["shards"] ]
+        self._sample_starts     = np.cumsum([ 0 ] + [ shard["num_samples"] for shard in self.index["shards"] ])
+        self._node_starts       = np.cumsum([ 0 ] + [ shard["num_nodes"] for shard in self.index["shards"] ])
+        self._edge_starts       = np.cumsum([ 0 ] + [ shard["num_edges"] for shard in self.index["shards"] ])
+        self._columns           = {}
+
+    def __len__(self) -> int:
+        return int(self._sample_starts[-1])
+
+    def get_num_shards(self) -> int:
+        return len(self._shards)
+
+    def get_shard_samples(self, shard_index: int) -> tuple[int, int]:
+        """ Index of the first sample of a shard and of the sample after its last one """
+        return int(self._sample_starts[shard_index]), int(self._sample_starts[shard_index + 1])
+
+    def get_shard_column(self, shard_index: int, name: str) -> np.ndarray:
+        """ Read only memory map of a column of a shard """
+        key = (shard_index, name)
+        if key not in self._columns:
+            if name not in SAMPLE_COLUMNS + NODE_COLUMNS + EDGE_COLUMNS:
+                raise ValueError(f"Unknown column {name}")
+            self._columns[key] = np.load(os.path.join(self.store_dir, self._shards[shard_index], f"{name}.npy"), mmap_mode="r")
+        return self._columns[key]
+
+    def get_column(self, name: str) -> np.ndarray:
+        """ Column over all the shards, e.g. get_column("end_cycle")[get_column("node_offsets")[i]:...] """
+        if self.get_num_shards() == 0:
+            return np.zeros(1 if name.endswith("_offsets") else 0, dtype=np.int64)
+
+        if name in ( "node_offsets", "edge_offsets" ):
+            starts = self._node_starts if name == "node_offsets" else self._edge_starts
+            return np.concatenate([ self.get_shard_column(0, name)[:1] ] +
+                                  [ self.get_shard_column(shard_index, name)[1:] + starts[shard_index]
+                                    for shard_index in range(self.get_num_shards()) ])
+
+        if self.get_num_shards() == 1:
+            return self.get_shard_column(0, name)
+        return np.concatenate([ self.get_shard_column(shard_index, name) for shard_index in range(self.get_num_shards()) ])
+
+    def get_sample(self, index: int) -> dict:
+        """ Sample `index` in the format of src/dataset.py (without the latencies, end_cycles - start_cycles) """
+        if not 0 <= index < len(self):
+            raise IndexError(f"Sample {index} is not in the store ({len(self)} samples)")
+
+        shard_index     = int(np.searchsorted(self._sample_starts, index, side="right")) - 1
+        local_index     = index - self._sample_starts[shard_index]
+        column          = lambda name: self.get_shard_column(shard_index, name)
+
+        node_start, node_end = column("node_offsets")[local_index:local_index + 2]
+        edge_start, edge_end = column("edge_offsets")[local_index:local_index + 2]
+        node_ids        = column("node_id")[node_start:node_end].tolist()
+
+        return dict( graph_type     = str(column("graph_type")[local_index]),
+                     density        = str(column("density")[local_index]),
+                     graph_seed     = int(column("graph_seed")[local_index]),
+                     nodes          = np.stack([ column("node_id")[node_start:node_end],
+                                                 column("processing_time")[node_start:node_end],
+                                                 column("generate")[node_start:node_end] ], axis=1).tolist(),
+                     edges          = [ [ node_ids[source], node_ids[target], weight ] for source, target, weight in
+                                        zip( column("source")[edge_start:edge_end].tolist(),
+                                             column("target")[edge_start:edge_end].tolist(),
+                                             column("weight")[edge_start:edge_end].tolist() ) ],
+                     mapping        = [ [ node_id, x, y ] for node_id, x, y in
+                                        zip( node_ids, column("pe_x")[node_start:node_end].tolist(), column("pe_y")[node_start:node_end].tolist() ) ],
+                     start_cycles   = column("start_cycle")[node_start:node_end].tolist(),
+                     end_cycles     = column("end_cycle")[node_start:node_end].tolist(),
+                     makespan       = int(column("makespan")[local_index]) )
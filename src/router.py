@@ -1,50 +1,238 @@
+import uuid
+
 from typing     import Union
 
-from .buffer    import Buffer
-from .flit      import HeaderFlit, PayloadFlit, TailFlit, NextHop, BufferLocation
+from .buffer    import Buffer, FifoBuffer, FlitCounter
+from .flit      import HeaderFlit, PayloadFlit, TailFlit, NextHop, BufferLocation, Multicast
+from .packet    import PACKET_SIZE
+from .routing   import RoutingAlgorithm, DIRECTION_OFFSETS, get_routing_algorithm
+from .arbitration import FIXED_PRIORITY, SwitchAllocator, get_switch_allocator
+from .topology  import Link
+from .profiler  import call_counter
+
+STORE_AND_FORWARD   = "store_and_forward"
+WORMHOLE            = "wormhole"
+VIRTUAL_CUT_THROUGH = "virtual_cut_through"
+
+SWITCHING_MODES     = ( STORE_AND_FORWARD, WORMHOLE, VIRTUAL_CUT_THROUGH )
+
+_NO_AGE = ( float("inf"), )
+
+
+def _get_age( flit ) -> tuple:
+    """ Age of the packet of `flit` for the switch allocator, empty inputs go last """
+    return _NO_AGE if flit is None else flit.get_sequence()
+
+
+class _MulticastRoute:
+    """
+    Route of a multicast packet that forks in this router, [ output port index, output buffer, header ] per branch.
+    Each branch gets a copy of the flits with its own header (the destinations down that branch). 
+    A flit leaves the input buffer once all the branches have their copy, `pending` are the ones still waiting.
+    """
+    __slots__ = ( "branches", "pending" )
+
+    def __init__(self, branches: list[list]):
+        self.branches   = branches
+        self.pending    = list( branches )
+
+
+def _copy_flit( flit: Union[HeaderFlit, PayloadFlit, TailFlit], header: HeaderFlit ) -> Union[HeaderFlit, PayloadFlit, TailFlit]:
+    """ Copy of `flit` for the branch of `header` """
+    if isinstance( flit, HeaderFlit ):
+        return header
+    if isinstance( flit, TailFlit ):
+        return TailFlit( header )
+    return PayloadFlit( flit._payload_index, header )
+
 
 class Router:
-    def __init__( self, pos: tuple, buffer_size: int = 4, debug_mode: bool = False ):
+    def __init__( 
+            self, 
+            pos         : tuple, 
+            buffer_size : int   = 4, 
+            debug_mode  : bool  = False, 
+            routing     : Union[str, RoutingAlgorithm] = "xy", 
+            switching       : str   = STORE_AND_FORWARD, 
+            num_vcs         : int   = 1, 
+            link_latency    : int   = 0, 
+            pipeline_depth  : int   = 1, 
+            link_width      : int   = 1,
+            arbitration     : str   = FIXED_PRIORITY, 
+            credit_delay    : int   = 0
+        ):
         """ Args; 
             "pos"           : tuple, coordinates of the router  
             "buffer_size"   : int, number of flits that can be stored in a buffer
+            "routing"       : str or RoutingAlgorithm, see routing.ROUTING_ALGORITHMS
+            "switching"     : str, one of SWITCHING_MODES
+                                - store_and_forward: a packet is routed once it is complete in the input buffer.
+                                - wormhole: the header is routed as soon as it arrives, body flits follow it. 
+                                - virtual_cut_through: as wormhole, but the header only advances if 
+                                  the next buffer has room for the whole packet.
+            "num_vcs"       : int, virtual channels (buffers) per router to router port. 
+                              Wormhole and virtual cut-through only, the local ports have one channel.
+            "link_latency"  : int, cycles a flit spends on the links to the neighbours. With 0, a flit 
+                              can cross the link and the router in the same cycle. See set_link_latency.
+            "pipeline_depth": int, cycles from the input buffer to the output buffer (RC/VA/SA/ST stages). 
+            "link_width"    : int, flits per cycle on a link and through the switch, per port.
+            "credit_delay"  : int, extra cycles before a freed input buffer slot can be used again by the 
+                              upstream router (credit based flow control, see _return_credit).
+                              The last four are for wormhole and virtual cut-through only.
+            "arbitration"   : str, switch allocation policy between the inputs, see arbitration.SWITCH_ALLOCATORS
+                                - fixed_priority: inputs in buffer declaration order (local, west, north, east, south).
+                                - round_robin: the input after the last one served goes first.
+                                - age: the input with the oldest packet goes first.
         """
+        if switching not in SWITCHING_MODES:
+            raise ValueError(f"Unknown switching mode {switching}. Available: {SWITCHING_MODES}")
+
+        if switching == VIRTUAL_CUT_THROUGH and buffer_size < PACKET_SIZE:
+            raise ValueError(f"Virtual cut-through needs buffers of atleast {PACKET_SIZE} flits")
+
+        if num_vcs < 1 or ( num_vcs > 1 and switching == STORE_AND_FORWARD ):
+            raise ValueError(f"Virtual channels need wormhole or virtual cut-through switching")
+
+        if link_latency < 0 or pipeline_depth < 1 or link_width < 1 or credit_delay < 0:
+            raise ValueError(f"Need link_latency >= 0, pipeline_depth >= 1, link_width >= 1 and credit_delay >= 0")
+
+        if switching == STORE_AND_FORWARD and ( link_latency, pipeline_depth, link_width, credit_delay ) != ( 0, 1, 1, 0 ):
+            raise ValueError(f"Link latency, pipeline depth, link width and credit delay need wormhole or virtual cut-through switching")
+
         self._x = pos[0]
         self._y = pos[1]
 
         self._debug_mode = debug_mode
+        self._switching  = switching
+
+        # Flits in all the input / output buffers, lets the flit level switching skip idle stages
+        self._input_flit_counter    = FlitCounter()
+        self._output_flit_counter   = FlitCounter()
+
+        if switching == STORE_AND_FORWARD:
+            input_buffer    = lambda name: Buffer( buffer_size, name=name )
+            output_buffer   = input_buffer
+        else:
+            input_buffer    = lambda name: FifoBuffer( buffer_size, name=name, counter=self._input_flit_counter )
+            output_buffer   = lambda name: FifoBuffer( buffer_size, name=name, counter=self._output_flit_counter )
 
-        self._local_input_buffer    = Buffer( buffer_size, name="local_input"  )
-        self._local_output_buffer   = Buffer( buffer_size, name="local_output" )
+        self._local_input_buffer    = input_buffer( "local_input"  )
+        self._local_output_buffer   = output_buffer( "local_output" )
 
-        self._west_input_buffer     = Buffer( buffer_size, name="west_input"  )
-        self._west_output_buffer    = Buffer( buffer_size, name="west_output" )
+        self._west_input_buffer     = input_buffer( "west_input"  )
+        self._west_output_buffer    = output_buffer( "west_output" )
 
-        self._north_input_buffer    = Buffer( buffer_size, name="north_input"  )
-        self._north_output_buffer   = Buffer( buffer_size, name="north_output" )
+        self._north_input_buffer    = input_buffer( "north_input"  )
+        self._north_output_buffer   = output_buffer( "north_output" )
 
-        self._east_input_buffer     = Buffer( buffer_size, name="east_input"  )
-        self._east_output_buffer    = Buffer( buffer_size, name="east_output" )
+        self._east_input_buffer     = input_buffer( "east_input"  )
+        self._east_output_buffer    = output_buffer( "east_output" )
 
-        self._south_input_buffer    = Buffer( buffer_size, name="south_input"  ) 
-        self._south_output_buffer   = Buffer( buffer_size, name="south_output" )
+        self._south_input_buffer    = input_buffer( "south_input"  ) 
+        self._south_output_buffer   = output_buffer( "south_output" )
 
         self._input_buffers         = []
         self._output_buffers        = []
 
         self._mapping_list          = []
+        self._task_positions        = {} # task id -> (x, y), built from the mapping list
+
+        self._flit_event_count      = 0 # Running total of flit moves and routing, used for deadlock detection
+
+        self._routing               = get_routing_algorithm( routing )
+        self._route_table           = {} # destination (x, y) -> candidate outputs, see _get_route_candidates
+        self._multicast_table       = {} # ( Multicast, in source column ) -> branches, see _get_multicast_branches
+        self._neighbours            = {} # output direction -> neighbour router, see set_neighbours
+        self._links                 = { direction: Link( ( self._x + dx, self._y + dy ), next_input ) # Mesh by default
+                                        for direction, ( dx, dy, next_input ) in DIRECTION_OFFSETS.items() }
+
+        self._input_buffer_lookup   = {} # direction -> input buffer (first virtual channel)
+        self._output_buffer_lookup  = {} # direction -> output buffer (first virtual channel)
+
+        # Wormhole and virtual cut-through only. Packets span several routers, so the 
+        # route is kept per input buffer instead of in the header flit.
+        self._num_vcs               = num_vcs
+        self._input_vcs             = {} # direction -> input buffers, one per virtual channel
+        self._output_vcs            = {} # direction -> output buffers, one per virtual channel
+        self._input_routes          = {} # input buffer -> ( output direction, output buffer ) of the packet at its front
+        self._output_owners         = {} # output buffer -> input buffer it is allocated to
+        self._input_ports           = [] # input virtual channels of each port, see _populate_virtual_channels
+        self._output_ports          = None # see set_neighbours
+        self._output_port_indices   = {} # direction -> index in _output_ports
+        self._input_rr_pointers     = [] # port index -> next input virtual channel to serve
+        self._output_rr_pointers    = [] # port index -> next output virtual channel to serve
+
+        # Adaptive routing that is not deadlock free by itself keeps the first virtual channel 
+        # as an escape channel, only used in the dimension order (XY) direction (Duato's protocol).
+        self._has_escape_vc         = num_vcs > 1 and not self._routing.is_deadlock_free
+        self._escape_routing        = get_routing_algorithm( "xy" )
+
+        # Rings of the torus and the ring topology split the virtual channels in two classes, 
+        # packets move to the upper class after crossing the dateline (see _allocate_output_vc)
+        self._has_dateline_vcs      = False
+        self._port_directions       = [] # port index -> direction
+
+        # Timing of the flit level switching
+        self._pipeline_depth        = pipeline_depth
+        self._link_width            = link_width
+        self._link_latencies        = [] # port index -> cycles on the link, see set_link_latency
+        self._cycle                 = 0  # Advanced in forward_output_buffer_flits
+        self._arrivals              = {} # cycle -> [ ( buffer, flit ) ] delayed flits, see _schedule_arrival
+
+        # Credit based flow control between the routers (flit level switching). An output virtual channel 
+        # has a credit per free slot in the input virtual channel of the neighbour, the neighbour returns it 
+        # when the flit leaves that slot. The routers never look into the buffers of their neighbours.
+        self._buffer_size           = buffer_size
+        self._credit_delay          = credit_delay
+        self._credits               = [] # port index -> credits per output virtual channel, None for the local port
+        self._upstream_ports        = [] # port index -> ( upstream router, its output port index ), see set_neighbours
+        self._credit_arrivals       = {} # cycle -> [ ( port index, vc index ) ] delayed credits, see _return_credit
+
+        self._switch_allocator      = get_switch_allocator( arbitration )
+        self._starvation_cycles     = {} # input buffer -> cycles it lost the switch to another input
 
         self._populate_buffer_lists()
+        self._populate_virtual_channels( buffer_size, link_latency )
 
     def clear(self) -> None:
         """Clears the buffers of the router."""
+        self.reset()
+        self._mapping_list.clear()
+        self._task_positions.clear()
+
+    def reset(self, clear_buffers: bool = True) -> None:
+        """
+        Run state back to the start of a simulation, the mapping is kept. 
+        A router without traffic in the last run only needs its cycle reset, `clear_buffers=False` (see Simulator.reset).
+        """
+        self._cycle = 0
+
+        if not clear_buffers:
+            return
+
         for buffer in self._input_buffers:
             buffer.clear()
 
         for buffer in self._output_buffers:
             buffer.clear()
 
-        self._mapping_list.clear()
+        self._input_routes.clear()
+        self._output_owners.clear()
+        self._flit_event_count = 0
+
+        for port_index in range(len(self._input_ports)):
+            self._input_rr_pointers[port_index]     = 0
+            self._output_rr_pointers[port_index]    = 0
+
+        self._arrivals.clear()
+
+        self._credit_arrivals.clear()
+        for credits in self._credits:
+            if credits is not None:
+                credits[:] = [ self._buffer_size ] * len(credits)
+
+        self._switch_allocator.clear()
+        self._starvation_cycles.clear()
 
     def process( self ) -> None:
         """ - Process the flits in the input buffer first 
@@ -52,8 +240,12 @@ class Router:
             - Receive New flits 
                 - receive_flits() """
 
-        self._forward_input_buffer_flits()
-        self.management()
+        if self._switching == STORE_AND_FORWARD:
+            self._forward_input_buffer_flits()
+            self.management()
+        else:
+            # FifoBuffer needs no management
+            self._switch_input_buffer_flits()
 
 
     def _forward_output_and_process( self, router_lookup, pe_lookup) -> None:
@@ -72,7 +264,76 @@ class Router:
         Needs mapping list to compute the routing of packets based on destination 
         task id. 
         """
-        self._mapping_list = mapping_list
+        self._mapping_list      = mapping_list
+        self._task_positions    = { map.task.task_id: map.assigned_pe for map in mapping_list }
+        self._multicast_table   = {}
+
+        # Route table only depends on the destination, entries are kept between mappings
+        for dest in set( self._task_positions.values() ):
+            self._get_route_candidates( dest )
+
+    def set_neighbours(self, router_lookup: dict, links: dict[BufferLocation, Link] = None) -> None:
+        """
+        Neighbour routers are used by the adaptive routing algorithms
+        to select the output with the least occupied downstream buffer.
+        `links` connects the ports to the neighbours (see topology.Topology.get_links), 
+        by default the ports lead to the adjacent positions of the mesh.
+        """
+        if links is not None:
+            self._links = dict( links )
+
+        self._neighbours = {}
+        for direction, link in self._links.items():
+            neighbour = router_lookup.get( link.neighbour )
+            if neighbour is not None:
+                self._neighbours[direction] = neighbour
+
+        self._has_dateline_vcs = self._num_vcs > 1 and any( link.ring is not None for link in self._links.values() )
+
+        # ( direction, output virtual channels, neighbour, input port index of the neighbour )
+        # The local port leads to the PE, the ports on the edge of the mesh have no neighbour.
+        self._output_ports      = []
+        self._credits           = []
+        self._upstream_ports    = []
+        for direction, output_vcs in self._output_vcs.items():
+            neighbour = self._neighbours.get( direction )
+
+            if neighbour is None:
+                self._output_ports.append( ( direction, output_vcs, None, None ) )
+                self._credits.append( None )
+                self._upstream_ports.append( None )
+                continue
+
+            # Links are bidirectional, the input port of the same direction is fed by the same neighbour
+            next_port = neighbour._output_port_indices[ self._links[direction].next_input ]
+            self._output_ports.append( ( direction, output_vcs, neighbour, next_port ) )
+            self._credits.append( [ self._buffer_size ] * len(output_vcs) )
+            self._upstream_ports.append( ( neighbour, next_port ) )
+
+    def get_neighbours(self) -> dict:
+        return self._neighbours
+
+    def set_link_latency(self, direction: BufferLocation, latency: int) -> None:
+        """Cycles a flit spends on the link from this router towards `direction`."""
+        if latency < 0 or ( latency > 0 and self._switching == STORE_AND_FORWARD ):
+            raise ValueError(f"Link latency needs wormhole or virtual cut-through switching")
+        self._link_latencies[ self._output_port_indices[direction] ] = latency
+
+    def get_routing_algorithm(self) -> RoutingAlgorithm:
+        return self._routing
+
+    def get_switch_allocator(self) -> SwitchAllocator:
+        return self._switch_allocator
+
+    def get_starvation_cycles(self) -> dict[str, int]:
+        """
+        Cycles each input buffer had a flit for an output that was given to another input 
+        in the same cycle. Only the inputs that lost atleast once.
+        """
+        return { self.get_buffer_label( buffer ): cycles for buffer, cycles in self._starvation_cycles.items() }
+
+    def _record_starvation(self, buffer: Buffer) -> None:
+        self._starvation_cycles[buffer] = self._starvation_cycles.get( buffer, 0 ) + 1
 
     def _filter_required_flits( self, flit_list: list[Union[HeaderFlit, PayloadFlit, TailFlit]] ) -> list[Union[HeaderFlit, PayloadFlit, TailFlit]]:
         """Filter the flits that are required by the router."""
@@ -95,6 +356,9 @@ class Router:
         If there are, check if the next router has space in the input buffer.
         If it does, remove the flit from the output buffer and return it. 
         """
+        if self._switching != STORE_AND_FORWARD:
+            self._forward_output_buffer_flits_cut_through( router_lookup, pe_lookup )
+            return
 
         for buffer in self._output_buffers:
             top_flit = buffer.peek()
@@ -117,6 +381,7 @@ class Router:
                     self._debug_print( f"Forwading: "+ f"{buffer}".split()[0] +" -> PE" )
                     flit = buffer.remove()
                     pe.receive_flits( flit )
+                    self._flit_event_count += 1
                     # buffer.fill_emtpy_slots()
 
                 self._debug_print( f"Local output: {buffer}" )
@@ -139,6 +404,7 @@ class Router:
 
                 flit = buffer.remove()
                 next_router._receive_flit( flit )
+                self._flit_event_count += 1
 
 
     def _forward_input_buffer_flits( self ) -> None:
@@ -149,8 +415,14 @@ class Router:
         for flits from the PE, routing information is updated.
         """
 
-        for buffer in self._input_buffers:
+        input_buffers   = self._input_buffers
+        allocator       = self._switch_allocator
+        granted_outputs = [] # Output buffers that received a flit in this cycle
+
+        order = allocator.get_order( len(input_buffers), lambda index: _get_age( input_buffers[index].peek() ) )
 
+        for index in order:
+            buffer     = input_buffers[index]
             top_flit   = buffer.peek()
 
             if not buffer.can_transmit_flit(): 
@@ -166,6 +438,7 @@ class Router:
                     continue
 
                 self._compute_routing( buffer )
+                self._flit_event_count += 1
                 next_hop_location   = top_flit.get_routing_info().output_buffer
 
                 if buffer.get_name() == "local_input": 
@@ -180,9 +453,551 @@ class Router:
 
                 flit = buffer.remove()
                 next_buffer.add_flit( flit )    
+                self._flit_event_count += 1
+                allocator.record_grant( index )
+                granted_outputs.append( next_buffer )
 
                 self._debug_print(f"\t-> {next_buffer}", with_tag=False)
 
+            elif any( next_buffer is granted for granted in granted_outputs ):
+                self._record_starvation( buffer )
+
+
+    def _forward_output_buffer_flits_cut_through( self, router_lookup: dict, pe_lookup: dict ) -> None:
+        """
+        Wormhole and virtual cut-through. The direction of the output buffer gives
+        the next router, output virtual channel i feeds the input virtual channel i of the next router.
+        Up to `link_width` flits per link per cycle, the virtual channels of a link are served round-robin.
+        A flit needs a credit of its output virtual channel (with virtual cut-through, the header needs 
+        credits for the whole packet). Flits with link latency arrive later (see _receive_link_flit).
+        """
+        self._cycle += 1
+        if self._arrivals:
+            self._deliver_arrivals()
+        if self._credit_arrivals:
+            self._deliver_credits()
+
+        if self._output_flit_counter.count == 0:
+            return
+
+        if self._output_ports is None:
+            self.set_neighbours( router_lookup )
+
+        width           = self._link_width
+        rr_pointers     = self._output_rr_pointers
+        header_credits  = PACKET_SIZE if self._switching == VIRTUAL_CUT_THROUGH else 1
+
+        for port_index, ( direction, output_vcs, neighbour, next_port ) in enumerate(self._output_ports):
+            num_vcs = len(output_vcs)
+            start   = rr_pointers[port_index]
+            offset  = 0
+            sent    = 0
+
+            while sent < width and offset < num_vcs:
+                vc_index = start + offset
+                if vc_index >= num_vcs:
+                    vc_index -= num_vcs
+
+                buffer = output_vcs[vc_index]
+                if not buffer.queue:
+                    offset += 1
+                    continue
+
+                top_flit = buffer.queue[0]
+
+                if direction is BufferLocation.LOCAL:
+                    pe = pe_lookup.get( ( self._x, self._y ) )
+
+                    if pe.is_input_buffer_full():
+                        offset += 1
+                        continue
+
+                    self._debug_print( f"Forwading: {buffer.get_name()} -> PE" )
+                    pe.receive_flits( buffer.remove() )
+
+                else:
+                    credits = self._credits[port_index]
+                    if credits[vc_index] < ( header_credits if isinstance( top_flit, HeaderFlit ) else 1 ):
+                        offset += 1
+                        continue
+
+                    self._debug_print( f"Forwarding flit \"{top_flit}\" {buffer.get_name()} -> {neighbour}" )
+
+                    credits[vc_index] -= 1
+                    latency = self._link_latencies[port_index]
+                    neighbour._receive_link_flit( next_port, vc_index, buffer.remove(), 
+                                                  self._cycle + latency if latency else None )
+
+                self._flit_event_count     += 1
+                sent                       += 1
+                rr_pointers[port_index]     = vc_index + 1 if vc_index + 1 < num_vcs else 0
+
+    def _switch_input_buffer_flits( self ) -> None:
+        """
+        Wormhole and virtual cut-through. 
+        - VC allocation: the header is routed as soon as it reaches the front of an input buffer, 
+          and gets an output virtual channel until its tail has left the input buffer. 
+          A header that cannot be allocated retries in the next cycle.
+        - Switch arbitration: up to `link_width` flits per input port and per output port in a cycle, 
+          the virtual channels of an input port are served round-robin, 
+          the input ports in the order of the switch allocator.
+        - With a pipeline deeper than one stage, flits reach the output buffer `pipeline_depth - 1` cycles later.
+        """
+        if self._input_flit_counter.count == 0:
+            return
+
+        width           = self._link_width
+        output_flits    = [ 0 ] * len(self._input_ports) # Flits sent to each output port in this cycle
+        rr_pointers     = self._input_rr_pointers
+        input_routes    = self._input_routes
+        pipeline_delay  = self._pipeline_depth - 1
+        input_ports     = self._input_ports
+        allocator       = self._switch_allocator
+        upstream_ports  = self._upstream_ports
+        credit_cycle    = self._cycle + 1 + self._credit_delay
+
+        order = allocator.get_order( len(input_ports), lambda index: min( 
+                    ( _get_age( buffer.queue[0] ) for buffer in input_ports[index] if buffer.queue ), default=_NO_AGE ) )
+
+        for port_index in order:
+            input_vcs = input_ports[port_index]
+            num_vcs   = len(input_vcs)
+            start   = rr_pointers[port_index]
+            offset  = 0
+            sent    = 0
+
+            while sent < width and offset < num_vcs:
+                vc_index = start + offset
+                if vc_index >= num_vcs:
+                    vc_index -= num_vcs
+
+                buffer = input_vcs[vc_index]
+                if not buffer.queue:
+                    offset += 1
+                    continue
+
+                top_flit    = buffer.queue[0]
+                route       = input_routes.get( buffer )
+
+                if route is None:
+                    if not isinstance( top_flit, HeaderFlit ):
+                        raise Exception(f"{self} {buffer.get_name()}: flit without route is not a HeaderFlit. Cannot do routing.")
+
+                    if top_flit.get_destination().__class__ is Multicast:
+                        route = self._allocate_multicast_route( top_flit, port_index, vc_index )
+                    else:
+                        route = self._allocate_output_vc( top_flit, port_index, vc_index )
+
+                    if route is None:
+                        offset += 1
+                        continue
+
+                    input_routes[buffer]            = route
+                    self._flit_event_count         += 1
+
+                    if route.__class__ is _MulticastRoute:
+                        for _, output_buffer, _ in route.branches:
+                            self._output_owners[output_buffer] = buffer
+                        self._debug_print( f"Routing packet in {buffer.get_name()} to {len(route.branches)} branches" )
+                    else:
+                        self._output_owners[route[1]] = buffer
+                        self._debug_print( f"Routing packet in {buffer.get_name()} to {route[1].get_name()}" )
+
+                if route.__class__ is _MulticastRoute:
+                    flit = self._forward_multicast_flit( buffer, route, output_flits )
+                    if flit is None:
+                        offset += 1
+                        continue
+
+                else:
+                    output_port, output_buffer = route
+
+                    if output_flits[output_port] >= width:
+                        self._record_starvation( buffer )
+                        offset += 1
+                        continue
+
+                    if not self._can_advance( top_flit, output_buffer ):
+                        offset += 1
+                        continue
+
+                    self._debug_print( f"Forwading flit \"{top_flit}\" from {buffer.get_name()} -> {output_buffer.get_name()}" )
+
+                    flit = buffer.remove()
+                    self._add_output_flit( output_buffer, flit, pipeline_delay )
+                    output_flits[output_port]  += 1
+
+                upstream = upstream_ports[port_index]
+                if upstream is not None:
+                    upstream[0]._return_credit( upstream[1], vc_index, credit_cycle )
+
+                self._flit_event_count     += 1
+                sent                       += 1
+                rr_pointers[port_index]     = vc_index + 1 if vc_index + 1 < num_vcs else 0
+                allocator.record_grant( port_index )
+
+                if isinstance( flit, TailFlit ):
+                    del input_routes[buffer]
+                    if route.__class__ is _MulticastRoute:
+                        for _, output_buffer, _ in route.branches:
+                            self._output_owners[output_buffer] = None
+                    else:
+                        self._output_owners[output_buffer] = None
+
+    def _add_output_flit( self, output_buffer: FifoBuffer, flit: Union[HeaderFlit, PayloadFlit, TailFlit], 
+                          pipeline_delay: int ) -> None:
+        if pipeline_delay == 0:
+            output_buffer.add_flit( flit )
+        else:
+            # Flits added now leave in the next cycle, delayed ones `pipeline_delay` cycles after that
+            output_buffer.reserve()
+            self._schedule_arrival( self._cycle + 1 + pipeline_delay, output_buffer, flit )
+
+    def _forward_multicast_flit( self, buffer: FifoBuffer, route: _MulticastRoute, 
+                                 output_flits: list[int] ) -> Union[HeaderFlit, PayloadFlit, TailFlit]:
+        """
+        Copies the flit at the front of `buffer` to the branches that can take it. 
+        Returns the flit once all the branches have a copy (removed from `buffer`), None otherwise.
+        """
+        top_flit    = buffer.queue[0]
+        is_starved  = False
+
+        for branch in list( route.pending ):
+            output_port, output_buffer, header = branch
+
+            if output_flits[output_port] >= self._link_width:
+                is_starved = True
+                continue
+
+            if not self._can_advance( top_flit, output_buffer ):
+                continue
+
+            self._debug_print( f"Forwading copy of \"{top_flit}\" from {buffer.get_name()} -> {output_buffer.get_name()}" )
+
+            self._add_output_flit( output_buffer, _copy_flit( top_flit, header ), self._pipeline_depth - 1 )
+            output_flits[output_port]  += 1
+            self._flit_event_count     += 1
+            route.pending.remove( branch )
+
+        if is_starved:
+            self._record_starvation( buffer )
+
+        if route.pending:
+            return None
+
+        route.pending = list( route.branches )
+        return buffer.remove()
+
+    def _schedule_arrival( self, cycle: int, buffer: FifoBuffer, flit: Union[HeaderFlit, PayloadFlit, TailFlit] ) -> None:
+        """
+        Delay queue indexed by cycle, the flit is added to its (reserved) slot in `buffer` 
+        at the start of `cycle`. Only the cycles with arrivals are touched.
+        """
+        arrivals = self._arrivals.get( cycle )
+        if arrivals is None:
+            self._arrivals[cycle] = [ ( buffer, flit ) ]
+        else:
+            arrivals.append( ( buffer, flit ) )
+
+    def _receive_link_flit( self, port_index: int, vc_index: int, flit: Union[HeaderFlit, PayloadFlit, TailFlit], 
+                            cycle: int = None ) -> None:
+        """
+        Flit sent by the upstream router to input virtual channel `vc_index` of `port_index`, 
+        added at the start of `cycle`, right away for None (no link latency). 
+        The upstream router had a credit, so there is room for it.
+        """
+        buffer = self._input_ports[port_index][vc_index]
+
+        if cycle is None:
+            buffer.add_flit( flit )
+        else:
+            buffer.reserve()
+            self._schedule_arrival( cycle, buffer, flit )
+
+    def _return_credit( self, port_index: int, vc_index: int, cycle: int ) -> None:
+        """
+        The neighbour freed a slot of the input virtual channel fed by output `vc_index` of `port_index`.
+        The credit can be used from `cycle`, the next cycle is right away.
+        """
+        if cycle <= self._cycle + 1:
+            self._credits[port_index][vc_index] += 1
+            return
+
+        credits = self._credit_arrivals.get( cycle )
+        if credits is None:
+            self._credit_arrivals[cycle] = [ ( port_index, vc_index ) ]
+        else:
+            credits.append( ( port_index, vc_index ) )
+
+    def _deliver_credits( self ) -> None:
+        # Credits on their way back are progress as well, counted for the deadlock detection
+        self._flit_event_count += 1
+
+        credits = self._credit_arrivals.pop( self._cycle, None )
+        if credits is None:
+            return
+
+        for port_index, vc_index in credits:
+            self._credits[port_index][vc_index] += 1
+
+    def _deliver_arrivals( self ) -> None:
+        # Flits on the links or in the pipeline are moving, counted for the deadlock detection
+        self._flit_event_count += 1
+
+        arrivals = self._arrivals.pop( self._cycle, None )
+        if arrivals is None:
+            return
+
+        for buffer, flit in arrivals:
+            buffer.add_reserved_flit( flit )
+
+    def _allocate_output_vc( self, header_flit: HeaderFlit, port_index: int = 0, vc_index: int = 0 ) -> tuple[int, FifoBuffer]:
+        """
+        Returns a free ( output port index, output virtual channel ) for the packet, None if there is none.
+        Candidate directions are tried from the least loaded (see _get_port_occupancy), then the escape channel.
+        `port_index` and `vc_index` are where the header is now, used for the dateline classes.
+        """
+        if call_counter.active:
+            call_counter._allocate_output_vc += 1
+        dest                = self._get_pos_from_mapping( header_flit.get_destination() )
+        is_source_column    = header_flit.get_source_xy()[0] == self._x
+        candidates          = self._get_route_candidates( dest )[is_source_column]
+
+        if len(candidates) > 1:
+            candidates = sorted( candidates, key=self._get_port_occupancy )
+
+        for direction in candidates:
+            output_buffer = self._get_free_output_vc( direction, port_index, vc_index )
+            if output_buffer is not None:
+                return self._output_port_indices[direction], output_buffer
+
+        if self._has_escape_vc:
+            direction       = self._escape_routing.get_candidates( ( self._x, self._y ), dest )[0]
+            output_buffer   = self._output_vcs[direction][0]
+            if self._output_owners.get( output_buffer ) is None:
+                return self._output_port_indices[direction], output_buffer
+
+        return None
+
+    def _get_free_output_vc( self, direction: BufferLocation, port_index: int, vc_index: int ) -> FifoBuffer:
+        """ First free output virtual channel of `direction` for a packet in `vc_index` of `port_index`, None if there is none """
+        output_vcs = self._output_vcs[direction]
+        if direction is not BufferLocation.LOCAL:
+            if self._has_escape_vc:
+                output_vcs = output_vcs[1:]
+
+            if self._has_dateline_vcs:
+                output_vcs = self._get_dateline_vcs( direction, output_vcs, port_index, vc_index )
+
+        for output_buffer in output_vcs:
+            if self._output_owners.get( output_buffer ) is None:
+                return output_buffer
+
+        return None
+
+    def _allocate_multicast_route( self, header_flit: HeaderFlit, port_index: int = 0, 
+                                   vc_index: int = 0 ) -> Union[tuple[int, FifoBuffer], _MulticastRoute]:
+        """
+        Same as _allocate_output_vc for a multicast packet. Where the packet forks, it gets an output virtual 
+        channel for every branch at once or none of them (no channel is held while waiting for the others).
+        """
+        if call_counter.active:
+            call_counter._allocate_multicast_route += 1
+        branches = self._get_multicast_branches( header_flit )
+        channels = []
+
+        for direction, _ in branches:
+            output_buffer = self._get_free_output_vc( direction, port_index, vc_index )
+            if output_buffer is None:
+                return None
+            channels.append( ( self._output_port_indices[direction], output_buffer ) )
+
+        if len(branches) == 1:
+            return channels[0] # All the destinations are down the same output
+
+        return _MulticastRoute( [ [ output_port, output_buffer, 
+                                    HeaderFlit( src_xy=header_flit.get_source_xy(), dest_id=dest_id, packet_uid=uuid.uuid4(), 
+                                                source_task_id=header_flit.get_source_task_id(), 
+                                                sequence=header_flit.get_sequence() ) ]
+                                  for ( output_port, output_buffer ), ( _, dest_id ) in zip( channels, branches ) ] )
+
+    def _get_multicast_branches( self, header_flit: HeaderFlit ) -> list[tuple[BufferLocation, object]]:
+        """
+        ( output direction, destination ) of the branches of a multicast packet in this router. 
+        The destinations are grouped by the first route candidate towards them, one copy goes to the local PE. 
+        A branch with a single task is a unicast packet from there.
+        """
+        multicast           = header_flit.get_destination()
+        is_source_column    = header_flit.get_source_xy()[0] == self._x
+        branches            = self._multicast_table.get( ( multicast, is_source_column ) )
+
+        if branches is None:
+            groups = {}
+            for task_id in multicast.task_ids:
+                dest        = self._get_pos_from_mapping( task_id )
+                direction   = self._get_route_candidates( dest )[is_source_column][0]
+                groups.setdefault( direction, [] ).append( task_id )
+
+            branches = [ ( direction, task_ids[0] if len(task_ids) == 1 else Multicast( tuple(task_ids) ) ) 
+                         for direction, task_ids in groups.items() ]
+            self._multicast_table[ ( multicast, is_source_column ) ] = branches
+
+        return branches
+
+    def _get_dateline_vcs( self, direction: BufferLocation, output_vcs: list[FifoBuffer], 
+                           port_index: int, vc_index: int ) -> list[FifoBuffer]:
+        """
+        The lower half of the virtual channels before the dateline of a ring, the upper half after it.
+        A packet stays in the upper half while it goes on in the same ring. 
+        Minimal routes cross a dateline atmost once per ring, which breaks the cycle of the ring.
+        """
+        link = self._links[direction]
+        if link.ring is None:
+            return output_vcs
+
+        half        = self._num_vcs // 2
+        in_link     = self._links.get( self._port_directions[port_index] )
+        crossed     = vc_index >= half and in_link is not None and in_link.ring == link.ring
+
+        return output_vcs[half:] if link.is_dateline or crossed else output_vcs[:half]
+
+    def _can_advance( self, flit: Union[HeaderFlit, PayloadFlit, TailFlit], next_buffer: FifoBuffer ) -> bool:
+        """ With virtual cut-through, the header only advances if the whole packet fits in the next buffer. """
+        if self._switching == VIRTUAL_CUT_THROUGH and isinstance( flit, HeaderFlit ):
+            return next_buffer.get_free_slots() >= PACKET_SIZE
+
+        return not next_buffer.is_full()
+
+    def _has_credits( self, flit: Union[HeaderFlit, PayloadFlit, TailFlit], port_index: int, vc_index: int ) -> bool:
+        """ Same as _can_advance, for the input buffer of the neighbour """
+        if self._switching == VIRTUAL_CUT_THROUGH and isinstance( flit, HeaderFlit ):
+            return self._credits[port_index][vc_index] >= PACKET_SIZE
+
+        return self._credits[port_index][vc_index] > 0
+
+    def get_flit_event_count( self ) -> int:
+        """Running total of the flits moved and routed by this router since the last clear."""
+        return self._flit_event_count
+
+    def get_wait_for_edges( self, router_lookup: dict, pe_lookup: dict ) -> list[tuple[str, str]]:
+        """
+        Returns (blocked buffer, buffer it waits on) pairs for the buffers of this router. 
+        A buffer is blocked when its top flit is routed but the next buffer 
+        is full or cannot register a new packet. 
+        Buffers waiting for the rest of a packet (upstream) are not blocked.
+        """
+        if self._switching != STORE_AND_FORWARD:
+            return self._get_wait_for_edges_cut_through( router_lookup, pe_lookup )
+
+        edges = []
+
+        for buffer in self._input_buffers:
+            top_flit = buffer.peek()
+
+            if top_flit is None or not buffer.can_transmit_flit():
+                continue
+
+            output_location = top_flit.get_routing_info().output_buffer
+            if output_location is BufferLocation.UNASSIGNED:
+                continue
+
+            next_buffer = self._get_buffer( direction = output_location, is_input = False )
+            if not next_buffer.can_accept_flit( top_flit ):
+                edges.append( ( self.get_buffer_label( buffer ), self.get_buffer_label( next_buffer ) ) )
+
+        for buffer in self._output_buffers:
+            top_flit = buffer.peek()
+
+            if top_flit is None:
+                continue
+
+            routing_info    = top_flit.get_routing_info()
+            next_hop_loc    = ( routing_info.x, routing_info.y )
+            next_router     = router_lookup.get( next_hop_loc )
+
+            if next_router == self:
+                pe = pe_lookup.get( next_hop_loc )
+                if pe.is_input_buffer_full():
+                    edges.append( ( self.get_buffer_label( buffer ), pe.get_buffer_label( pe.input_network_interface ) ) )
+                continue
+
+            next_buffer = next_router._get_buffer( direction = routing_info.next_input_buffer, is_input = True )
+
+            if next_buffer.is_full() or ( isinstance( top_flit, HeaderFlit ) and not next_buffer._can_accept_new_packet() ):
+                edges.append( ( self.get_buffer_label( buffer ), next_router.get_buffer_label( next_buffer ) ) )
+
+        return edges
+
+    def _get_wait_for_edges_cut_through( self, router_lookup: dict, pe_lookup: dict ) -> list[tuple[str, str]]:
+        """
+        Input buffers wait on the output buffer when it has no space. A header without an output 
+        virtual channel waits on the input buffers holding the channels it can use.
+        Output buffers wait on the next input buffer or the PE.
+        """
+        edges = []
+
+        for buffer in self._input_buffers:
+            top_flit = buffer.peek()
+
+            if top_flit is None:
+                continue
+
+            route = self._input_routes.get( buffer )
+
+            if route is None:
+                for owner in self._get_blocking_owners( top_flit ):
+                    edges.append( ( self.get_buffer_label( buffer ), self.get_buffer_label( owner ) ) )
+
+            elif route.__class__ is _MulticastRoute:
+                for _, output_buffer, _ in route.pending:
+                    if not self._can_advance( top_flit, output_buffer ):
+                        edges.append( ( self.get_buffer_label( buffer ), self.get_buffer_label( output_buffer ) ) )
+
+            elif not self._can_advance( top_flit, route[1] ):
+                edges.append( ( self.get_buffer_label( buffer ), self.get_buffer_label( route[1] ) ) )
+
+        if self._output_ports is None:
+            self.set_neighbours( router_lookup )
+
+        for port_index, ( direction, output_vcs, neighbour, next_port ) in enumerate(self._output_ports):
+            for vc_index, buffer in enumerate(output_vcs):
+                top_flit = buffer.peek()
+
+                if top_flit is None:
+                    continue
+
+                if direction is BufferLocation.LOCAL:
+                    pe = pe_lookup.get( ( self._x, self._y ) )
+                    if pe.is_input_buffer_full():
+                        edges.append( ( self.get_buffer_label( buffer ), pe.get_buffer_label( pe.input_network_interface ) ) )
+                    continue
+
+                if not self._has_credits( top_flit, port_index, vc_index ):
+                    next_buffer = neighbour._input_ports[next_port][vc_index]
+                    edges.append( ( self.get_buffer_label( buffer ), neighbour.get_buffer_label( next_buffer ) ) )
+
+        return edges
+
+    def _get_blocking_owners( self, header_flit: HeaderFlit ) -> list[FifoBuffer]:
+        """ Input buffers holding the output virtual channels the header could be allocated to. """
+        if header_flit.get_destination().__class__ is Multicast:
+            directions = [ direction for direction, _ in self._get_multicast_branches( header_flit ) ]
+        else:
+            dest        = self._get_pos_from_mapping( header_flit.get_destination() )
+            directions  = self._get_route_candidates( dest )[ header_flit.get_source_xy()[0] == self._x ]
+
+        owners = []
+
+        for direction in directions:
+            for output_buffer in self._output_vcs[direction]:
+                owner = self._output_owners.get( output_buffer )
+                if owner is not None:
+                    owners.append( owner )
+
+        return owners
+
+    def get_buffer_label( self, buffer: Buffer ) -> str:
+        return f"{self} {buffer.get_name()}"
 
     def management( self ) -> None:
         
@@ -223,7 +1038,7 @@ class Router:
     def _update_routing( self, flit: TailFlit, buffer_name: str) -> None: 
         """
         Updates the routing information of the flit based on the header flit destination.
-        Calls _xy_routing function
+        Calls _compute_next_hop function
         """
 
         if not isinstance( flit, TailFlit ):
@@ -231,85 +1046,102 @@ class Router:
 
         header_flit_pointer = flit.get_header_pointer() # Flit here is a TailFlit
 
-        next_hop_info       = self._xy_routing( header_flit_pointer )
+        next_hop_info       = self._compute_next_hop( header_flit_pointer )
 
         header_flit_pointer.update_routing_info( next_hop_info )
         self._debug_print( f"Routing packet in {buffer_name} to {next_hop_info}" )
 
     def _get_buffer(self, direction:BufferLocation, is_input:bool) -> Buffer:
-        """Returns the buffer based on the direction(str) and input/output flag (bool)."""
-        direction_str = direction.value
-        attributes = vars( self )
-        for attr_name, attr_value in attributes.items():
-            if isinstance( attr_value, Buffer ):
-                if direction_str in attr_name:
-                    if is_input and "input" in attr_name:
-                        return attr_value
-                    elif not is_input and "output" in attr_name:
-                        return attr_value
-
-    def _xy_routing( self, header_flit: HeaderFlit) -> NextHop:
+        """Returns the buffer based on the direction and input/output flag (bool)."""
+        if is_input:
+            return self._input_buffer_lookup.get( direction )
+        return self._output_buffer_lookup.get( direction )
+
+    def _compute_next_hop( self, header_flit: HeaderFlit) -> NextHop:
         """ 
         Returns the routing information from the flit.
-        Computes the x and y coordinates of the next hop based on the destination.
+        The candidate outputs come from the route table, adaptive algorithms 
+        can return several and the least loaded one is selected.
         Also computes which buffer the flit should be forwarded to.
         """
+        if call_counter.active:
+            call_counter._compute_next_hop += 1
 
-        dest_id = header_flit.get_destination()
-        
-        dest_x, dest_y = self._get_pos_from_mapping( dest_id )
-
-        # For X-axis
-        if dest_x > self._x:    # Destination on east
-            next_hop_x  = self._x + 1
-            return NextHop( 
-                x                   = next_hop_x, 
-                y                   = self._y, 
-                output_buffer       = BufferLocation.EAST, 
-                next_input_buffer   = BufferLocation.WEST )
-            
-        elif dest_x < self._x:  # Destination on west
-            next_hop_x  = self._x - 1
-            return NextHop( 
-                x                   = next_hop_x, 
-                y                   = self._y, 
-                output_buffer       = BufferLocation.WEST, 
-                next_input_buffer   = BufferLocation.EAST )
-
-        else:                   # Destination on the same x-axis
-            next_hop_x = self._x
+        dest_id             = header_flit.get_destination()
+        dest                = self._get_pos_from_mapping( dest_id )
 
-        # For Y-axis
-        if dest_y > self._y:    # Destination on north
-            next_hop_y  = self._y + 1
-            return NextHop( 
-                x                   = next_hop_x, 
-                y                   = next_hop_y, 
-                output_buffer       = BufferLocation.NORTH, 
-                next_input_buffer   = BufferLocation.SOUTH )
+        is_source_column    = header_flit.get_source_xy()[0] == self._x
+        candidates          = self._get_route_candidates( dest )[is_source_column]
 
-        elif dest_y < self._y:  # Destination on south
-            next_hop_y  = self._y - 1
-            return NextHop( 
-                x                   = next_hop_x, 
-                y                   = next_hop_y, 
-                output_buffer       = BufferLocation.SOUTH, 
-                next_input_buffer   = BufferLocation.NORTH )
+        if len(candidates) == 1:
+            output_buffer = candidates[0]
+        else:
+            output_buffer = self._select_output( candidates )
 
-        else:                   # Destination on the same y-axis
+        if output_buffer is BufferLocation.LOCAL:
             return NextHop( 
-                x                   = next_hop_x, 
+                x                   = self._x, 
                 y                   = self._y, 
                 output_buffer       = BufferLocation.LOCAL, 
                 next_input_buffer   = BufferLocation.UNASSIGNED ) # Going to the PE
 
+        link = self._links[output_buffer]
+
+        return NextHop( 
+            x                   = link.neighbour[0], 
+            y                   = link.neighbour[1], 
+            output_buffer       = output_buffer, 
+            next_input_buffer   = link.next_input )
+
+    def _get_route_candidates( self, dest: tuple ) -> tuple[tuple, tuple]:
+        """
+        Returns the route table entry of the destination 
+        ( candidates outside the source column, candidates in the source column ).
+        Entries are computed once per destination.
+        """
+        entry = self._route_table.get( dest )
+
+        if entry is None:
+            entry = self._routing.get_route_table_entry( ( self._x, self._y ), dest )
+            self._route_table[dest] = entry
+
+        return entry
+
+    def _select_output( self, candidates: tuple[BufferLocation, ...] ) -> BufferLocation:
+        """
+        Selects the candidate with the least flits in the output buffer and the 
+        input buffer of the neighbour it leads to. Ties go to the earlier candidate.
+        """
+        return min( candidates, key=self._get_port_occupancy )
+
+    def _get_port_occupancy( self, direction: BufferLocation ) -> int:
+        """ 
+        Flits in the output buffers of the direction and in the input buffers of the neighbour it leads to. 
+        With flit level switching, the credits in use stand for the input buffers of the neighbour.
+        """
+        occupancy = 0
+        for buffer in self._output_vcs[direction]:
+            occupancy += buffer.get_occupancy()
+
+        if self._switching != STORE_AND_FORWARD:
+            credits = self._credits[ self._output_port_indices[direction] ]
+            if credits is not None:
+                occupancy += self._buffer_size * len(credits) - sum(credits)
+            return occupancy
+
+        neighbour = self._neighbours.get( direction )
+        if neighbour is not None:
+            for buffer in neighbour._input_vcs[self._links[direction].next_input]:
+                occupancy += buffer.get_occupancy()
+
+        return occupancy
 
     def _get_pos_from_mapping(self, dest_id: int) -> tuple:
         """Returns the X and Y coordinates of the destination based on mapping."""
-        for map in self._mapping_list:
-            if map.task.task_id == dest_id:
-                return map.assigned_pe
-        raise Exception(f"Destination ID {dest_id} not found in the mapping list.")
+        position = self._task_positions.get(dest_id)
+        if position is None:
+            raise Exception(f"Destination ID {dest_id} not found in the mapping list.")
+        return position
 
 
     def _populate_buffer_lists( self ) -> None:
@@ -326,6 +1158,45 @@ class Router:
                 if isinstance( attr_value, Buffer ):
                     self._output_buffers.append( attr_value )
 
+        # Buffer names are "<direction>_input" and "<direction>_output"
+        for buffer in self._input_buffers:
+            self._input_buffer_lookup[ BufferLocation( buffer.get_name().split("_")[0] ) ] = buffer
+
+        for buffer in self._output_buffers:
+            self._output_buffer_lookup[ BufferLocation( buffer.get_name().split("_")[0] ) ] = buffer
+
+    def _populate_virtual_channels( self, buffer_size: int, link_latency: int ) -> None:
+        """
+        The first virtual channel of each port is the buffer attribute, 
+        the others are only in the virtual channel and buffer lists.
+        """
+        for direction in self._input_buffer_lookup:
+            self._input_vcs[direction]  = [ self._input_buffer_lookup[direction] ]
+            self._output_vcs[direction] = [ self._output_buffer_lookup[direction] ]
+
+            self._input_ports.append( self._input_vcs[direction] )
+            self._port_directions.append( direction )
+            self._output_port_indices[direction] = len(self._input_ports) - 1
+            self._input_rr_pointers.append( 0 )
+            self._output_rr_pointers.append( 0 )
+            self._link_latencies.append( 0 if direction is BufferLocation.LOCAL else link_latency )
+            self._credits.append( None )        # Until set_neighbours
+            self._upstream_ports.append( None )
+
+            if direction is BufferLocation.LOCAL:
+                continue
+
+            for vc_index in range(1, self._num_vcs):
+                input_buffer    = FifoBuffer( buffer_size, name=f"{direction.value}_input_vc{vc_index}",  
+                                              counter=self._input_flit_counter )
+                output_buffer   = FifoBuffer( buffer_size, name=f"{direction.value}_output_vc{vc_index}", 
+                                              counter=self._output_flit_counter )
+
+                self._input_vcs[direction].append( input_buffer )
+                self._output_vcs[direction].append( output_buffer )
+                self._input_buffers.append( input_buffer )
+                self._output_buffers.append( output_buffer )
+
     def __eq__(self, other):
         """
         Overriding the equality operator to compare the x and y coordinates of the router.
@@ -342,6 +1213,9 @@ class Router:
         return (self._x, self._y)
 
     def is_active(self) -> bool:
+        if self._arrivals:
+            return True
+
         for buffer in self._input_buffers:
             if not buffer.is_empty():
                 return True
@@ -0,0 +1,175 @@
+from .flit import BufferLocation
+
+
+# Output direction -> ( dx, dy, input buffer of the next router )
+DIRECTION_OFFSETS = { BufferLocation.EAST   : (  1,  0, BufferLocation.WEST  ),
+                      BufferLocation.WEST   : ( -1,  0, BufferLocation.EAST  ),
+                      BufferLocation.NORTH  : (  0,  1, BufferLocation.SOUTH ),
+                      BufferLocation.SOUTH  : (  0, -1, BufferLocation.NORTH ) }
+
+LOCAL_CANDIDATES = ( BufferLocation.LOCAL, )
+
+
+class RoutingAlgorithm:
+    """
+    Base class of the routing algorithms for the 2D mesh.
+
+    `get_candidates` returns the allowed output directions (in order of preference)
+    for a packet at `current` going to `dest`. Deterministic algorithms return a
+    single direction, adaptive ones return several and the router picks the
+    less-loaded one (see Router._select_output).
+
+    `is_source_column` is only used by the odd-even turn model, where the turns
+    allowed depend on whether the packet is still in the column of its source.
+
+    The candidates are only computed once per (router, destination) and cached
+    in the route table of the router, so they should not depend on the network state.
+
+    Algorithms that are not deadlock free get an escape virtual channel
+    when the routers have more than one (see Router._allocate_output_vc).
+    Adaptive algorithms (`is_adaptive`) can return several candidates.
+    """
+    name                = "base"
+    is_deadlock_free    = True
+    is_adaptive         = False
+
+    def get_candidates(self, current: tuple, dest: tuple, is_source_column: bool = False) -> tuple[BufferLocation, ...]:
+        raise NotImplementedError
+
+    def get_route_table_entry(self, current: tuple, dest: tuple) -> tuple[tuple, tuple]:
+        """ Returns the candidates when ( not in the source column, in the source column ) """
+        not_source_column   = self.get_candidates(current, dest, is_source_column=False)
+        source_column       = self.get_candidates(current, dest, is_source_column=True)
+
+        if source_column == not_source_column:
+            source_column = not_source_column
+
+        return ( not_source_column, source_column )
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}()"
+
+
+def _get_x_direction(current: tuple, dest: tuple) -> BufferLocation:
+    if dest[0] > current[0]:
+        return BufferLocation.EAST
+    elif dest[0] < current[0]:
+        return BufferLocation.WEST
+    return None
+
+
+def _get_y_direction(current: tuple, dest: tuple) -> BufferLocation:
+    if dest[1] > current[1]:
+        return BufferLocation.NORTH
+    elif dest[1] < current[1]:
+        return BufferLocation.SOUTH
+    return None
+
+
+class XYRouting(RoutingAlgorithm):
+    """Dimension-order routing, X first then Y."""
+    name = "xy"
+
+    def get_candidates(self, current, dest, is_source_column=False):
+        direction = _get_x_direction(current, dest) or _get_y_direction(current, dest)
+        return ( direction, ) if direction else LOCAL_CANDIDATES
+
+
+class YXRouting(RoutingAlgorithm):
+    """Dimension-order routing, Y first then X."""
+    name = "yx"
+
+    def get_candidates(self, current, dest, is_source_column=False):
+        direction = _get_y_direction(current, dest) or _get_x_direction(current, dest)
+        return ( direction, ) if direction else LOCAL_CANDIDATES
+
+
+class WestFirstRouting(RoutingAlgorithm):
+    """
+    West-first turn model. Packets going west are routed west first,
+    otherwise any productive direction (east, north, south) can be used.
+    """
+    name        = "west_first"
+    is_adaptive = True
+
+    def get_candidates(self, current, dest, is_source_column=False):
+        x_direction = _get_x_direction(current, dest)
+        y_direction = _get_y_direction(current, dest)
+
+        if x_direction is BufferLocation.WEST:
+            return ( BufferLocation.WEST, )
+
+        candidates = tuple( direction for direction in ( x_direction, y_direction ) if direction )
+        return candidates or LOCAL_CANDIDATES
+
+
+class OddEvenRouting(RoutingAlgorithm):
+    """
+    Odd-even turn model (Chiu, 2000).
+        - East to north/south turns are not allowed in even columns.
+        - North/south to west turns are not allowed in odd columns.
+    """
+    name        = "odd_even"
+    is_adaptive = True
+
+    def get_candidates(self, current, dest, is_source_column=False):
+        x_direction = _get_x_direction(current, dest)
+        y_direction = _get_y_direction(current, dest)
+
+        if x_direction is None:
+            return ( y_direction, ) if y_direction else LOCAL_CANDIDATES
+
+        if x_direction is BufferLocation.EAST:
+            if y_direction is None:
+                return ( BufferLocation.EAST, )
+
+            candidates = []
+            if current[0] % 2 == 1 or is_source_column:
+                candidates.append( y_direction )
+
+            if dest[0] % 2 == 1 or dest[0] - current[0] != 1:
+                # A packet cannot enter an even destination column from the east turn
+                candidates.insert( 0, BufferLocation.EAST )
+
+            return tuple(candidates)
+
+        # Westbound
+        candidates = [ BufferLocation.WEST ]
+        if y_direction is not None and current[0] % 2 == 0:
+            candidates.append( y_direction )
+
+        return tuple(candidates)
+
+
+class MinimalAdaptiveRouting(RoutingAlgorithm):
+    """
+    Any productive direction. Not deadlock free with a single buffer per port,
+    a cyclic wait raises DeadlockError (see deadlock.py). With virtual channels, 
+    the first channel is kept as an XY escape channel.
+    """
+    name                = "adaptive"
+    is_deadlock_free    = False
+    is_adaptive         = True
+
+    def get_candidates(self, current, dest, is_source_column=False):
+        candidates = tuple( direction for direction in ( _get_x_direction(current, dest),
+                                                         _get_y_direction(current, dest) ) if direction )
+        return candidates or LOCAL_CANDIDATES
+
+
+ROUTING_ALGORITHMS = { algorithm.name: algorithm for algorithm in ( XYRouting,
+                                                                    YXRouting,
+                                                                    WestFirstRouting,
+                                                                    OddEvenRouting,
+                                                                    MinimalAdaptiveRouting ) }
+
+
+def get_routing_algorithm(routing) -> RoutingAlgorithm:
+    """ `routing` can be the name of the algorithm (see ROUTING_ALGORITHMS) or an instance. """
+    if isinstance(routing, RoutingAlgorithm):
+        return routing
+
+    if routing not in ROUTING_ALGORITHMS:
+        raise ValueError(f"Unknown routing algorithm {routing}. Available: {list(ROUTING_ALGORITHMS)}")
+
+    return ROUTING_ALGORITHMS[routing]()
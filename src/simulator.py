@@ -2,8 +2,16 @@ import networkx as nx
 
 from dataclasses import dataclass
 
-from .router             import Router 
-from .processing_element import ProcessingElement, TaskInfo, RequireInfo, TransmitInfo
+from .router             import Router, STORE_AND_FORWARD
+from .flit               import Multicast
+from .routing            import RoutingAlgorithm
+from .topology           import Topology, get_topology
+from .processing_element import ProcessingElement, TaskInfo, RequireInfo, TransmitInfo, SHORTEST_FIRST, CRITICAL_PATH
+from .profiler           import Profiler
+from .deadlock           import ProgressMonitor
+from .stream             import StreamControl, StreamReport
+from .application        import Application, ApplicationReport, get_global_task_id
+from .task_graph         import TaskGraph, TaskState
 
 @dataclass 
 class Map:
@@ -18,23 +26,194 @@ class GraphMap:
     task_id     : int
     assigned_pe : tuple[int, int]
 
+class GraphValidationError(ValueError):
+    """ Errors found in an application graph, see get_graph_errors """
+    def __init__(self, errors: list[str]):
+        super().__init__(f"{len(errors)} error(s) in the graph:\n" + "\n".join(errors))
+        self.errors = errors
+
+    def __reduce__(self):
+        return (GraphValidationError, (self.errors,))
+
+
+def get_graph_errors(graph: nx.DiGraph, allow_multicast: bool = True) -> list[str]:
+    """
+    Checks the attributes of an application graph (see Simulator.graph_to_task) in one pass, returns all the errors:
+    every node needs a `processing_time`, every edge a `weight`, terminal nodes a `generate` count and 
+    the other nodes none (it is the sum of their out edge weights). Multicast edges of a node with the 
+    same key need the same weight, and flit level switching (`allow_multicast`).
+    """
+    errors = []
+
+    for node_id, node in graph.nodes(data=True):
+        successors = graph.succ[node_id]
+
+        if "processing_time" not in node:
+            errors.append(f"Node {node_id}: need to mention processing_time for all nodes")
+
+        if successors and "generate" in node:
+            errors.append(f"Node {node_id}: should not have generate count. Generate here is calculated based on edge weights.")
+
+        if not successors and "generate" not in node:
+            errors.append(f"Node {node_id}: need to mention generate count for terminal nodes")
+
+        multicast_weights = {}
+        for successor, edge in successors.items():
+            if "weight" not in edge:
+                errors.append(f"Edge ({node_id}, {successor}): need to mention weight for all edges")
+
+            elif edge.get("multicast"):
+                multicast_weights.setdefault(edge["multicast"], set()).add(edge["weight"])
+
+        if multicast_weights and not allow_multicast:
+            errors.append(f"Node {node_id}: multicast edges need wormhole or virtual_cut_through switching")
+
+        for group, weights in multicast_weights.items():
+            if len(weights) > 1:
+                errors.append(f"Node {node_id}: multicast edges {group} have different weights {sorted(weights)}")
+
+    return errors
+
+
 class Simulator: 
-    def __init__(self, num_rows:int, num_cols:int, debug_mode: bool = False, max_cycles: int = 1000):
+    def __init__(
+            self, 
+            num_rows            : int, 
+            num_cols            : int, 
+            debug_mode          : bool  = False, 
+            max_cycles          : int   = None, 
+            profile             : bool  = False, 
+            stall_threshold     : int   = 20, 
+            livelock_threshold  : int   = 10000, 
+            routing             : str | RoutingAlgorithm = "xy", 
+            switching           : str   = "store_and_forward", 
+            num_vcs             : int   = 1, 
+            link_latency        : int | dict = 0, 
+            router_pipeline_depth : int = 1, 
+            link_width          : int   = 1, 
+            credit_delay        : int   = 0, 
+            arbitration         : str   = "fixed_priority", 
+            topology            : str | nx.Graph | Topology = "mesh", 
+            pe_speeds           : dict  = None, 
+            pe_types            : dict  = None, 
+            task_affinity       : dict  = None, 
+            pe_slots            : dict  = None, 
+            ni_depth            : int   = 1, 
+            transmit_order      : str   = SHORTEST_FIRST
+        ):
+        """
+        Args:
+            "max_cycles"            : int, upper bound on the simulated cycles. None for unbounded runs.
+            "profile"               : bool, times the phases of each cycle and counts calls to hot functions.
+                                      The report is available from `get_profile_report()`.
+            "stall_threshold"       : int, cycles without any flit movement or task progress before StallError. 
+                                      A cycle of blocked buffers raises DeadlockError right away.
+            "livelock_threshold"    : int, cycles with flit movement but no task progress before LivelockError.
+            "routing"               : str or RoutingAlgorithm, "xy", "yx", "west_first", "odd_even" or "adaptive".
+                                      Adaptive algorithms select the output with the least loaded downstream buffers.
+            "switching"             : str, "store_and_forward", "wormhole" or "virtual_cut_through". 
+                                      Store and forward routes a packet once it is complete in a buffer,
+                                      the others route the header as soon as it arrives (see Router).
+            "num_vcs"               : int, virtual channels per router port, needs wormhole or virtual cut-through.
+                                      With the "adaptive" routing the first channel is an XY escape channel.
+            "link_latency"          : int or dict, cycles a flit spends on a link. 0 means a flit can cross a link and 
+                                      a router in the same cycle. A dict sets each link, {( (x, y), (next_x, next_y) ): cycles}, 
+                                      missing links have 0.
+            "router_pipeline_depth" : int, cycles from the input buffer to the output buffer of a router.
+            "link_width"            : int, flits per cycle on a link and through the switch, per port.
+            "credit_delay"          : int, extra cycles for a credit to get back to the upstream router, 
+                                      once a flit has left an input buffer (credit based flow control).
+                                      The last four need wormhole or virtual cut-through.
+            "arbitration"           : str, switch allocation between the router inputs, "fixed_priority", 
+                                      "round_robin" or "age" (oldest packet first). See `get_starvation_report()`.
+            "topology"              : str, nx.Graph or Topology. "mesh", "torus" (wraparound links) or "ring" (all 
+                                      the positions on one ring) of num_rows x num_cols routers, or a graph with 
+                                      (x, y) nodes of degree <= 4. Topologies other than the mesh route along the 
+                                      shortest paths and need the default routing. The torus and the ring are 
+                                      deadlock free with atleast 2 virtual channels (dateline channels).
+            "pe_speeds"             : dict, speed of the PEs {(x, y): factor}, the processing time of a task
+                                      is divided by it (2.0 is twice as fast). Missing PEs have 1.0.
+            "pe_types"              : dict, type of the PEs {(x, y): str}, e.g. "big", "dsp". 
+            "task_affinity"         : dict, speed-up of the tasks on the PE types {task_id: {pe_type: factor}}, 
+                                      on top of the PE speed. See `get_processing_cycles()`.
+            "pe_slots"              : dict, compute slots of the PEs {(x, y): int}, tasks that can process at the
+                                      same time (cores behind one router). Missing PEs have one slot.
+            "ni_depth"              : int, packets the output network interface of a PE holds. Beyond one, a task 
+                                      computes its next packet while the previous ones drain to the router.
+            "transmit_order"        : str, order of the packets of a task to its successors, "shortest_first" 
+                                      (all the packets of a successor, the one that requires the least first), 
+                                      "round_robin", "critical_path" or "readiness" (see processing_element.TRANSMIT_ORDERS).
+        """
+        self._topology      = get_topology( topology, num_rows, num_cols )
+
+        # Used to create a simulator with the same configuration (isolated runs)
+        self._init_args     = dict( num_rows            = num_rows, 
+                                    num_cols            = num_cols, 
+                                    max_cycles          = max_cycles, 
+                                    stall_threshold     = stall_threshold, 
+                                    livelock_threshold  = livelock_threshold, 
+                                    routing             = routing, 
+                                    switching           = switching, 
+                                    num_vcs             = num_vcs, 
+                                    link_latency        = link_latency, 
+                                    router_pipeline_depth = router_pipeline_depth, 
+                                    link_width          = link_width, 
+                                    credit_delay        = credit_delay, 
+                                    arbitration         = arbitration, 
+                                    topology            = self._topology, 
+                                    pe_speeds           = pe_speeds, 
+                                    pe_types            = pe_types, 
+                                    task_affinity       = task_affinity, 
+                                    pe_slots            = pe_slots, 
+                                    ni_depth            = ni_depth, 
+                                    transmit_order      = transmit_order )
+
         self._debug_mode    = debug_mode   
         self._max_cycles    = max_cycles
         self._num_rows      = num_rows
         self._num_cols      = num_cols
-        self._num_pes       = num_rows * num_cols
+        self._num_pes       = len( self._topology.get_positions() )
+
+        # Topologies other than the mesh come with their own routing
+        if self._topology.get_routing() is not None:
+            if routing != "xy":
+                raise ValueError(f"Routing {routing} is for the mesh, {self._topology} has its own routing")
+            routing = self._topology.get_routing()
+
+        self._router_args   = dict( routing         = routing, 
+                                    switching       = switching, 
+                                    num_vcs         = num_vcs, 
+                                    pipeline_depth  = router_pipeline_depth, 
+                                    link_width      = link_width, 
+                                    credit_delay    = credit_delay, 
+                                    arbitration     = arbitration )
+        self._link_latency  = link_latency
+        self._pe_speeds     = pe_speeds or {}
+        self._pe_types      = pe_types or {}
+        self._task_affinity = task_affinity or {}
+        self._pe_slots      = pe_slots or {}
+        self._ni_depth      = ni_depth
+        self._transmit_order = transmit_order
+        self._task_lookup   = {} # task id -> TaskInfo of the mapped tasks, for the READINESS transmit order
+
+        for pos in list( self._pe_speeds ) + list( self._pe_types ) + list( self._pe_slots ):
+            if pos not in self._topology.get_positions():
+                raise ValueError(f"No PE at {pos} in {self._topology}")
 
         self._routers       = self._create_routers()
         self._pes           = self._create_pes()
 
         self._task_list     = []
         self._mapping_list  = []
+        self._applications  = []
+        self._task_graph    = None # (tasks, task ids, TaskGraph, initial TaskState) of the mapped tasks, see _get_task_graph
 
         self._pe_done_count     = 0    
         self._pe_active_count   = 0
 
+        self._profiler      = Profiler() if profile else None
+        self._monitor       = ProgressMonitor( stall_threshold, livelock_threshold )
+
         if self._debug_mode:
             self._visualizer = self._init_visualizer()
 
@@ -50,12 +229,79 @@ class Simulator:
 
         self._mapping_list.clear()
         self._task_list.clear()
+        self._task_lookup.clear()
+        self._applications.clear()
+        self._task_graph = None
+
+        if self._profiler is not None:
+            self._profiler.reset()
+
+        self._monitor.reset()
+
         print("Simulation cleared. Ready for next run.")
 
+    def reset(self, keep_mapping: bool = False) -> None:
+        """
+        Cheap reset between runs, e.g. to evaluate many mappings of the same task list. 
+        Unlike clear(), the tasks are kept: their run state is restored in place from the initial state of their 
+        TaskGraph, compiled once per task list, so there is no need to call graph_to_task again. Only the routers that saw traffic in the last run 
+        (and their neighbours, which may hold the flits they sent) and the PEs with tasks are cleared.
+        With `keep_mapping` the same mapping is ready to run again, otherwise map() the next one.
+        """
+        self._pe_done_count = 0
+        self._monitor.reset()
+
+        dirty_routers = set()
+        for pos, router in self._routers.items():
+            if router.get_flit_event_count() > 0:
+                dirty_routers.add( pos )
+                dirty_routers.update( neighbour.get_pos() for neighbour in router.get_neighbours().values() )
+
+        for pos, pe in self._pes.items():
+            if pe.compute_list is None:
+                continue
+
+            dirty_routers.add( pos ) # The PE injects into the local input buffer
+            pe.reset( reset_tasks=False )
+
+            if not keep_mapping:
+                pe.clear()
+
+        for pos, router in self._routers.items():
+            router.reset( clear_buffers=pos in dirty_routers )
+
+        if self._mapping_list:
+            task_graph, initial_state = self._get_task_graph()
+            task_graph.load_state( self._get_mapped_tasks(), initial_state )
+
+        if not keep_mapping:
+            self._pe_active_count   = 0
+            self._mapping_list      = []
+            self._applications      = []
+            self._task_lookup.clear()
+
     def run(self) -> int:
         assert self._mapping_list, "Tasks have not been assigned to PEs"
         self._debug_print(f"\nRunning simulation with {self._num_rows}x{self._num_cols} mesh PEs")
 
+        if self._profiler is None:
+            return self._run_cycles()
+
+        with self._profiler.instrument():
+            return self._run_cycles()
+
+    def run_parallel(self, num_workers: int) -> int:
+        """
+        Same as `run`, with the mesh split in `num_workers` rectangular regions simulated by their own processes. 
+        Needs wormhole or virtual cut-through and a link latency >= 1 between the regions (see parallel.py).
+        """
+        from .parallel import run_partitioned
+
+        self._debug_print(f"\nRunning simulation with {self._num_rows}x{self._num_cols} mesh PEs in {num_workers} regions")
+        return run_partitioned( self, num_workers )
+
+    def _run_cycles(self) -> int:
+        profiler    = self._profiler
         cycle_count = 0
         
         while True: 
@@ -65,100 +311,161 @@ class Simulator:
             cycle_count += 1
             status_list = [] # To check if simulation is done
 
+            if profiler is not None:
+                profiler.add_cycle()
+                phase_start = profiler.now()
+
             # Processing all the PEs
             for pe in self._pes.values():
                 is_done = pe.process(None)
                 status_list.append(is_done)
 
+            if profiler is not None:
+                phase_start = profiler.add_phase_time("pe_process", phase_start)
             
             # Process the output buffer of all the routers
             for router in self._routers.values():
                 router.forward_output_buffer_flits( self._routers, self._pes )
 
+            if profiler is not None:
+                phase_start = profiler.add_phase_time("forward_output_buffer_flits", phase_start)
+
             # Process the input buffer and receive of all the routers 
             for router in self._routers.values():
                 router.process()
 
+            if profiler is not None:
+                profiler.add_phase_time("router_process", phase_start)
+
             if self._debug_mode:
                 self._visualizer(cycle_count - 1)
 
             if self.is_stop_condition_met(status_list, cycle_count):
                 return cycle_count - 1
 
-    def graph_to_task(self, graph: nx.DiGraph) -> list[TaskInfo]:
+            self._check_progress(cycle_count - 1)
+
+    def _check_progress(self, cycle_count: int) -> None:
+        """
+        Raises DeadlockError, StallError or LivelockError (see deadlock.py) 
+        when the simulation stops making progress.
+        """
+        flit_event_count = 0
+        for router in self._routers.values():
+            flit_event_count += router.get_flit_event_count()
+
+        task_event_count = 0
+        for pe in self._pes.values():
+            task_event_count += pe.task_event_count
+
+        self._monitor.update( cycle_count, flit_event_count, task_event_count, self._routers, self._pes )
+
+    def run_stream( 
+            self, 
+            num_iterations          : int, 
+            period                  : int   = None, 
+            max_inflight_iterations : int   = 2, 
+            warmup_iterations       : int   = None, 
+            tolerance               : float = 0.05
+        ) -> StreamReport:
+        """
+        Pipelined mode, the mapped application processes a stream of `num_iterations` frames. 
+        Source tasks are re-fired every `period` cycles, or as fast as the backpressure 
+        (`max_inflight_iterations`) allows if period is None. 
+        The same TaskInfo objects are re-armed after each iteration (see ProcessingElement). 
+
+        Returns the throughput (iterations per kilo-cycle) and the per-iteration latency, 
+        warm-up iterations are detected and excluded unless `warmup_iterations` is given.
+        """
+        assert self._mapping_list, "Tasks have not been assigned to PEs"
+
+        tasks           = [ map.task for map in self._mapping_list ]
+        required_ids    = { require.require_type_id for task in tasks for require in task.require_list }
+        sink_task_ids   = { task.task_id for task in tasks if task.task_id not in required_ids }
+
+        stream = StreamControl( num_iterations          = num_iterations, 
+                                sink_task_ids           = sink_task_ids, 
+                                period                  = period, 
+                                max_inflight_iterations = max_inflight_iterations )
+
+        for pe in self._pes.values():
+            pe.set_stream(stream)
+
+        try:
+            total_cycles = self.run()
+        finally:
+            for pe in self._pes.values():
+                pe.set_stream(None)
+
+        return stream.get_report( total_cycles, warmup_iterations, tolerance )
+
+    def graph_to_task(self, graph: nx.DiGraph, app_id: int = None) -> list[TaskInfo]:
         """
         Convert the graph to a list of TaskInfo objects. 
         In a transmit node, priority give to the task that requires the least number of packets.
+        If `app_id` is given, task ids are (app_id, node_id) so that several graphs can share the mesh.
+        Out edges of a node with the same `multicast` attribute send one packet to all their successors, see _get_multicast_transmit().
+        The graph is checked first, all the errors are raised at once (GraphValidationError, see get_graph_errors).
+        One pass over the nodes and their adjacency, linear in the size of the graph.
         """
+        errors = get_graph_errors(graph, allow_multicast=self._router_args["switching"] != STORE_AND_FORWARD)
+        if errors:
+            raise GraphValidationError(errors)
+
         task_list = []
 
+        if app_id is None:
+            get_task_id = lambda node_id: node_id
+        else: 
+            get_task_id = lambda node_id: get_global_task_id(app_id, node_id)
+
+        if self._transmit_order == CRITICAL_PATH:
+            ranks = { get_task_id(node_id): rank for node_id, rank in self._get_upward_ranks(graph).items() }
+
         for node_id, node in graph.nodes(data=True):
             # Converting the graph to a list of TaskInfo objects
-            predecessors = list(graph.predecessors(node_id))
-            successors   = list(graph.successors(node_id))
+            task_id         = get_task_id(node_id)
+            successors      = graph.succ[node_id]
 
-            require_list    = []
+            require_list    = [ RequireInfo(require_type_id=get_task_id(predecessor), required_packets=edge["weight"]) 
+                                for predecessor, edge in graph.pred[node_id].items() ]
             transmit_list   = []
 
-            if len(predecessors) > 0:
-                for predecessor in predecessors:
-                    require_id      = predecessor
-                    edge            = graph[predecessor][node_id]
-
-                    if "weight" not in edge:
-                        raise ValueError("Need to mention weight for all edges")
-
-                    require_count   = graph[predecessor][node_id]["weight"]
-
-                    require         = RequireInfo(
-                                        require_type_id=require_id, 
-                                        required_packets=require_count)
-                    require_list.append(require)
+            is_transmit_node = len(successors) > 0
+            if is_transmit_node:
+                multicast_groups = {}
+                for successor, edge in successors.items():
+                    if edge.get("multicast"):
+                        multicast_groups.setdefault(edge["multicast"], []).append(successor)
+                        continue
 
-            if "processing_time" not in node:
-                raise ValueError("Need to mention processing_time for all nodes")
+                    transmit_list.append(TransmitInfo(id=get_task_id(successor), require=edge["weight"]))
 
-            is_transmit_node = False
-            if len(successors) > 0:
-                is_transmit_node = True
-                for successor in successors:
-                    transmit_id     = successor
-                    edge            = graph[node_id][successor]
-
-                    if "weight" not in edge:
-                        raise ValueError("Need to mention weight for all edges")
-
-                    transmit_count  = graph[node_id][successor]["weight"]
-                    transmit        = TransmitInfo(
-                                        id=transmit_id, 
-                                        require=transmit_count)
-                    transmit_list.append(transmit)
+                for group_successors in multicast_groups.values():
+                    weight = successors[group_successors[0]]["weight"]
+                    transmit_list.append(self._get_multicast_transmit(group_successors, weight, get_task_id))
 
                 # Sorting based on shortest transmit first
                 transmit_list.sort(key=lambda transmit_info: transmit_info.require,)
 
-                if "generate" in node:
-                    raise ValueError( f"Node {node_id} should not have generate count." 
-                                      f"Generate here is calculated based on edge weights.")
+                if self._transmit_order == CRITICAL_PATH:
+                    transmit_list.sort(key=lambda transmit_info: -self._get_transmit_rank(transmit_info, ranks))
 
                 generate_count = 0
-                for successor in successors:
-                    generate_count += graph[node_id][successor]["weight"]
+                for transmit in transmit_list:
+                    generate_count += transmit.require
 
             else: 
-                if "generate" not in node:
-                    raise ValueError("Need to mention generate count for terminal nodes")
-
-                else: 
-                    generate_count = node["generate"]
+                generate_count = node["generate"]
 
             task = TaskInfo(
-                task_id                     = node_id, 
+                task_id                     = task_id, 
                 processing_cycles           = node["processing_time"], 
                 expected_generated_packets  = generate_count, 
                 require_list                = require_list, 
                 is_transmit_task            = is_transmit_node, 
                 transmit_list               = transmit_list, 
+                affinity                    = self._task_affinity.get(task_id), 
             )
 
             task_list.append(task)
@@ -167,6 +474,31 @@ class Simulator:
 
         return task_list
 
+    def _get_upward_ranks(self, graph: nx.DiGraph) -> dict:
+        """ Processing time on the longest path from each node to a sink, node included (communication is not counted) """
+        ranks = {}
+        for node_id in reversed(list(nx.topological_sort(graph))):
+            successor_ranks = [ranks[successor] for successor in graph.successors(node_id)]
+            ranks[node_id]  = graph.nodes[node_id].get("processing_time", 0) + max(successor_ranks, default=0)
+        return ranks
+
+    def _get_transmit_rank(self, transmit: TransmitInfo, ranks: dict) -> int:
+        """ Upward rank (`ranks` by task id) of the successor of `transmit`, the highest one for a multicast """
+        task_ids = transmit.id.task_ids if isinstance(transmit.id, Multicast) else (transmit.id,)
+        return max(ranks[task_id] for task_id in task_ids)
+
+    def _get_multicast_transmit(self, successors: list, weight: int, get_task_id) -> TransmitInfo:
+        """
+        Edges of a node with the same `multicast` key share their packets: each packet is sent once, 
+        with all the successors as destination, and forks in the routers where their routes split.
+        """
+        if len(successors) == 1:
+            dest_id = get_task_id(successors[0])
+        else:
+            dest_id = Multicast(tuple(get_task_id(successor) for successor in successors))
+
+        return TransmitInfo(id=dest_id, require=weight)
+
     def get_random_mapping(self, tasks: list[TaskInfo] = None, do_map: bool = False) -> list[Map]:
         """
         One-to-one mapping of tasks to PE. 
@@ -204,19 +536,93 @@ class Simulator:
         assert tasks, "Task list is empty"
         assert mapping, "Mapping list is empty"
 
+        assigned_pes = {}
+        for graph_map in mapping: 
+            assigned_pes.setdefault(graph_map.task_id, graph_map.assigned_pe) # The first entry of a task is used
+
         mapping_list = []
 
         for task in tasks: 
-            for graph_map in mapping: 
-
-                if task.task_id == graph_map.task_id:
-                    pe  = graph_map.assigned_pe
-                    map = Map(task=task, assigned_pe=pe)
-                    mapping_list.append(map)
-                    break
+            pe = assigned_pes.get(task.task_id)
+            if pe is not None:
+                mapping_list.append(Map(task=task, assigned_pe=pe))
 
         return mapping_list 
 
+    def map_applications(self, applications: list[Application]) -> list[Map]:
+        """
+        Maps several independent applications on the mesh at once. 
+        Each application has its own task id namespace (see Application), mapping and start offset.
+        """
+        assert len({ app.app_id for app in applications }) == len(applications), "Application ids should be unique"
+
+        task_list       = []
+        mapping_list    = []
+
+        for app in applications:
+            app_tasks = self.graph_to_task( app.graph, app_id=app.app_id )
+
+            for task in app_tasks:
+                task.start_offset = app.start_offset
+
+            app_mapping = [ GraphMap( task_id     = get_global_task_id( app.app_id, graph_map.task_id ), 
+                                      assigned_pe = graph_map.assigned_pe ) for graph_map in app.mapping ]
+
+            task_list.extend( app_tasks )
+            mapping_list.extend( self.set_assigned_mapping_list( app_tasks, app_mapping ) )
+
+        self._task_list     = task_list
+        self._applications  = list(applications)
+        self.map( mapping_list )
+
+        return mapping_list
+
+    def get_application_report(self, compare_isolated: bool = True, show: bool = False) -> list[ApplicationReport]:
+        """
+        Per application makespan after a multi-application run. 
+        With `compare_isolated`, each application is also simulated alone on a simulator 
+        with the same configuration, the difference is the interference from the other applications.
+        """
+        assert self._applications, "Applications have not been mapped (map_applications)"
+
+        report_list = []
+
+        for app in self._applications:
+            tasks       = [ map.task for map in self._mapping_list if map.task.task_id[0] == app.app_id ]
+            start_cycle = min( task.start_cycle for task in tasks )
+            end_cycle   = max( task.end_cycle   for task in tasks )
+
+            report = ApplicationReport( app_id          = app.app_id, 
+                                        start_offset    = app.start_offset, 
+                                        start_cycle     = start_cycle, 
+                                        end_cycle       = end_cycle, 
+                                        makespan        = end_cycle - app.start_offset, 
+                                        task_ids        = [ task.task_id for task in tasks ] )
+
+            if compare_isolated:
+                report.isolated_makespan    = self._get_isolated_makespan( app )
+                report.interference_cycles  = report.makespan - report.isolated_makespan
+                report.slowdown             = report.makespan / report.isolated_makespan
+
+            report_list.append(report)
+
+        if show or self._debug_mode:
+            print("---------Application Report---------")
+            print(f"App \t Offset \t Makespan \t Isolated \t Slowdown")
+            for report in report_list:
+                print(f" {report.app_id}\t {report.start_offset} \t\t {report.makespan} \t\t "
+                      f"{report.isolated_makespan} \t\t {report.slowdown}")
+
+        return report_list
+
+    def _get_isolated_makespan(self, app: Application) -> int:
+        isolated_app = Application( app_id=app.app_id, graph=app.graph, mapping=app.mapping, start_offset=0 )
+        isolated_sim = Simulator( **self._init_args )
+        isolated_sim.map_applications( [ isolated_app ] )
+        isolated_sim.run()
+
+        return isolated_sim.get_application_report( compare_isolated=False )[0].makespan
+
     def map(self, mapping_list: list[Map]) -> None:
         """
         Assign tasks to PEs based on the mapping list. 
@@ -232,6 +638,7 @@ class Simulator:
         for map in mapping_list:
             pe = self._pes[map.assigned_pe]
             pe.assign_task([map.task])
+            self._task_lookup[map.task.task_id] = map.task
             active_pes.add(map.assigned_pe)
             # router_order_list.append(map.assigned_pe)
 
@@ -240,20 +647,52 @@ class Simulator:
         if self._debug_mode:
             self._visualizer.init_mapping(mapping_list)
 
+    def _get_mapped_tasks(self) -> list[TaskInfo]:
+        return [ map.task for map in self._mapping_list ]
+
+    def _get_task_graph(self) -> tuple[TaskGraph, TaskState]:
+        """ TaskGraph of the mapped tasks (in mapping order) and its initial state, compiled again only when the tasks change """
+        tasks   = self._get_mapped_tasks()
+        key     = tuple( map( id, tasks ) )
+
+        # The tasks are kept with their ids, so the ids cannot be reused by other tasks
+        if self._task_graph is None or self._task_graph[1] != key:
+            task_graph          = TaskGraph.from_tasks( tasks )
+            self._task_graph    = ( tasks, key, task_graph, task_graph.get_initial_state() )
+
+        return self._task_graph[2], self._task_graph[3]
+
+    def get_task_state(self) -> TaskState:
+        """ Run state of the mapped tasks (in mapping order) as arrays, e.g. to record the start and end cycles of a run """
+        task_graph, _ = self._get_task_graph()
+        return task_graph.save_state( self._get_mapped_tasks() )
+
     def _create_routers(self) -> dict[tuple[int, int], Router]:
         router_lookup = {}
-        for x in range(self._num_cols):
-            for y in range(self._num_rows):
-                router = Router( pos=(x, y), debug_mode=self._debug_mode )
-                router_lookup[(x, y)] = router
+        for pos in self._topology.get_positions():
+            router_lookup[pos] = Router( pos=pos, debug_mode=self._debug_mode, **self._router_args )
+
+        for pos, router in router_lookup.items():
+            router.set_neighbours( router_lookup, self._topology.get_links( pos ) )
+
+            for direction, neighbour in router.get_neighbours().items():
+                if isinstance( self._link_latency, dict ):
+                    latency = self._link_latency.get( ( router.get_pos(), neighbour.get_pos() ), 0 )
+                else:
+                    latency = self._link_latency
+
+                if latency:
+                    router.set_link_latency( direction, latency )
+
         return router_lookup
 
     def _create_pes(self) -> dict[tuple[int, int], ProcessingElement]:
         pe_lookup = {}
-        for x in range(self._num_cols):
-            for y in range(self._num_rows):
-                pe = ProcessingElement( xy=(x, y), debug_mode=self._debug_mode, router_lookup=self._routers )
-                pe_lookup[(x, y)] = pe
+        for pos in self._topology.get_positions():
+            pe_lookup[pos] = ProcessingElement( xy=pos, debug_mode=self._debug_mode, router_lookup=self._routers, 
+                                                speed=self._pe_speeds.get( pos, 1.0 ), pe_type=self._pe_types.get( pos ), 
+                                                num_slots=self._pe_slots.get( pos, 1 ), ni_depth=self._ni_depth, 
+                                                transmit_order=self._transmit_order, task_lookup=self._task_lookup )
         return pe_lookup
 
 
@@ -278,6 +717,16 @@ class Simulator:
 
         return required_flit
 
+    def get_processing_cycles(self, task: TaskInfo, pos: tuple[int, int]) -> int:
+        """
+        Cycles of a run of `task` on the PE at `pos`, with the speed of the PE and the affinity of the task. 
+        Mapping heuristics can use it as the cost of a task on each PE.
+        """
+        return self._pes[pos].get_processing_cycles( task )
+
+    def get_topology(self) -> Topology:
+        return self._topology
+
     def get_mapping_list(self) -> list[Map]:    
         return self._mapping_list
 
@@ -302,8 +751,41 @@ class Simulator:
 
         return compute_list 
 
+    def get_profile_report(self, show: bool = False, filename: str = None) -> dict:
+        """
+        Returns the profile report of the runs since the last `clear()`. 
+        Optionally prints the summary table and/or saves the report as JSON.
+        """
+        assert self._profiler is not None, "Simulator was not created with profile=True"
+
+        if show:
+            self._profiler.show_report()
+
+        if filename is not None:
+            self._profiler.save_report(filename)
+
+        return self._profiler.get_report()
+
+    def get_starvation_report(self, show: bool = False) -> dict[str, int]:
+        """
+        Cycles each router input lost the switch to another input, since the last `clear()`. 
+        Sorted with the most starved input first, inputs that never lost are left out.
+        """
+        starvation = {}
+        for router in self._routers.values():
+            starvation.update( router.get_starvation_cycles() )
+
+        starvation = dict( sorted( starvation.items(), key=lambda item: item[1], reverse=True ) )
+
+        if show or self._debug_mode:
+            for label, cycles in starvation.items():
+                print(f" {label}\t{cycles}")
+
+        return starvation
+
     def is_stop_condition_met(self, status_list: list[bool], cycle_count: int) -> bool:
-        assert cycle_count < self._max_cycles, f"Simulation did not finish in {self._max_cycles} cycles"
+        if self._max_cycles is not None:
+            assert cycle_count < self._max_cycles, f"Simulation did not finish in {self._max_cycles} cycles"
 
         for status in status_list:
             if status == True:
@@ -345,8 +827,7 @@ if __name__ == "__main__":
     debug_mode  = False
     sim         = Simulator( num_rows=mesh_size, 
                              num_cols=mesh_size, 
-                             debug_mode=debug_mode, 
-                             max_cycles=1000 )
+                             debug_mode=debug_mode )
 
     graph         = nx.DiGraph()
     proc_range    = ( 2, 8 )
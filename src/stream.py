@@ -0,0 +1,144 @@
+from dataclasses import dataclass, field
+
+
+@dataclass
+class StreamReport:
+    """
+    Result of `Simulator.run_stream`.
+    Cycles are the PE cycles at which the first source task of an iteration
+    started and the last sink task of that iteration ended.
+    """
+    num_iterations          : int
+    total_cycles            : int
+    warmup_iterations       : int               # iterations excluded from the steady state
+    is_steady               : bool              # False if steady state was not detected
+    throughput              : float             # iterations per kilo-cycle (steady state)
+    mean_latency            : float             # cycles per iteration (steady state)
+    iteration_start_cycles  : list[int] = field(default_factory=list)
+    iteration_end_cycles    : list[int] = field(default_factory=list)
+
+    @property
+    def latencies(self) -> list[int]:
+        return [ end - start for start, end in zip(self.iteration_start_cycles, self.iteration_end_cycles) ]
+
+
+class StreamControl:
+    """
+    Shared state between the PEs in the streaming mode.
+
+    - Source tasks (no require_list) of iteration k are released at cycle k * period,
+      or as soon as possible if period is None.
+    - A source cannot run more than `max_inflight_iterations` iterations ahead of the
+      last completed iteration. This is the backpressure from the sinks, the PEs consume
+      packets into counters and would otherwise never push back on the sources.
+    - An iteration is completed when all the sink tasks (not required by any task) completed it.
+    """
+    def __init__(self, num_iterations: int, sink_task_ids: set, period: int = None, max_inflight_iterations: int = 2):
+        assert num_iterations > 0, "Need atleast one iteration"
+        assert period is None or period > 0, "Period should be a positive number of cycles"
+        assert max_inflight_iterations > 0, "Need atleast one iteration in flight"
+
+        self.num_iterations             = num_iterations
+        self.period                     = period
+        self.max_inflight_iterations    = max_inflight_iterations
+        self.sink_task_ids              = sink_task_ids
+
+        self.completed_iterations       = 0
+        self.iteration_start_cycles     = [ None ] * num_iterations
+        self.iteration_end_cycles       = [ None ] * num_iterations
+        self._sink_done_counts          = [ 0 ] * num_iterations
+
+    def is_released(self, iteration: int, cycle: int) -> bool:
+        """Checks if a source task can start `iteration` at PE `cycle` (1-based)."""
+        if iteration >= self.completed_iterations + self.max_inflight_iterations:
+            return False
+
+        if self.period is not None and cycle <= iteration * self.period:
+            return False
+
+        return True
+
+    def is_waiting_for_period(self, iteration: int, cycle: int) -> bool:
+        """True if the only thing stopping a source task is the release time."""
+        return ( self.period is not None and cycle <= iteration * self.period and
+                 iteration < self.completed_iterations + self.max_inflight_iterations )
+
+    def record_start(self, iteration: int, cycle: int) -> None:
+        if self.iteration_start_cycles[iteration] is None:
+            self.iteration_start_cycles[iteration] = cycle
+
+    def record_sink_done(self, iteration: int, cycle: int) -> None:
+        self._sink_done_counts[iteration] += 1
+
+        if self._sink_done_counts[iteration] == len(self.sink_task_ids):
+            self.iteration_end_cycles[iteration] = cycle
+
+            # Iterations complete in order, each sink completes k before k + 1
+            while ( self.completed_iterations < self.num_iterations and
+                    self.iteration_end_cycles[self.completed_iterations] is not None ):
+                self.completed_iterations += 1
+
+    def get_report(self, total_cycles: int, warmup_iterations: int = None, tolerance: float = 0.05) -> StreamReport:
+        """
+        Steady state starts after `warmup_iterations`, if None it is detected from
+        the completion times of the iterations (see `get_steady_state_start`).
+        """
+        end_cycles  = self.iteration_end_cycles
+        is_steady   = True
+
+        if warmup_iterations is None:
+            warmup_iterations = get_steady_state_start(end_cycles, tolerance, window=self.max_inflight_iterations)
+
+            if warmup_iterations is None:
+                warmup_iterations   = 0
+                is_steady           = False
+
+        steady_start    = self.iteration_start_cycles[warmup_iterations:]
+        steady_end      = end_cycles[warmup_iterations:]
+        latencies       = [ end - start for start, end in zip(steady_start, steady_end) ]
+
+        if len(steady_end) > 1 and steady_end[-1] > steady_end[0]:
+            throughput = 1000 * (len(steady_end) - 1) / (steady_end[-1] - steady_end[0])
+        else:
+            # Single iteration, throughput is one over the latency
+            throughput = 1000 / latencies[-1] if latencies[-1] else 0.0
+
+        return StreamReport( num_iterations         = self.num_iterations,
+                             total_cycles           = total_cycles,
+                             warmup_iterations      = warmup_iterations,
+                             is_steady              = is_steady,
+                             throughput             = throughput,
+                             mean_latency           = sum(latencies) / len(latencies),
+                             iteration_start_cycles = list(self.iteration_start_cycles),
+                             iteration_end_cycles   = list(end_cycles) )
+
+
+def get_steady_state_start(end_cycles: list[int], tolerance: float = 0.05, window: int = 1, min_steady_windows: int = 3) -> int:
+    """
+    Returns the first iteration from which the time to complete `window` more iterations
+    stays within `tolerance` (relative) of the reference. The reference is the median of 
+    the second half of the windows. 
+    With several iterations in flight the completions come in bursts, so the window
+    should be the number of iterations in flight. 
+    Returns None if there are less than `min_steady_windows` steady windows.
+    """
+    window_cycles = [ end_cycles[i + window] - end_cycles[i] for i in range(len(end_cycles) - window) ]
+
+    if len(window_cycles) < min_steady_windows:
+        return None
+
+    second_half = sorted(window_cycles[len(window_cycles) // 2:])
+    reference   = second_half[len(second_half) // 2]
+    allowed     = max(tolerance * reference, 1)
+
+    first_steady_window = len(window_cycles)
+    for i in reversed(range(len(window_cycles))):
+        if abs(window_cycles[i] - reference) > allowed:
+            break
+        first_steady_window = i
+
+    if len(window_cycles) - first_steady_window < min_steady_windows:
+        return None
+
+    # Window i starts at the completion of iteration i
+    return first_steady_window
@@ -0,0 +1,245 @@
+import numpy as np
+
+from dataclasses import dataclass
+
+from .flit               import Multicast
+from .processing_element import TaskInfo, RequireInfo, TransmitInfo, TaskStatus
+
+TASK_STATUSES   = list(TaskStatus)  # status code in TaskState -> TaskStatus
+NO_CYCLE        = -1                # start or end cycle not reached yet
+
+# Columns of TaskState.tasks
+CURRENT_PROCESSING_CYCLE    = 0
+GENERATED_PACKET_COUNT      = 1
+SENT_GENERATED_PACKETS      = 2
+STATUS                      = 3
+START_CYCLE                 = 4
+END_CYCLE                   = 5
+ITERATION                   = 6
+TRANSMIT_REMAINING          = 7     # entries left in the transmit list
+NUM_TASK_FIELDS             = 8
+
+
+def _get_read_only_array(values: list, dtype=np.int64) -> np.ndarray:
+    array = np.array(values, dtype=dtype)
+    array.flags.writeable = False
+    return array
+
+
+@dataclass(frozen=True)
+class TaskGraph:
+    """
+    Static part of a task list compiled to arrays, indexed by task index (position in `task_ids`).
+    The requirements and the transmit entries of task i are the slices [offsets[i]:offsets[i + 1]]
+    of the CSR arrays, the destinations of transmit entry j are transmit_dests[transmit_dest_offsets[j]:transmit_dest_offsets[j + 1]]
+    (several for a multicast). The arrays are read only, the same template serves any number of runs.
+    """
+    task_ids                    : tuple
+    processing_cycles           : np.ndarray
+    expected_generated_packets  : np.ndarray
+    is_transmit_task            : np.ndarray
+    start_offsets               : np.ndarray
+    require_offsets             : np.ndarray
+    require_sources             : np.ndarray    # task index of the required task
+    required_packets            : np.ndarray
+    transmit_offsets            : np.ndarray
+    transmit_require            : np.ndarray
+    transmit_is_multicast       : np.ndarray
+    transmit_dest_offsets       : np.ndarray
+    transmit_dests              : np.ndarray    # task index of the destinations
+    affinities                  : tuple         # TaskInfo.affinity of each task
+
+    @classmethod
+    def from_tasks(cls, task_list: list[TaskInfo]) -> "TaskGraph":
+        """ Compiles the static fields of `task_list` (e.g. from Simulator.graph_to_task), their run state is ignored """
+        task_ids    = tuple(task.task_id for task in task_list)
+        index_of    = { task_id: index for index, task_id in enumerate(task_ids) }
+
+        if len(index_of) != len(task_ids):
+            raise ValueError("Task ids of the task list are not unique")
+
+        def get_index(task_id) -> int:
+            if task_id not in index_of:
+                raise ValueError(f"Task {task_id} is not in the task list")
+            return index_of[task_id]
+
+        require_offsets, require_sources, required_packets                  = [ 0 ], [], []
+        transmit_offsets, transmit_require, transmit_is_multicast           = [ 0 ], [], []
+        transmit_dest_offsets, transmit_dests                               = [ 0 ], []
+
+        for task in task_list:
+            for require in task.require_list:
+                require_sources.append(get_index(require.require_type_id))
+                required_packets.append(require.required_packets)
+            require_offsets.append(len(require_sources))
+
+            for transmit in task._transmit_template or ():
+                is_multicast = isinstance(transmit.id, Multicast)
+                transmit_require.append(transmit.require)
+                transmit_is_multicast.append(is_multicast)
+                transmit_dests.extend(get_index(task_id) for task_id in (transmit.id.task_ids if is_multicast else (transmit.id,)))
+                transmit_dest_offsets.append(len(transmit_dests))
+            transmit_offsets.append(len(transmit_require))
+
+        return cls( task_ids                    = task_ids,
+                    processing_cycles           = _get_read_only_array([ task.processing_cycles for task in task_list ]),
+                    expected_generated_packets  = _get_read_only_array([ task.expected_generated_packets for task in task_list ]),
+                    is_transmit_task            = _get_read_only_array([ task.is_transmit_task for task in task_list ], bool),
+                    start_offsets               = _get_read_only_array([ task.start_offset for task in task_list ]),
+                    require_offsets             = _get_read_only_array(require_offsets),
+                    require_sources             = _get_read_only_array(require_sources),
+                    required_packets            = _get_read_only_array(required_packets),
+                    transmit_offsets            = _get_read_only_array(transmit_offsets),
+                    transmit_require            = _get_read_only_array(transmit_require),
+                    transmit_is_multicast       = _get_read_only_array(transmit_is_multicast, bool),
+                    transmit_dest_offsets       = _get_read_only_array(transmit_dest_offsets),
+                    transmit_dests              = _get_read_only_array(transmit_dests),
+                    affinities                  = tuple(task.affinity for task in task_list) )
+
+    def get_num_tasks(self) -> int:
+        return len(self.task_ids)
+
+    @property
+    def nbytes(self) -> int:
+        """ Bytes of the arrays """
+        return sum(value.nbytes for value in vars(self).values() if isinstance(value, np.ndarray))
+
+    def to_tasks(self) -> list[TaskInfo]:
+        """ New TaskInfo objects for a run (the simulator works on these), in the state of the start of a simulation """
+        task_ids    = self.task_ids
+        task_list   = []
+
+        for index, task_id in enumerate(task_ids):
+            require_list = [ RequireInfo( require_type_id   = task_ids[self.require_sources[j]],
+                                          required_packets  = int(self.required_packets[j]) )
+                             for j in range(self.require_offsets[index], self.require_offsets[index + 1]) ]
+
+            transmit_list = [ TransmitInfo( id=self._get_transmit_id(j), require=int(self.transmit_require[j]) )
+                              for j in range(self.transmit_offsets[index], self.transmit_offsets[index + 1]) ]
+
+            task_list.append(TaskInfo( task_id                     = task_id,
+                                       processing_cycles           = int(self.processing_cycles[index]),
+                                       expected_generated_packets  = int(self.expected_generated_packets[index]),
+                                       require_list                = require_list,
+                                       is_transmit_task            = bool(self.is_transmit_task[index]),
+                                       transmit_list               = transmit_list,
+                                       start_offset                = int(self.start_offsets[index]),
+                                       affinity                    = self.affinities[index] ))
+
+        return task_list
+
+    def _get_transmit_id(self, transmit_index: int):
+        dests = [ self.task_ids[dest] for dest in
+                  self.transmit_dests[self.transmit_dest_offsets[transmit_index]:self.transmit_dest_offsets[transmit_index + 1]] ]
+
+        if self.transmit_is_multicast[transmit_index]:
+            return Multicast(tuple(dests))
+        return dests[0]
+
+    def get_initial_state(self) -> "TaskState":
+        state = TaskState(self, np.zeros(TaskState.get_size(self), dtype=np.int64))
+        state.tasks[:, START_CYCLE]         = NO_CYCLE
+        state.tasks[:, END_CYCLE]           = NO_CYCLE
+        state.tasks[:, STATUS]              = TASK_STATUSES.index(TaskStatus.IDLE)
+        state.tasks[:, TRANSMIT_REMAINING]  = np.diff(self.transmit_offsets)
+        state.transmit_order[:]             = np.arange(len(self.transmit_require))
+        return state
+
+    def save_state(self, task_list: list[TaskInfo]) -> "TaskState":
+        """ Run state of `task_list` (the tasks of this graph, in the same order) """
+        state = TaskState(self, np.empty(TaskState.get_size(self), dtype=np.int64))
+
+        for index, task in enumerate(task_list):
+            state.tasks[index] = ( task.current_processing_cycle,
+                                   task.generated_packet_count,
+                                   task.sent_generated_packets,
+                                   TASK_STATUSES.index(task.status),
+                                   NO_CYCLE if task.start_cycle is None else task.start_cycle,
+                                   NO_CYCLE if task.end_cycle is None else task.end_cycle,
+                                   task.iteration,
+                                   len(task.transmit_list or ()) )
+
+            require_start = self.require_offsets[index]
+            for j, require in enumerate(task.require_list):
+                state.received_packet_count[require_start + j] = require.received_packet_count
+
+            transmit_start  = self.transmit_offsets[index]
+            template        = task._transmit_template or ()
+            entry_of        = { id(transmit): j for j, transmit in enumerate(template) }
+
+            for j, transmit in enumerate(template):
+                state.transmit_count[transmit_start + j] = transmit.count
+
+            # The remaining entries first, in their current order
+            remaining   = [ entry_of[id(transmit)] for transmit in task.transmit_list or () ]
+            sent        = sorted(set(range(len(template))) - set(remaining))
+            state.transmit_order[transmit_start:transmit_start + len(template)] = [ transmit_start + j for j in remaining + sent ]
+
+        return state
+
+    def load_state(self, task_list: list[TaskInfo], state: "TaskState") -> None:
+        """ Writes `state` to the run state of `task_list` (the tasks of this graph, in the same order) """
+        for index, task in enumerate(task_list):
+            ( current_processing_cycle, generated_packet_count, sent_generated_packets, status,
+              start_cycle, end_cycle, iteration, transmit_remaining ) = state.tasks[index].tolist()
+
+            task.current_processing_cycle   = current_processing_cycle
+            task.generated_packet_count     = generated_packet_count
+            task.sent_generated_packets     = sent_generated_packets
+            task.status                     = TASK_STATUSES[status]
+            task.start_cycle                = None if start_cycle == NO_CYCLE else start_cycle
+            task.end_cycle                  = None if end_cycle == NO_CYCLE else end_cycle
+            task.iteration                  = iteration
+
+            require_start = self.require_offsets[index]
+            for j, require in enumerate(task.require_list):
+                require.received_packet_count = int(state.received_packet_count[require_start + j])
+
+            template = task._transmit_template
+            if template is None:
+                continue
+
+            transmit_start = self.transmit_offsets[index]
+            for j, transmit in enumerate(template):
+                transmit.count = int(state.transmit_count[transmit_start + j])
+
+            order = state.transmit_order[transmit_start:transmit_start + transmit_remaining] - transmit_start
+            task.transmit_list[:] = [ template[j] for j in order ]
+
+
+class TaskState:
+    """
+    Snapshot of the run state of the tasks of a TaskGraph, all in one int64 buffer: a row of NUM_TASK_FIELDS per task
+    (`tasks`), the received packets per requirement, the sent packets per transmit entry and the order of the transmit
+    entries (the first TRANSMIT_REMAINING of a task are its transmit list). The simulator runs on the TaskInfo objects,
+    a state is taken from them (TaskGraph.save_state) or written back to them (TaskGraph.load_state).
+    """
+    def __init__(self, graph: TaskGraph, buffer: np.ndarray):
+        num_tasks       = graph.get_num_tasks()
+        num_requires    = len(graph.required_packets)
+        num_transmits   = len(graph.transmit_require)
+
+        self.graph                  = graph
+        self.buffer                 = buffer
+
+        offset                      = num_tasks * NUM_TASK_FIELDS
+        self.tasks                  = buffer[:offset].reshape(num_tasks, NUM_TASK_FIELDS)
+        self.received_packet_count  = buffer[offset:offset + num_requires]
+        offset                     += num_requires
+        self.transmit_count         = buffer[offset:offset + num_transmits]
+        offset                     += num_transmits
+        self.transmit_order         = buffer[offset:offset + num_transmits]
+
+    @staticmethod
+    def get_size(graph: TaskGraph) -> int:
+        return graph.get_num_tasks() * NUM_TASK_FIELDS + len(graph.required_packets) + 2 * len(graph.transmit_require)
+
+    def copy(self) -> "TaskState":
+        return TaskState(self.graph, self.buffer.copy())
+
+    def get_status(self, index: int) -> TaskStatus:
+        return TASK_STATUSES[self.tasks[index, STATUS]]
+
+    def get_cycles(self) -> tuple[np.ndarray, np.ndarray]:
+        """ Start and end cycle of each task, NO_CYCLE if not reached """
+        return self.tasks[:, START_CYCLE], self.tasks[:, END_CYCLE]
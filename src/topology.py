@@ -0,0 +1,340 @@
+import networkx as nx
+
+from collections    import deque
+from dataclasses    import dataclass
+
+from .flit          import BufferLocation
+from .routing       import RoutingAlgorithm, DIRECTION_OFFSETS, LOCAL_CANDIDATES
+
+# Order in which free router ports are given to the links of a user graph
+PORT_ORDER = ( BufferLocation.EAST, BufferLocation.NORTH, BufferLocation.WEST, BufferLocation.SOUTH )
+
+OPPOSITE_PORTS = { direction: next_input for direction, ( _, _, next_input ) in DIRECTION_OFFSETS.items() }
+
+
+@dataclass(frozen=True)
+class Link:
+    """
+    Link from an output port of a router to the input port `next_input` of the `neighbour` router.
+
+    Links of the same `ring` (a row or a column of the torus, the whole ring topology) share the
+    dateline virtual channel classes. A packet that crosses a link with `is_dateline` uses the
+    upper virtual channels until it leaves the ring (see Router._allocate_output_vc).
+    """
+    neighbour   : tuple[int, int]
+    next_input  : BufferLocation
+    ring        : object    = None
+    is_dateline : bool      = False
+
+
+class Topology:
+    """
+    Base class of the network topologies.
+
+    Each router has the four network ports (named after the directions, BufferLocation) and the
+    local port to its PE. A topology places the routers at (x, y) positions and connects their ports.
+    The links of each router are computed once in the constructor, the next hops towards a
+    destination once per destination (shortest paths, see get_next_hops).
+
+    Topologies other than the mesh bring their own routing (TopologyRouting).
+    """
+    name = "base"
+
+    def __init__(self):
+        self._links         = {} # position -> { output direction: Link }
+        self._next_hops     = {} # destination -> { position: candidate directions }
+        self._distances     = {} # destination -> { position: hops }
+
+    def get_positions(self) -> list[tuple[int, int]]:
+        return list( self._links )
+
+    def get_links(self, position: tuple) -> dict[BufferLocation, Link]:
+        return self._links[position]
+
+    def get_routing(self) -> RoutingAlgorithm:
+        return TopologyRouting( self )
+
+    def get_next_hops(self, current: tuple, dest: tuple) -> tuple[BufferLocation, ...]:
+        """ Output directions of the shortest paths from `current` to `dest` """
+        if current == dest:
+            return LOCAL_CANDIDATES
+
+        next_hops = self._next_hops.get( dest )
+        if next_hops is None:
+            next_hops = self._next_hops[dest] = self._compute_next_hops( dest )
+
+        return next_hops[current]
+
+    def get_distance(self, src: tuple, dest: tuple) -> int:
+        """ Hops from `src` to `dest` """
+        distances = self._distances.get( dest )
+        if distances is None:
+            distances = self._distances[dest] = self._compute_distances( dest )
+        return distances[src]
+
+    def get_average_hop_count(self) -> float:
+        """ Mean of the distance over all pairs of different routers """
+        positions   = self.get_positions()
+        total       = sum( self.get_distance( src, dest ) for src in positions for dest in positions )
+        return total / ( len(positions) * ( len(positions) - 1 ) )
+
+    def _compute_distances(self, dest: tuple) -> dict[tuple, int]:
+        """ Breadth first search from `dest`, the links are bidirectional """
+        distances   = { dest: 0 }
+        queue       = deque( [ dest ] )
+
+        while queue:
+            position = queue.popleft()
+            for link in self._links[position].values():
+                if link.neighbour not in distances:
+                    distances[link.neighbour] = distances[position] + 1
+                    queue.append( link.neighbour )
+
+        if len(distances) != len(self._links):
+            raise ValueError(f"{self} is not connected, {dest} cannot be reached from all the routers")
+
+        return distances
+
+    def _compute_next_hops(self, dest: tuple) -> dict[tuple, tuple[BufferLocation, ...]]:
+        """ All the outputs leading one hop closer to `dest`, in port order """
+        distances   = self._distances.get( dest )
+        if distances is None:
+            distances = self._distances[dest] = self._compute_distances( dest )
+
+        next_hops   = {}
+        for position, links in self._links.items():
+            next_hops[position] = tuple( direction for direction in PORT_ORDER if direction in links
+                                         and distances[links[direction].neighbour] == distances[position] - 1 )
+        return next_hops
+
+    def _add_link(self, src: tuple, direction: BufferLocation, dest: tuple,
+                  next_input: BufferLocation, ring: object = None, is_dateline: bool = False) -> None:
+        """ Adds the link in both directions """
+        self._links[src][direction]   = Link( dest, next_input, ring, is_dateline )
+        self._links[dest][next_input] = Link( src,  direction,  ring, is_dateline )
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}()"
+
+
+class MeshTopology(Topology):
+    """ 2D mesh, routed with the algorithms of routing.py """
+    name = "mesh"
+
+    def __init__(self, num_rows: int, num_cols: int):
+        super().__init__()
+        self._num_rows  = num_rows
+        self._num_cols  = num_cols
+
+        for x in range(num_cols):
+            for y in range(num_rows):
+                self._links[(x, y)] = {}
+
+        for ( x, y ) in self._links:
+            if x + 1 < num_cols:
+                self._add_link( (x, y), BufferLocation.EAST,  (x + 1, y), BufferLocation.WEST )
+            if y + 1 < num_rows:
+                self._add_link( (x, y), BufferLocation.NORTH, (x, y + 1), BufferLocation.SOUTH )
+
+    def get_routing(self) -> RoutingAlgorithm:
+        return None # Any algorithm of routing.ROUTING_ALGORITHMS
+
+    def get_distance(self, src: tuple, dest: tuple) -> int:
+        return abs( src[0] - dest[0] ) + abs( src[1] - dest[1] )
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self._num_rows}x{self._num_cols})"
+
+
+class TorusTopology(MeshTopology):
+    """
+    2D mesh with wraparound links in the rows and columns of atleast three routers.
+    Dimension order routing along the shorter way around (X first), the wraparound links are
+    the datelines of their row or column.
+    """
+    name = "torus"
+
+    def __init__(self, num_rows: int, num_cols: int):
+        super().__init__( num_rows, num_cols )
+
+        self._wrap_x    = num_cols >= 3
+        self._wrap_y    = num_rows >= 3
+
+        # Every link of a row or a column is on its ring, not only the wraparound
+        for ( x, y ), links in self._links.items():
+            for direction, link in links.items():
+                ring = ( "x", y ) if direction in ( BufferLocation.EAST, BufferLocation.WEST ) else ( "y", x )
+                if ( ring[0] == "x" and self._wrap_x ) or ( ring[0] == "y" and self._wrap_y ):
+                    links[direction] = Link( link.neighbour, link.next_input, ring )
+
+        for y in range(num_rows if self._wrap_x else 0):
+            self._add_link( (num_cols - 1, y), BufferLocation.EAST,  (0, y), BufferLocation.WEST,  ( "x", y ), True )
+        for x in range(num_cols if self._wrap_y else 0):
+            self._add_link( (x, num_rows - 1), BufferLocation.NORTH, (x, 0), BufferLocation.SOUTH, ( "y", x ), True )
+
+    def get_routing(self) -> RoutingAlgorithm:
+        return TopologyRouting( self )
+
+    def get_next_hops(self, current: tuple, dest: tuple) -> tuple[BufferLocation, ...]:
+        if current == dest:
+            return LOCAL_CANDIDATES
+
+        if current[0] != dest[0]:
+            return ( _get_ring_direction( current[0], dest[0], self._num_cols, self._wrap_x,
+                                          BufferLocation.EAST, BufferLocation.WEST ), )
+
+        return ( _get_ring_direction( current[1], dest[1], self._num_rows, self._wrap_y,
+                                      BufferLocation.NORTH, BufferLocation.SOUTH ), )
+
+    def get_distance(self, src: tuple, dest: tuple) -> int:
+        return ( _get_ring_distance( src[0], dest[0], self._num_cols, self._wrap_x ) +
+                 _get_ring_distance( src[1], dest[1], self._num_rows, self._wrap_y ) )
+
+
+def _get_ring_distance(current: int, dest: int, size: int, wrap: bool) -> int:
+    distance = abs( dest - current )
+    return min( distance, size - distance ) if wrap else distance
+
+
+def _get_ring_direction(current: int, dest: int, size: int, wrap: bool,
+                        positive: BufferLocation, negative: BufferLocation) -> BufferLocation:
+    """ Direction of the shorter way around, ties go the positive way """
+    forward = ( dest - current ) % size
+    if wrap:
+        return positive if forward <= size - forward else negative
+    return positive if dest > current else negative
+
+
+class GraphTopology(Topology):
+    """
+    Routers at the nodes of a networkx graph, the nodes are the (x, y) positions.
+    Routers have four network ports, so the degree is limited to four. Edges between
+    adjacent positions get the matching ports (east to west ...), the others the free ones.
+
+    Routed along the shortest paths, the first output in port order. Only deadlock free
+    if these paths do not make a cycle of channel dependencies.
+    """
+    name = "graph"
+
+    def __init__(self, graph: nx.Graph):
+        super().__init__()
+
+        errors = []
+        for node in graph.nodes:
+            if not ( isinstance(node, tuple) and len(node) == 2 and all( isinstance(i, int) for i in node ) ):
+                errors.append( f"node {node} is not an (x, y) position" )
+            elif graph.degree(node) > len(PORT_ORDER):
+                errors.append( f"node {node} has {graph.degree(node)} links, routers have {len(PORT_ORDER)} ports" )
+
+        if errors:
+            raise ValueError( "Invalid topology graph: " + ", ".join(errors) )
+
+        self._graph = graph
+
+        for node in sorted( graph.nodes ):
+            self._links[node] = {}
+
+        # Edges between adjacent positions first, so they get the matching ports
+        edges = sorted( tuple(sorted(edge)) for edge in graph.edges )
+        edges = sorted( edges, key=lambda edge: _get_adjacent_port( *edge ) is None )
+
+        for src, dest in edges:
+            self._add_graph_link( src, dest )
+
+    def _add_graph_link(self, src: tuple, dest: tuple) -> None:
+        src_links, dest_links = self._links[src], self._links[dest]
+
+        direction = _get_adjacent_port( src, dest )
+        if direction is not None and direction not in src_links and OPPOSITE_PORTS[direction] not in dest_links:
+            self._add_link( src, direction, dest, OPPOSITE_PORTS[direction] )
+            return
+
+        direction   = next( port for port in PORT_ORDER if port not in src_links )
+        next_input  = OPPOSITE_PORTS[direction]
+        if next_input in dest_links:
+            next_input = next( port for port in PORT_ORDER if port not in dest_links )
+
+        self._add_link( src, direction, dest, next_input )
+
+    def _compute_next_hops(self, dest: tuple) -> dict[tuple, tuple[BufferLocation, ...]]:
+        # Deterministic, a single shortest path towards each destination
+        return { position: candidates[:1] for position, candidates in super()._compute_next_hops( dest ).items() }
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self._graph.number_of_nodes()} routers)"
+
+
+def _get_adjacent_port(src: tuple, dest: tuple) -> BufferLocation:
+    """ Port of `src` towards `dest` in the mesh, None if they are not adjacent """
+    for direction, ( dx, dy, _ ) in DIRECTION_OFFSETS.items():
+        if ( src[0] + dx, src[1] + dy ) == dest:
+            return direction
+    return None
+
+
+class RingTopology(GraphTopology):
+    """
+    All the positions of the grid on a single ring, in snake order (row 0 east, row 1 west ...).
+    The link closing the ring is the dateline.
+    """
+    name = "ring"
+
+    def __init__(self, num_rows: int, num_cols: int):
+        if num_rows * num_cols < 3:
+            raise ValueError(f"A ring needs atleast 3 routers")
+
+        order = []
+        for y in range(num_rows):
+            row = [ (x, y) for x in range(num_cols) ]
+            order.extend( row if y % 2 == 0 else reversed(row) )
+
+        super().__init__( nx.cycle_graph( order ) )
+
+        # Same ring for all the links, the closing link is the dateline
+        closing = ( order[-1], order[0] )
+        for position, links in self._links.items():
+            for direction, link in links.items():
+                is_dateline = { position, link.neighbour } == set( closing )
+                links[direction] = Link( link.neighbour, link.next_input, "ring", is_dateline )
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({len(self._links)} routers)"
+
+
+class TopologyRouting(RoutingAlgorithm):
+    """
+    Table routing over the next hops of a topology. Used for the topologies other than the mesh,
+    deterministic so it does not need an escape channel. The torus and the ring rely on the
+    dateline channels instead, which need atleast two virtual channels.
+    """
+    name                = "topology"
+    is_deadlock_free    = True
+
+    def __init__(self, topology: Topology):
+        self._topology = topology
+
+    def get_candidates(self, current: tuple, dest: tuple, is_source_column: bool = False) -> tuple[BufferLocation, ...]:
+        return self._topology.get_next_hops( current, dest )
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self._topology})"
+
+
+TOPOLOGIES = { topology.name: topology for topology in ( MeshTopology, TorusTopology, RingTopology ) }
+
+
+def get_topology(topology, num_rows: int, num_cols: int) -> Topology:
+    """
+    `topology` is the name of a topology (see TOPOLOGIES) with `num_rows` x `num_cols` routers,
+    a networkx graph of (x, y) positions or a Topology instance.
+    """
+    if isinstance(topology, Topology):
+        return topology
+
+    if isinstance(topology, nx.Graph):
+        return GraphTopology( topology )
+
+    if topology not in TOPOLOGIES:
+        raise ValueError(f"Unknown topology {topology}. Available: {list(TOPOLOGIES)}")
+
+    return TOPOLOGIES[topology]( num_rows, num_cols )
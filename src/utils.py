@@ -2,7 +2,7 @@ import json
 import random
 import networkx as nx
 
-from .simulator import Map
+from .simulator import Map, GraphValidationError
 from .packet import PacketStatus, Packet
 from .processing_element import TaskInfo
 
@@ -19,41 +19,44 @@ def graph_to_task_list(graph: nx.DiGraph) -> list:
         there should be an edge with weight = int,
         representing the number of packets required
 
+    All the missing attributes are raised at once (GraphValidationError).
     """
     from src.processing_element import TaskInfo
     from src.processing_element import RequireInfo
 
+    task_types  = ("task", "task_depend")
+    errors      = []
+
+    for node, data in graph.nodes(data=True):
+        if data["type"] not in task_types:
+            continue
+
+        for attribute in ("processing_time", "generate"):
+            if attribute not in data:
+                errors.append(f"Node {node}: need to mention {attribute} for task nodes")
+
+        for predecessor, edge in graph.pred[node].items():
+            if "weight" not in edge:
+                errors.append(f"Edge ({predecessor}, {node}): need to mention weight for all edges")
+
+    if errors:
+        raise GraphValidationError(errors)
+
     computing_list = []
-    # Creating computing list
-    for node in graph.nodes:
+    # Creating computing list, with the require list of each task
+    for node, data in graph.nodes(data=True):
 
-        if graph.nodes[node]["type"] in ("task", "task_depend"):
+        if data["type"] in task_types:
 
             task = TaskInfo(
                 task_id=node,
-                processing_cycles=graph.nodes[node]["processing_time"],
-                expected_generated_packets=graph.nodes[node]["generate"],
-                require_list=[],
+                processing_cycles=data["processing_time"],
+                expected_generated_packets=data["generate"],
+                require_list=[ RequireInfo(require_type_id=predecessor, required_packets=edge["weight"]) 
+                               for predecessor, edge in graph.pred[node].items() ],
             )
             computing_list.append(task)
 
-    # Updating require list for each task
-    for node in graph.nodes:
-
-        if graph.nodes[node]["type"] in ("task", "task_depend"):
-            predecessors = list(graph.predecessors(node))
-
-            for predecessor in predecessors:
-                # print(f"Node {node} has predecessor {predecessor}")
-                for task in computing_list:
-
-                    if task.task_id == node:
-                        require = RequireInfo(
-                            require_type_id=predecessor,
-                            required_packets=graph[predecessor][node]["weight"],
-                        )
-                        task.require_list.append(require)
-
     return computing_list
 
 def simulate_application_on_pe( computing_list  : list[TaskInfo], 
@@ -242,16 +245,15 @@ def get_graph_report(graph: nx.DiGraph, mapping_list: list[Map], show: bool = Fa
     """
     Updates the node of the application graph with the processing start_cycle and end_cycle.
     """
+    maps = { map.task.task_id: map for map in mapping_list } # The last entry of a task is used
+
     for node_id, node in graph.nodes(data=True):
 
-        for map in mapping_list:
-            task = map.task
-            if task.task_id == node_id:
-                start_cycle = task.start_cycle
-                end_cycle   = task.end_cycle    
-                node["start_cycle"] = start_cycle
-                node["end_cycle"]   = end_cycle
-                node["assigned_pe"] = map.assigned_pe
+        map = maps.get(node_id)
+        if map is not None:
+            node["start_cycle"] = map.task.start_cycle
+            node["end_cycle"]   = map.task.end_cycle
+            node["assigned_pe"] = map.assigned_pe
 
     return graph
 
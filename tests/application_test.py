@@ -0,0 +1,64 @@
+import networkx as nx
+
+from src.simulator      import Simulator, GraphMap
+from src.application    import Application
+
+
+def get_chain_graph(weight: int) -> nx.DiGraph:
+    """ 0 -> 1 -> 2 """
+    graph = nx.DiGraph()
+    graph.add_node(0, processing_time=4)
+    graph.add_node(1, processing_time=3)
+    graph.add_node(2, processing_time=2, generate=1)
+    graph.add_edge(0, 1, weight=weight)
+    graph.add_edge(1, 2, weight=weight)
+    return graph
+
+
+def test_single_application_matches_run():
+    graph   = get_chain_graph(weight=3)
+    mapping = [ GraphMap(0, (0,0)), GraphMap(1, (2,0)), GraphMap(2, (2,2)) ]
+
+    sim         = Simulator(num_rows=3, num_cols=3)
+    task_list   = sim.graph_to_task(graph)
+    sim.map(sim.set_assigned_mapping_list(task_list, mapping))
+    latency     = sim.run()
+
+    app_sim = Simulator(num_rows=3, num_cols=3)
+    app_sim.map_applications([ Application(app_id=0, graph=graph, mapping=mapping) ])
+
+    assert app_sim.run() == latency
+
+    report = app_sim.get_application_report()[0]
+    assert report.makespan              == report.isolated_makespan
+    assert report.interference_cycles   == 0
+    assert report.task_ids              == [ (0, 0), (0, 1), (0, 2) ]
+
+
+def test_co_scheduled_applications():
+    r"""
+    Two applications with the same node ids share the X links of row 0.
+    App 1 starts 20 cycles later.
+    """
+    app_0 = Application( app_id     = 0, 
+                         graph      = get_chain_graph(weight=6), 
+                         mapping    = [ GraphMap(0, (0,0)), GraphMap(1, (3,0)), GraphMap(2, (3,3)) ] )
+
+    app_1 = Application( app_id         = 1, 
+                         graph          = get_chain_graph(weight=6), 
+                         mapping        = [ GraphMap(0, (1,0)), GraphMap(1, (2,0)), GraphMap(2, (2,3)) ], 
+                         start_offset   = 20 )
+
+    sim = Simulator(num_rows=4, num_cols=4)
+    sim.map_applications([ app_0, app_1 ])
+    sim.run()
+
+    report_0, report_1 = sim.get_application_report()
+
+    assert report_0.start_cycle == 1
+    assert report_1.start_cycle == 21
+    assert report_1.makespan    == report_1.end_cycle - 20
+
+    for report in ( report_0, report_1 ):
+        assert report.interference_cycles   >= 0
+        assert report.slowdown              == report.makespan / report.isolated_makespan
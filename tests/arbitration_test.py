@@ -0,0 +1,92 @@
+import pytest
+import networkx as nx
+
+from src.arbitration    import SWITCH_ALLOCATORS, RoundRobinAllocator, AgeAllocator, get_switch_allocator
+from src.packet         import Packet
+from src.simulator      import Simulator, GraphMap
+
+from tests.profiler_test import get_simple_mapping_list
+
+
+SINK    = (1, 1)
+SOURCES = [ (0, 1), (1, 2), (2, 1), (1, 0) ] # west, north, east and south of the sink
+
+
+def run_hotspot(arbitration: str, switching: str = "store_and_forward") -> tuple[Simulator, dict]:
+    """ Each source sends 10 packets to the sink, returns the end cycle of the sources """
+    graph   = nx.DiGraph()
+    pes     = { 0: SINK }
+
+    graph.add_node(0, type="task", processing_time=1, generate=1)
+    for i, src in enumerate(SOURCES, start=1):
+        graph.add_node(i, type="task", processing_time=1)
+        graph.add_edge(i, 0, weight=10)
+        pes[i] = src
+
+    sim         = Simulator( num_rows=4, num_cols=4, max_cycles=5000, switching=switching, arbitration=arbitration )
+    task_list   = sim.graph_to_task( graph )
+    mapping     = [ GraphMap( task_id=task.task_id, assigned_pe=pes[task.task_id] ) for task in task_list ]
+    sim.map( sim.set_assigned_mapping_list( task_list, mapping ) )
+    sim.run()
+
+    return sim, { map.assigned_pe: map.task.end_cycle for map in sim.get_mapping_list() if map.assigned_pe != SINK }
+
+
+def test_round_robin_order():
+    allocator = RoundRobinAllocator()
+    assert allocator.get_order( 5, None ) == [ 0, 1, 2, 3, 4 ]
+
+    allocator.record_grant( 2 )
+    assert allocator.get_order( 5, None ) == [ 3, 4, 0, 1, 2 ]
+
+    allocator.record_grant( 4 )
+    assert allocator.get_order( 5, None ) == [ 0, 1, 2, 3, 4 ]
+
+
+def test_age_order():
+    """ Oldest packet first, empty inputs last """
+    old, new    = [ Packet( source_xy=(0, 0), dest_id=0, source_task_id=i ).pop_flit()[1] for i in range(2) ]
+    ages        = [ ( float("inf"), ), new.get_sequence(), old.get_sequence() ]
+
+    assert AgeAllocator().get_order( 3, lambda index: ages[index] ) == [ 2, 1, 0 ]
+
+
+@pytest.mark.parametrize("arbitration", SWITCH_ALLOCATORS.keys())
+@pytest.mark.parametrize("switching",   [ "store_and_forward", "wormhole" ])
+def test_single_flow_latency(arbitration, switching):
+    """ Without competing inputs the policy does not matter """
+    sim = Simulator( num_rows=3, num_cols=3, max_cycles=100, switching=switching, arbitration=arbitration )
+    sim.map( get_simple_mapping_list() )
+
+    assert sim.run() == ( 56 if switching == "store_and_forward" else 25 )
+    assert sim.get_starvation_report() == {}
+
+
+def test_fixed_priority_starves_south():
+    """ The south input comes last in the declaration order, its source finishes far behind the others """
+    sim, end_cycles = run_hotspot( "fixed_priority" )
+    starvation      = sim.get_starvation_report()
+
+    assert max( end_cycles, key=end_cycles.get ) == (1, 0)
+    assert list( starvation ) == [ "[R(1, 1)] south_input", "[R(1, 1)] east_input", "[R(1, 1)] north_input" ]
+
+
+@pytest.mark.parametrize("arbitration", [ "round_robin", "age" ])
+def test_fair_arbitration_tail(arbitration):
+    """ The fair policies share the sink between the inputs and bring down the last source """
+    _, fixed_end_cycles = run_hotspot( "fixed_priority" )
+    sim, end_cycles     = run_hotspot( arbitration )
+
+    assert max( end_cycles.values() ) < max( fixed_end_cycles.values() )
+    assert len( sim.get_starvation_report() ) == len( SOURCES )
+
+    sim.clear()
+    assert sim.get_starvation_report() == {}
+
+
+def test_unknown_arbitration():
+    with pytest.raises(ValueError):
+        get_switch_allocator( "lottery" )
+
+    with pytest.raises(ValueError):
+        Simulator( num_rows=2, num_cols=2, arbitration="lottery" )
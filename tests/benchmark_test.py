@@ -0,0 +1,51 @@
+import json
+import pytest
+
+from dataclasses import asdict
+
+from src.simulator      import Simulator
+from benchmarks.graphs  import GRAPH_GENERATORS
+from benchmarks.bench   import BenchmarkCase, run_case, compare_to_baseline, save_baseline, load_baseline
+
+
+def test_generated_graphs_are_valid():
+    """
+    Generated graphs should pass graph_to_task and be reproducible with the same seed.
+    """
+    sim = Simulator(num_rows=3, num_cols=3)
+
+    for graph_type, generator in GRAPH_GENERATORS.items():
+        graph   = generator(8, "medium", seed=1)
+        same    = generator(8, "medium", seed=1)
+
+        assert list(graph.edges(data=True)) == list(same.edges(data=True)), f"{graph_type} is not reproducible"
+        assert len(sim.graph_to_task(graph)) == 8
+
+
+def test_compare_to_baseline():
+    case        = BenchmarkCase(mesh_size=3, graph_type="chain", num_tasks=4, density="low")
+    result      = run_case(case, measure_memory=False)
+    baseline    = { result.name: asdict(result) }
+
+    assert compare_to_baseline([result], baseline, threshold=0.1) == []
+
+    # Twice as fast baseline -> regression
+    baseline[result.name]["cycles_per_second"] *= 2
+    regressed = compare_to_baseline([result], baseline, threshold=0.1)
+
+    assert len(regressed) == 1
+    assert "cycles_per_second" in regressed[0].regressions[0]
+
+
+def test_old_baselines_are_refused(tmp_path):
+    """ Baselines of another version ran other graphs """
+    result = run_case(BenchmarkCase(mesh_size=3, graph_type="chain", num_tasks=4, density="low"), measure_memory=False)
+
+    save_baseline([result], tmp_path / "baseline.json")
+    assert list(load_baseline(tmp_path / "baseline.json")) == [ result.name ]
+
+    with open(tmp_path / "old.json", "w") as file:
+        json.dump({ "python": "3.11", "machine": "x86_64", "results": [ asdict(result) ] }, file)
+
+    with pytest.raises(ValueError):
+        load_baseline(tmp_path / "old.json")
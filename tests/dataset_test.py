@@ -0,0 +1,54 @@
+import os
+import pytest
+
+from src.dataset import DatasetConfig, generate_dataset, get_shard_path, load_shard, get_shard_seed, main
+
+
+CONFIG = DatasetConfig( num_shards=3, samples_per_shard=4, seed=7, mesh_size=3, min_tasks=3, max_tasks=6 )
+
+
+def load_dataset(output_dir: str) -> list[list[dict]]:
+    return [ load_shard( get_shard_path( output_dir, shard_index ) ) for shard_index in range( CONFIG.num_shards ) ]
+
+
+def test_samples(tmp_path):
+    assert generate_dataset( tmp_path, CONFIG ) == [ 0, 1, 2 ]
+
+    for samples in load_dataset( tmp_path ):
+        assert len( samples ) == CONFIG.samples_per_shard
+
+        for sample in samples:
+            assert len( sample["start_cycles"] ) == len( sample["nodes"] ) == len( sample["mapping"] )
+            assert sample["latencies"] == [ end - start for start, end in zip( sample["start_cycles"], sample["end_cycles"] ) ]
+            assert sample["makespan"] >= max( sample["end_cycles"] ) - 1 # PE cycles start at 1
+
+
+def test_parallel_and_deterministic(tmp_path):
+    """ The shards do not depend on the number of workers """
+    generate_dataset( tmp_path / "serial", CONFIG )
+    generate_dataset( tmp_path / "parallel", CONFIG, num_workers=2 )
+
+    assert load_dataset( tmp_path / "serial" ) == load_dataset( tmp_path / "parallel" )
+    assert len( { get_shard_seed( CONFIG.seed, shard_index ) for shard_index in range(100) } ) == 100
+
+
+def test_resume(tmp_path):
+    generate_dataset( tmp_path, CONFIG )
+    samples = load_dataset( tmp_path )
+
+    os.remove( get_shard_path( tmp_path, 1 ) )
+    with open( get_shard_path( tmp_path, 2 ) + ".123.tmp", "w" ) as file:
+        file.write( "interrupted" )
+
+    assert generate_dataset( tmp_path, CONFIG, num_workers=2 ) == [ 1 ]
+    assert load_dataset( tmp_path ) == samples
+    assert not any( name.endswith( ".tmp" ) for name in os.listdir( tmp_path ) )
+    assert generate_dataset( tmp_path, CONFIG ) == []
+
+    with pytest.raises(ValueError):
+        generate_dataset( tmp_path, DatasetConfig( num_shards=3, samples_per_shard=4, seed=8 ) )
+
+
+def test_command_line(tmp_path):
+    assert main( [ "--output", str( tmp_path ), "--num-shards", "2", "--samples-per-shard", "1", "--workers", "1", "--mesh-size", "3" ] ) == 0
+    assert len( load_shard( get_shard_path( tmp_path, 1 ) ) ) == 1
@@ -0,0 +1,69 @@
+import pytest
+
+from src.packet             import Packet
+from src.flit               import NextHop, BufferLocation
+from src.processing_element import TaskInfo, RequireInfo
+from src.simulator          import Simulator, Map
+from src.deadlock           import DeadlockError, StallError
+
+
+def fill_buffer(buffer, next_hop: NextHop) -> None:
+    """Fills the buffer with a complete packet and sets its routing information."""
+    packet = Packet(source_xy=(0, 0), dest_id=1, source_task_id=0)
+    buffer.fill_with_packet(packet)
+    buffer.queue[0].update_routing_info(next_hop)
+
+
+def get_waiting_task_mapping() -> list[Map]:
+    """Task 1 waits for packets of task 0, which is never mapped."""
+    task_1 = TaskInfo(
+                task_id                     = 1,
+                processing_cycles           = 4,
+                expected_generated_packets  = 1,
+                require_list                = [RequireInfo(
+                                                require_type_id=0,
+                                                required_packets=2)] )
+
+    return [ Map( task=task_1, assigned_pe=(1,1) ) ]
+
+
+def test_deadlock_cycle():
+    r"""
+    Condition: R(0,0) and R(1,0) have full buffers that wait on each other.
+
+    R(0,0) east_output -> R(1,0) west_input -> R(1,0) west_output -> R(0,0) east_input -> R(0,0) east_output
+    """
+    sim = Simulator(num_rows=2, num_cols=2)
+    sim.map(get_waiting_task_mapping())
+
+    router_00 = sim._routers[(0, 0)]
+    router_10 = sim._routers[(1, 0)]
+
+    fill_buffer( router_00._east_output_buffer, NextHop( x=1, y=0, next_input_buffer=BufferLocation.WEST,  output_buffer=BufferLocation.EAST ) )
+    fill_buffer( router_10._west_input_buffer,  NextHop( x=1, y=0, next_input_buffer=BufferLocation.WEST,  output_buffer=BufferLocation.WEST ) )
+    fill_buffer( router_10._west_output_buffer, NextHop( x=0, y=0, next_input_buffer=BufferLocation.EAST,  output_buffer=BufferLocation.WEST ) )
+    fill_buffer( router_00._east_input_buffer,  NextHop( x=0, y=0, next_input_buffer=BufferLocation.EAST,  output_buffer=BufferLocation.EAST ) )
+
+    with pytest.raises(DeadlockError) as error:
+        sim.run()
+
+    assert error.value.cycle_count == 0
+    assert sorted(error.value.blocked_buffers) == sorted([ "[R(0, 0)] east_output", 
+                                                           "[R(1, 0)] west_input", 
+                                                           "[R(1, 0)] west_output", 
+                                                           "[R(0, 0)] east_input" ])
+
+
+def test_stall_without_cycle():
+    """
+    Condition: Task waits for packets that are never sent. 
+    No buffers are blocked, so the simulation stalls after `stall_threshold` cycles.
+    """
+    sim = Simulator(num_rows=2, num_cols=2, stall_threshold=5)
+    sim.map(get_waiting_task_mapping())
+
+    with pytest.raises(StallError) as error:
+        sim.run()
+
+    assert error.value.cycle_count      == 4
+    assert error.value.blocked_edges    == []
@@ -0,0 +1,61 @@
+import pytest
+
+from src.flit       import BufferLocation
+from src.simulator  import Simulator
+
+from tests.profiler_test    import get_simple_mapping_list
+from tests.link_timing_test import get_pair_latency, run_flows
+
+
+ROW_FLOWS = [ ( (0, 0), (3, 3) ), ( (1, 0), (3, 2) ), ( (2, 0), (3, 1) ), ( (0, 1), (3, 1) ) ]
+
+
+def fail(*args):
+    raise AssertionError("Upstream router looked into the input buffer of its neighbour")
+
+
+@pytest.mark.parametrize("switching", [ "wormhole", "virtual_cut_through" ])
+def test_no_downstream_buffer_polling(switching):
+    """ Routers only know the state of their neighbours' input buffers from the credits """
+    sim = Simulator( num_rows=3, num_cols=3, max_cycles=100, switching=switching, num_vcs=2 )
+
+    for router in sim._routers.values():
+        for direction, input_vcs in router._input_vcs.items():
+            if direction is BufferLocation.LOCAL:
+                continue # Polled by the PE
+            for buffer in input_vcs:
+                buffer.is_full = buffer.get_free_slots = buffer.can_accept_flit = fail
+
+    sim.map( get_simple_mapping_list() )
+    assert sim.run() == 25
+
+
+def test_credits_are_returned():
+    sim = Simulator( num_rows=3, num_cols=3, max_cycles=100, switching="wormhole", num_vcs=2, credit_delay=3 )
+    sim.map( get_simple_mapping_list() )
+    sim.run()
+
+    for router in sim._routers.values():
+        for _ in range(4):
+            router.forward_output_buffer_flits( sim._routers, sim._pes )
+
+        for credits in router._credits:
+            assert credits is None or credits == [ 4, 4 ]
+
+
+def test_credit_delay():
+    """ Up to three cycles, the credits are back before the four slots of a buffer are used up """
+    assert get_pair_latency( (3, 0), credit_delay=3 ) == get_pair_latency( (3, 0) )
+
+    latencies = [ run_flows( ROW_FLOWS, credit_delay=delay ) for delay in range(6) ]
+
+    assert len( set( latencies[:4] ) ) == 1
+    assert latencies[3] < latencies[4] < latencies[5]
+
+
+def test_credit_delay_needs_flit_level_switching():
+    with pytest.raises(ValueError):
+        Simulator( num_rows=2, num_cols=2, credit_delay=1 )
+
+    with pytest.raises(ValueError):
+        Simulator( num_rows=2, num_cols=2, switching="wormhole", credit_delay=-1 )
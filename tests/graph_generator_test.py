@@ -0,0 +1,91 @@
+import pytest
+import numpy as np
+import networkx as nx
+
+from src.graph_generator    import GENERATORS, generate_graphs, layered_dag, series_parallel, random_dag, fork_join
+from src.simulator          import Simulator, get_graph_errors
+
+
+@pytest.mark.parametrize("generator", GENERATORS)
+def test_valid_graphs(generator):
+    """ Connected DAGs that graph_to_task accepts, with the attributes in their ranges """
+    for seed in range(5):
+        arrays  = GENERATORS[generator](12, seed=seed, processing_time_range=(3, 4), weight_range=(1, 9), generate_range=(2, 2))
+        graph   = arrays.to_networkx()
+
+        assert get_graph_errors(graph) == []
+        assert nx.is_directed_acyclic_graph(graph)
+        assert nx.is_weakly_connected(graph) or generator == "layered_dag" # every node of a layer has a neighbour in the next one
+        assert graph.number_of_nodes() == arrays.get_num_tasks() == 12
+
+        for node_id, data in graph.nodes(data=True):
+            assert 3 <= data["processing_time"] <= 4
+            assert data.get("generate") == ( 2 if graph.out_degree(node_id) == 0 else None )
+
+        assert all( 1 <= weight <= 9 for _, _, weight in graph.edges(data="weight") )
+
+
+@pytest.mark.parametrize("generator", GENERATORS)
+def test_reproducible(generator):
+    graph, same_graph = GENERATORS[generator](10, seed=3).to_networkx(), GENERATORS[generator](10, seed=3).to_networkx()
+
+    assert list(graph.nodes(data=True)) == list(same_graph.nodes(data=True))
+    assert list(graph.edges(data=True)) == list(same_graph.edges(data=True))
+
+
+def test_structure():
+    graph = fork_join(6).to_networkx()
+    assert sorted(graph.successors(0)) == [ 1, 2, 3, 4 ]
+    assert sorted(graph.predecessors(5)) == [ 1, 2, 3, 4 ]
+
+    # Edges only between consecutive layers: all the paths from a source to a sink have the same length
+    graph   = layered_dag(30, num_layers=5, seed=1).to_networkx()
+    sources = [ n for n in graph if graph.in_degree(n) == 0 ]
+    sinks   = [ n for n in graph if graph.out_degree(n) == 0 ]
+    assert nx.dag_longest_path_length(graph, weight=None) == 4
+    assert all( len(path) == 5 for source in sources for path in nx.all_simple_paths(graph, source, sinks) )
+
+    # A single source and a single sink
+    graph = series_parallel(20, seed=2).to_networkx()
+    assert [ n for n in graph if graph.in_degree(n) == 0 ] == [ 0 ]
+    assert [ n for n in graph if graph.out_degree(n) == 0 ] == [ 1 ]
+
+    arrays = random_dag(20, seed=4)
+    assert np.all( arrays.sources < arrays.targets )
+
+    arrays = random_dag(20, seed=4, random_order=True)
+    assert not np.all( arrays.sources < arrays.targets )
+
+
+def test_generate_graphs():
+    graphs = generate_graphs("layered_dag", 4, 15, seed=7, edge_probability=0.5)
+
+    assert len(graphs) == 4
+    assert len({ tuple(graph.edges) for graph in graphs }) == 4 # each graph has its own seed
+    assert [ list(graph.edges) for graph in generate_graphs("layered_dag", 4, 15, seed=7, edge_probability=0.5) ] == \
+           [ list(graph.edges) for graph in graphs ]
+
+    sim = Simulator( num_rows=4, num_cols=4, max_cycles=100000 )
+    for graph in graphs:
+        sim.graph_to_task( graph )
+        sim.get_random_mapping( do_map=True )
+        assert sim.run() > 0
+        sim.clear()
+
+
+def test_invalid_sizes():
+    with pytest.raises(ValueError):
+        fork_join(2)
+    with pytest.raises(ValueError):
+        layered_dag(3, num_layers=4)
+    with pytest.raises(ValueError):
+        series_parallel(1)
+
+
+@pytest.mark.parametrize("ranges", [ dict( generate_range=(0, 1) ), dict( weight_range=(0, 3) ),
+                                     dict( processing_time_range=(0, 2) ), dict( weight_range=(5, 2) ) ])
+def test_invalid_ranges(ranges):
+    """ A terminal node drawing generate=0 (or an edge of weight 0) would not pass graph_to_task """
+    for generator in GENERATORS:
+        with pytest.raises(ValueError):
+            GENERATORS[generator](5, seed=2, **ranges)
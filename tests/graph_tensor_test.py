@@ -0,0 +1,95 @@
+import os
+import pytest
+import numpy as np
+import networkx as nx
+
+from src.dataset        import DatasetConfig, generate_dataset, generate_shard
+from src.result_store   import ResultStore
+from src.simulator      import Simulator, GraphMap
+from src.graph_tensor   import get_graph_tensors, samples_to_tensors, export_batches, iter_batches, load_batch, get_batch_path, write_batch, main
+
+
+CONFIG = DatasetConfig( num_shards=2, samples_per_shard=5, seed=3, mesh_size=3, min_tasks=3, max_tasks=6, format="columnar" )
+
+
+def test_simulated_graph():
+    """ Task 0 at PE(0, 0) sends 3 packets to task 1 at PE(2, 1) """
+    graph = nx.DiGraph()
+    graph.add_node( 0, processing_time=5 )
+    graph.add_node( 1, processing_time=4, generate=2 )
+    graph.add_edge( 0, 1, weight=3 )
+
+    sim         = Simulator( num_rows=3, num_cols=3 )
+    task_list   = sim.graph_to_task( graph )
+    sim.map( sim.set_assigned_mapping_list( task_list, [ GraphMap( 0, (0, 0) ), GraphMap( 1, (2, 1) ) ] ) )
+    makespan    = sim.run()
+
+    tensors = get_graph_tensors( graph, sim.get_mapping_list(), makespan )
+
+    assert tensors.node_features.tolist()   == [ [ 5, 0, 0, 0 ], [ 4, 2, 2, 1 ] ]
+    assert tensors.edge_index.tolist()      == [ [ 0 ], [ 1 ] ]
+    assert tensors.edge_features.tolist()   == [ [ 3, 3 ] ]
+    assert tensors.targets.tolist()         == [ [ task.start_cycle, task.end_cycle ] for task in task_list ]
+    assert tensors.makespan.tolist()        == [ makespan ]
+
+
+def test_batch_layout():
+    """ The samples of a batch are disjoint graphs, edges point to the tasks of their own sample """
+    samples = generate_shard( CONFIG, 0 )
+    tensors = samples_to_tensors( samples )
+    batch   = tensors.get_batch_vector()
+
+    assert tensors.get_num_samples() == len( samples )
+    assert np.array_equal( batch[ tensors.edge_index[0] ], batch[ tensors.edge_index[1] ] )
+
+    for index, sample in enumerate( samples ):
+        nodes = slice( tensors.node_offsets[index], tensors.node_offsets[index + 1] )
+        edges = slice( tensors.edge_offsets[index], tensors.edge_offsets[index + 1] )
+
+        assert tensors.targets[nodes, 1].tolist() == sample["end_cycles"]
+        assert ( tensors.edge_index[:, edges] - tensors.node_offsets[index] ).T.tolist() == [ edge[:2] for edge in sample["edges"] ]
+
+
+def test_export(tmp_path, monkeypatch):
+    generate_dataset( tmp_path / "store", CONFIG )
+    store = ResultStore( tmp_path / "store" )
+
+    # Batches are sliced from the shards, the columns of the whole store are never loaded
+    monkeypatch.setattr( ResultStore, "get_column", lambda self, name: pytest.fail( "get_column loads all the shards" ) )
+
+    assert export_batches( store, tmp_path / "batches", batch_size=4 ) == 3
+
+    batches = list( iter_batches( tmp_path / "batches" ) )
+    assert [ batch.get_num_samples() for batch in batches ] == [ 4, 4, 2 ]
+    assert isinstance( batches[0].node_features, np.memmap )
+
+    # The same tensors as the samples of each batch
+    samples = [ store.get_sample( index ) for index in range( len( store ) ) ]
+    for batch_index, batch in enumerate( batches ):
+        expected = samples_to_tensors( samples[ 4 * batch_index:4 * batch_index + 4 ] )
+        for name in vars( expected ):
+            assert np.array_equal( getattr( batch, name ), getattr( expected, name ) )
+
+    with pytest.raises(ValueError):
+        export_batches( store, tmp_path / "batches", batch_size=0 )
+
+
+def test_export_again(tmp_path):
+    """ A new export replaces the batches of the previous one """
+    generate_dataset( tmp_path / "store", CONFIG )
+    store = ResultStore( tmp_path / "store" )
+
+    assert export_batches( store, tmp_path / "batches", batch_size=2 ) == 5
+    assert export_batches( store, tmp_path / "batches", batch_size=3 ) == 4
+
+    assert [ batch.get_num_samples() for batch in iter_batches( tmp_path / "batches" ) ] == [ 3, 3, 3, 1 ]
+    assert sorted( os.listdir( tmp_path / "batches" ) ) == [ "batch_00000", "batch_00001", "batch_00002", "batch_00003", "batches.json" ]
+
+    write_batch( tmp_path / "batches", 0, samples_to_tensors( [ store.get_sample( 0 ) ] ) )
+    assert load_batch( get_batch_path( tmp_path / "batches", 0 ) ).get_num_samples() == 1
+
+
+def test_command_line(tmp_path):
+    generate_dataset( tmp_path / "store", CONFIG )
+    assert main( [ "--store", str( tmp_path / "store" ), "--output", str( tmp_path / "batches" ), "--batch-size", "16" ] ) == 0
+    assert load_batch( get_batch_path( tmp_path / "batches", 0 ) ).get_num_samples() == 10
@@ -0,0 +1,65 @@
+import pytest
+import networkx as nx
+
+from src.simulator  import Simulator, GraphMap, GraphValidationError, get_graph_errors
+from src.utils      import graph_to_task_list, get_graph_report
+
+
+def get_broken_graph() -> nx.DiGraph:
+    graph = nx.DiGraph()
+    graph.add_node(0, processing_time=2, generate=1)   # not a terminal node
+    graph.add_node(1)                                   # no processing_time
+    graph.add_node(2, processing_time=2)                # terminal node without generate
+    graph.add_edge(0, 1)                                # no weight
+    graph.add_edge(0, 2, weight=1)
+    return graph
+
+
+def test_all_errors_at_once():
+    with pytest.raises(GraphValidationError) as error:
+        Simulator( num_rows=2, num_cols=2 ).graph_to_task( get_broken_graph() )
+
+    assert isinstance( error.value, ValueError )
+    assert len( error.value.errors ) == 5
+    assert all( message in str( error.value ) for message in error.value.errors )
+
+    graph = nx.DiGraph()
+    graph.add_node(0, processing_time=2)
+    graph.add_node(1, processing_time=2, generate=1)
+    graph.add_edge(0, 1, weight=1)
+    assert get_graph_errors( graph ) == []
+
+
+def test_graph_to_task_list_errors():
+    graph = nx.DiGraph()
+    graph.add_node(0, type="task", processing_time=2, generate=1)
+    graph.add_node(1, type="task")
+    graph.add_edge(0, 1)
+
+    with pytest.raises(GraphValidationError) as error:
+        graph_to_task_list( graph )
+
+    assert len( error.value.errors ) == 3
+
+
+def test_mapping_lookups():
+    sim         = Simulator( num_rows=2, num_cols=2 )
+    graph       = nx.DiGraph()
+    graph.add_node(0, processing_time=2)
+    graph.add_node(1, processing_time=2, generate=1)
+    graph.add_edge(0, 1, weight=1)
+
+    task_list   = sim.graph_to_task( graph )
+    mapping     = [ GraphMap( task_id=1, assigned_pe=(1, 1) ), GraphMap( task_id=0, assigned_pe=(0, 0) ),
+                    GraphMap( task_id=1, assigned_pe=(0, 1) ) ]
+    map_list    = sim.set_assigned_mapping_list( task_list, mapping )
+
+    # In the order of the tasks, the first entry of a task is used
+    assert [ ( map.task.task_id, map.assigned_pe ) for map in map_list ] == [ ( 0, (0, 0) ), ( 1, (1, 1) ) ]
+
+    sim.map( map_list )
+    sim.run()
+    report = get_graph_report( graph, map_list )
+
+    assert report.nodes[1]["assigned_pe"] == (1, 1)
+    assert report.nodes[1]["end_cycle"] == task_list[1].end_cycle
@@ -0,0 +1,73 @@
+import pytest
+import networkx as nx
+
+from src.processing_element import ProcessingElement, TaskInfo
+from src.simulator          import Simulator, GraphMap
+
+
+def get_task(processing_cycles: int, affinity: dict = None) -> TaskInfo:
+    return TaskInfo( task_id=0, processing_cycles=processing_cycles, expected_generated_packets=1,
+                     require_list=[], affinity=affinity )
+
+
+def run_pair(pe_of_task_0: tuple, **kwargs) -> tuple[Simulator, int]:
+    """ Task 0 (16 cycles) sends 2 packets to task 1 (4 cycles) at PE(2, 2) """
+    graph = nx.DiGraph()
+    graph.add_node(0, type="task", processing_time=16)
+    graph.add_node(1, type="task", processing_time=4, generate=1)
+    graph.add_edge(0, 1, weight=2)
+
+    sim         = Simulator( num_rows=3, num_cols=3, max_cycles=1000, **kwargs )
+    task_list   = sim.graph_to_task( graph )
+    mapping     = [ GraphMap( task_id=0, assigned_pe=pe_of_task_0 ), GraphMap( task_id=1, assigned_pe=(2, 2) ) ]
+    sim.map( sim.set_assigned_mapping_list( task_list, mapping ) )
+
+    return sim, sim.run()
+
+
+def test_processing_cycles():
+    pe  = ProcessingElement( (0, 0), speed=2.0, pe_type="dsp" )
+
+    assert pe.get_processing_cycles( get_task( 16 ) )                   == 8
+    assert pe.get_processing_cycles( get_task( 15 ) )                   == 8 # rounded up
+    assert pe.get_processing_cycles( get_task( 16, { "dsp": 4 } ) )     == 2
+    assert pe.get_processing_cycles( get_task( 16, { "big": 4 } ) )     == 8
+    assert pe.get_processing_cycles( get_task( 1 ) )                    == 1 # atleast a cycle
+
+    assert ProcessingElement( (0, 0), speed=1.1 ).get_processing_cycles( get_task( 11 ) ) == 10
+
+    with pytest.raises(ValueError):
+        ProcessingElement( (0, 0), speed=0 )
+
+
+def test_fast_pe():
+    """ A PE twice as fast takes half the cycles for the task """
+    sim, cycles         = run_pair( (0, 0) )
+    fast_sim, fast_cycles = run_pair( (0, 0), pe_speeds={ (0, 0): 2.0 } )
+
+    task, fast_task     = sim.get_mapping_list()[0].task, fast_sim.get_mapping_list()[0].task
+
+    # The task runs once per generated packet
+    assert ( task.end_cycle - task.start_cycle ) - ( fast_task.end_cycle - fast_task.start_cycle ) == 2 * 8
+    assert cycles - fast_cycles == 2 * 8
+
+
+def test_task_affinity():
+    """ Task 0 is 4x faster on the DSP tile only """
+    kwargs = dict( pe_types={ (0, 0): "dsp", (0, 1): "big" }, task_affinity={ 0: { "dsp": 4 } } )
+
+    sim, dsp_cycles = run_pair( (0, 0), **kwargs )
+    _, big_cycles   = run_pair( (0, 1), **kwargs )
+    _, cycles       = run_pair( (0, 1) )
+
+    task = sim.get_mapping_list()[0].task
+    assert sim.get_processing_cycles( task, (0, 0) ) == 4
+    assert sim.get_processing_cycles( task, (0, 1) ) == 16
+
+    assert big_cycles == cycles
+    assert dsp_cycles < big_cycles
+
+
+def test_unknown_position():
+    with pytest.raises(ValueError):
+        Simulator( num_rows=2, num_cols=2, pe_speeds={ (5, 5): 2.0 } )
@@ -0,0 +1,85 @@
+import pytest
+import networkx as nx
+
+from src.simulator  import Simulator, GraphMap
+
+
+def get_pair_latency(dest: tuple, **kwargs) -> int:
+    """ Task 0 at PE(0, 0) sends 2 packets to task 1 at `dest` with wormhole switching """
+    graph = nx.DiGraph()
+    graph.add_node(0, type="task", processing_time=4)
+    graph.add_node(1, type="task", processing_time=4, generate=1)
+    graph.add_edge(0, 1, weight=2)
+
+    sim         = Simulator( num_rows=4, num_cols=4, max_cycles=5000, switching="wormhole", **kwargs )
+    task_list   = sim.graph_to_task( graph )
+    mapping     = [ GraphMap( task_id=0, assigned_pe=(0, 0) ), GraphMap( task_id=1, assigned_pe=dest ) ]
+    sim.map( sim.set_assigned_mapping_list( task_list, mapping ) )
+
+    return sim.run()
+
+
+def run_flows(flows: list[tuple[tuple, tuple]], weight: int = 10, **kwargs) -> int:
+    """Each flow is a pair of tasks, the source sends `weight` packets to the sink."""
+    graph   = nx.DiGraph()
+    pes     = {}
+
+    for i, ( src, dest ) in enumerate(flows):
+        graph.add_node(2 * i,     type="task", processing_time=1)
+        graph.add_node(2 * i + 1, type="task", processing_time=1, generate=1)
+        graph.add_edge(2 * i, 2 * i + 1, weight=weight)
+        pes[2 * i], pes[2 * i + 1] = src, dest
+
+    sim         = Simulator( num_rows=4, num_cols=4, max_cycles=5000, switching="wormhole", **kwargs )
+    task_list   = sim.graph_to_task( graph )
+    mapping     = [ GraphMap( task_id=task.task_id, assigned_pe=pes[task.task_id] ) for task in task_list ]
+    sim.map( sim.set_assigned_mapping_list( task_list, mapping ) )
+
+    return sim.run()
+
+
+@pytest.mark.parametrize("link_latency",    [ 0, 1, 2 ])
+@pytest.mark.parametrize("pipeline_depth",  [ 1, 2, 4 ])
+def test_per_hop_latency(link_latency, pipeline_depth):
+    """ Each hop adds the router pipeline and the link latency """
+    latencies = [ get_pair_latency( (x, 0), link_latency=link_latency, router_pipeline_depth=pipeline_depth )
+                  for x in range(1, 4) ]
+
+    assert latencies[1] - latencies[0] == pipeline_depth + link_latency
+    assert latencies[2] - latencies[1] == pipeline_depth + link_latency
+
+
+def test_defaults_match_wormhole():
+    assert get_pair_latency( (3, 3) ) == get_pair_latency( (3, 3), link_latency=0, router_pipeline_depth=1, link_width=1 )
+
+
+def test_per_link_latency():
+    """ Only the link from R(1, 0) to R(2, 0) is slow """
+    slow_link   = { ( (1, 0), (2, 0) ): 5 }
+    latency     = get_pair_latency( (3, 0), link_latency=slow_link )
+
+    assert latency == get_pair_latency( (3, 0) ) + 5
+    assert get_pair_latency( (1, 0), link_latency=slow_link ) == get_pair_latency( (1, 0) )
+
+
+def test_long_link_is_not_a_stall():
+    """ Flits on a link are moving, even if nothing else happens for longer than the stall threshold """
+    assert get_pair_latency( (1, 0), link_latency=30, stall_threshold=20 ) > 30
+
+
+def test_link_width():
+    """ Wider links relieve the contention on the east links of row 0 """
+    flows = [ ( (0, 0), (3, 3) ), ( (1, 0), (3, 2) ), ( (2, 0), (3, 1) ), ( (0, 1), (3, 1) ) ]
+
+    assert run_flows( flows, link_width=2 ) < run_flows( flows, link_width=1 )
+
+
+def test_needs_flit_level_switching():
+    with pytest.raises(ValueError):
+        Simulator( num_rows=2, num_cols=2, link_latency=1 )
+
+    with pytest.raises(ValueError):
+        Simulator( num_rows=2, num_cols=2, router_pipeline_depth=3 )
+
+    with pytest.raises(ValueError):
+        Simulator( num_rows=2, num_cols=2, switching="wormhole", link_width=0 )
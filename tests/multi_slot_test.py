@@ -0,0 +1,79 @@
+import pytest
+import networkx as nx
+
+from src.processing_element import ProcessingElement
+from src.simulator          import Simulator, GraphMap
+
+from tests.profiler_test import get_simple_mapping_list
+
+CLUSTER = (1, 1)
+
+
+def run_fan_out(num_slots: int, **kwargs) -> tuple[Simulator, int]:
+    """ Task 0 sends a packet to each of the tasks 1 to 4 on the cluster PE, they all send one to the sink 5 """
+    graph = nx.DiGraph()
+    graph.add_node(0, type="task", processing_time=2)
+    graph.add_node(5, type="task", processing_time=2, generate=1)
+
+    for task_id in range(1, 5):
+        graph.add_node(task_id, type="task", processing_time=10)
+        graph.add_edge(0, task_id, weight=1)
+        graph.add_edge(task_id, 5, weight=1)
+
+    pes = { 0: (0, 0), 5: (2, 2), 1: CLUSTER, 2: CLUSTER, 3: CLUSTER, 4: CLUSTER }
+
+    sim         = Simulator( num_rows=3, num_cols=3, max_cycles=2000, pe_slots={ CLUSTER: num_slots }, **kwargs )
+    task_list   = sim.graph_to_task( graph )
+    mapping     = [ GraphMap( task_id=task.task_id, assigned_pe=pes[task.task_id] ) for task in task_list ]
+    sim.map( sim.set_assigned_mapping_list( task_list, mapping ) )
+
+    return sim, sim.run()
+
+
+def get_cluster_tasks(sim: Simulator) -> list:
+    return [ map.task for map in sim.get_mapping_list() if map.assigned_pe == CLUSTER ]
+
+
+def test_single_slot_is_default():
+    sim = Simulator( num_rows=3, num_cols=3, max_cycles=100, pe_slots={ (0, 0): 1 } )
+    sim.map( get_simple_mapping_list() )
+
+    assert sim.run() == 56
+
+
+@pytest.mark.parametrize("switching", [ "store_and_forward", "wormhole" ])
+def test_slots_run_tasks_concurrently(switching):
+    sim, cycles = run_fan_out( 1, switching=switching )
+    tasks       = get_cluster_tasks( sim )
+
+    # One slot: the tasks run one after the other
+    intervals = sorted( ( task.start_cycle, task.end_cycle ) for task in tasks )
+    assert all( end <= next_start for ( _, end ), ( next_start, _ ) in zip( intervals, intervals[1:] ) )
+
+    for num_slots in [ 2, 4 ]:
+        slot_sim, slot_cycles   = run_fan_out( num_slots, switching=switching )
+        slot_tasks              = get_cluster_tasks( slot_sim )
+
+        # Never more tasks in compute than slots
+        for cycle in range( slot_cycles ):
+            active = [ task for task in slot_tasks if task.start_cycle <= cycle < task.end_cycle ]
+            assert len( active ) <= num_slots
+
+        assert max( sum( task.start_cycle <= cycle < task.end_cycle for task in slot_tasks ) 
+                    for cycle in range( slot_cycles ) ) == num_slots
+        assert slot_cycles < cycles
+        cycles = slot_cycles
+
+
+def test_shared_output_ni():
+    """ The four tasks finish in the same cycle, their packets leave through the NI one after the other """
+    sim, _  = run_fan_out( 4 )
+    tasks   = get_cluster_tasks( sim )
+
+    assert len( { task.start_cycle for task in tasks } ) == 1
+    assert len( { task.end_cycle for task in tasks } ) == 4
+
+
+def test_invalid_slots():
+    with pytest.raises(ValueError):
+        ProcessingElement( (0, 0), num_slots=0 )
@@ -0,0 +1,70 @@
+import pytest
+import networkx as nx
+
+from src.flit       import Multicast
+from src.simulator  import Simulator, GraphMap
+
+
+PES = { 0: (1, 1), 1: (3, 0), 2: (3, 3), 3: (0, 3), 4: (1, 3), 5: (1, 0) }
+
+
+def get_fan_out(multicast: bool, weight: int = 4) -> nx.DiGraph:
+    """ Task 0 sends `weight` packets to each of the tasks 1 to 5 """
+    graph = nx.DiGraph()
+    graph.add_node(0, type="task", processing_time=2)
+
+    for task_id in range(1, 6):
+        graph.add_node(task_id, type="task", processing_time=3, generate=1)
+        graph.add_edge(0, task_id, weight=weight, multicast="fan_out" if multicast else None)
+
+    return graph
+
+
+def run_fan_out(multicast: bool, **kwargs) -> tuple[Simulator, int]:
+    args = dict( num_rows=4, num_cols=4, max_cycles=5000, switching="wormhole" )
+    args.update( kwargs )
+
+    sim         = Simulator( **args )
+    task_list   = sim.graph_to_task( get_fan_out( multicast ) )
+    mapping     = [ GraphMap( task_id=task.task_id, assigned_pe=PES[task.task_id] ) for task in task_list ]
+    sim.map( sim.set_assigned_mapping_list( task_list, mapping ) )
+
+    return sim, sim.run()
+
+
+def test_multicast_transmit():
+    sim         = Simulator( num_rows=4, num_cols=4, switching="wormhole" )
+    source      = sim.graph_to_task( get_fan_out( True ) )[0]
+
+    assert len( source.transmit_list ) == 1
+    assert source.transmit_list[0].id == Multicast( (1, 2, 3, 4, 5) )
+    assert source.expected_generated_packets == 4
+
+
+@pytest.mark.parametrize("kwargs", [ dict(),
+                                     dict( switching="virtual_cut_through", num_vcs=2 ),
+                                     dict( router_pipeline_depth=2, link_latency=1 ) ])
+def test_fewer_packets_and_makespan(kwargs):
+    sim, unicast_cycles             = run_fan_out( False, **kwargs )
+    multicast_sim, multicast_cycles = run_fan_out( True, **kwargs )
+
+    assert sim.get_mapping_list()[0].task.generated_packet_count == 20
+    assert multicast_sim.get_mapping_list()[0].task.generated_packet_count == 4
+
+    # Every destination got all its packets and ran
+    for map in multicast_sim.get_mapping_list()[1:]:
+        assert map.task.require_list[0].received_packet_count == 0
+        assert map.task.end_cycle is not None
+
+    assert multicast_cycles < unicast_cycles
+
+
+def test_multicast_errors():
+    with pytest.raises(ValueError):
+        Simulator( num_rows=4, num_cols=4 ).graph_to_task( get_fan_out( True ) )
+
+    graph = get_fan_out( True )
+    graph[0][1]["weight"] = 2
+
+    with pytest.raises(ValueError):
+        Simulator( num_rows=4, num_cols=4, switching="wormhole" ).graph_to_task( graph )
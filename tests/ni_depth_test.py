@@ -0,0 +1,61 @@
+import pytest
+
+from src.processing_element import ProcessingElement, TaskStatus
+from src.simulator          import Simulator
+
+from tests.profiler_test    import get_simple_mapping_list
+from tests.multicast_test   import run_fan_out
+from tests.multi_slot_test  import run_fan_out as run_cluster_fan_out, get_cluster_tasks
+
+
+def test_single_packet_is_default():
+    sim = Simulator( num_rows=3, num_cols=3, max_cycles=100, switching="wormhole", ni_depth=1 )
+    sim.map( get_simple_mapping_list() )
+    assert sim.run() == 25
+
+    with pytest.raises(ValueError):
+        ProcessingElement( (0, 0), ni_depth=0 )
+
+
+@pytest.mark.parametrize("switching", [ "wormhole", "virtual_cut_through" ])
+def test_overlap_with_draining_packets(switching):
+    """ The source of the fan-out computes its next packet while the previous ones drain """
+    sim, cycles         = run_fan_out( False, switching=switching )
+    deep_sim, deep_cycles = run_fan_out( False, switching=switching, ni_depth=4 )
+
+    source, deep_source = sim.get_mapping_list()[0].task, deep_sim.get_mapping_list()[0].task
+
+    assert deep_source.generated_packet_count == 20
+    assert deep_source.end_cycle < source.end_cycle
+    assert deep_cycles < cycles
+
+    for map in deep_sim.get_mapping_list():
+        assert map.task.status is TaskStatus.DONE
+
+
+def test_full_interface_blocks_compute(monkeypatch):
+    """ Packets take longer to drain than to compute, the task waits for room in the NI """
+    drain           = ProcessingElement._drain_output_interface
+    queue_lengths   = []
+
+    def record_queue(pe):
+        queue_lengths.append( len( pe._outbound_packets ) )
+        drain( pe )
+
+    monkeypatch.setattr( ProcessingElement, "_drain_output_interface", record_queue )
+    _, cycles = run_fan_out( False, ni_depth=2 )
+    monkeypatch.undo()
+
+    assert max( queue_lengths ) == 2
+    assert run_fan_out( False, ni_depth=8 )[1] == cycles # Limited by the draining, not by the depth
+
+
+def test_shared_by_compute_slots():
+    sim, _              = run_cluster_fan_out( 4, switching="wormhole" )
+    deep_sim, _         = run_cluster_fan_out( 4, switching="wormhole", ni_depth=4 )
+
+    end_cycles          = sorted( task.end_cycle for task in get_cluster_tasks( sim ) )
+    deep_end_cycles     = sorted( task.end_cycle for task in get_cluster_tasks( deep_sim ) )
+
+    assert deep_end_cycles[-1] <= end_cycles[-1]
+    assert all( map.task.status is TaskStatus.DONE for map in deep_sim.get_mapping_list() )
@@ -0,0 +1,121 @@
+import random
+import pytest
+import networkx as nx
+
+from src.deadlock   import DeadlockError
+from src.parallel   import Region, RingBuffer, get_regions
+from src.simulator  import Simulator, GraphMap
+
+from benchmarks.graphs import random_dag
+
+
+def build_simulator(**kwargs) -> Simulator:
+    """ A random DAG randomly mapped on a 6x6 network, links of one cycle """
+    args        = dict( num_rows=6, num_cols=6, max_cycles=20000, switching="wormhole", link_latency=1, num_vcs=2 )
+    args.update( kwargs )
+
+    sim         = Simulator( **args )
+    task_list   = sim.graph_to_task( random_dag( 30, "high", seed=3 ) )
+    rng         = random.Random( 1 )
+    positions   = list( sim._pes )
+    mapping     = [ GraphMap( task_id=task.task_id, assigned_pe=rng.choice( positions ) ) for task in task_list ]
+    sim.map( sim.set_assigned_mapping_list( task_list, mapping ) )
+
+    return sim
+
+
+def get_results(sim: Simulator) -> tuple[list, dict]:
+    tasks = [ ( map.task.task_id, map.task.start_cycle, map.task.end_cycle ) for map in sim.get_mapping_list() ]
+    return tasks, sim.get_starvation_report()
+
+
+def test_regions():
+    positions = [ ( x, y ) for x in range(6) for y in range(4) ]
+
+    assert get_regions( positions, 2 ) == [ Region( 0, 2, 0, 3 ), Region( 3, 5, 0, 3 ) ]
+    assert get_regions( positions, 4 ) == [ Region( 0, 2, 0, 1 ), Region( 0, 2, 2, 3 ),
+                                            Region( 3, 5, 0, 1 ), Region( 3, 5, 2, 3 ) ]
+
+    for num_workers in [ 1, 2, 3, 4, 5, 6, 8 ]:
+        regions = get_regions( positions, num_workers )
+        assert all( sum( region.contains( pos ) for region in regions ) == 1 for pos in positions )
+
+    with pytest.raises(ValueError):
+        get_regions( positions, 7 )
+
+
+def test_ring_buffer():
+    """ Messages wrap around the end of the ring """
+    ring = RingBuffer( size=64 )
+    try:
+        assert ring.read() is None
+
+        for i in range(20):
+            ring.write( bytes( [ i ] ) * 20 )
+            assert ring.read() == bytes( [ i ] ) * 20
+
+        with pytest.raises(ValueError):
+            ring.write( bytes( 64 ) )
+    finally:
+        ring.close( unlink=True )
+
+
+@pytest.mark.parametrize("kwargs", [ dict(),
+                                     dict( arbitration="age" ),
+                                     dict( switching="virtual_cut_through", arbitration="round_robin" ),
+                                     dict( topology="torus", link_width=2 ),
+                                     dict( routing="adaptive", credit_delay=1 ) ])
+@pytest.mark.parametrize("num_workers", [ 2, 4 ])
+def test_same_results_as_run(kwargs, num_workers):
+    sim = build_simulator( **kwargs )
+    cycle_count = sim.run()
+
+    parallel_sim = build_simulator( **kwargs )
+    assert parallel_sim.run_parallel( num_workers ) == cycle_count
+    assert get_results( parallel_sim ) == get_results( sim )
+
+
+def test_deadlock_across_regions():
+    """ The cycle of blocked buffers around a ring of the torus goes through two of the regions """
+    graph   = nx.DiGraph()
+    pes     = {}
+
+    for x in range(5):
+        graph.add_node(2 * x,     type="task", processing_time=1)
+        graph.add_node(2 * x + 1, type="task", processing_time=1, generate=1)
+        graph.add_edge(2 * x, 2 * x + 1, weight=10)
+        pes[2 * x], pes[2 * x + 1] = (x, 0), ( (x + 2) % 5, 0 )
+
+    sim         = Simulator( num_rows=5, num_cols=5, max_cycles=5000, topology="torus",
+                             switching="wormhole", link_latency=1 )
+    task_list   = sim.graph_to_task( graph )
+    mapping     = [ GraphMap( task_id=task.task_id, assigned_pe=pes[task.task_id] ) for task in task_list ]
+    sim.map( sim.set_assigned_mapping_list( task_list, mapping ) )
+
+    with pytest.raises(DeadlockError) as error:
+        sim.run_parallel( 4 )
+
+    assert len( error.value.blocked_buffers ) == 10
+
+
+def test_max_cycles():
+    sim = build_simulator( max_cycles=100 )
+
+    with pytest.raises(AssertionError):
+        sim.run_parallel( 2 )
+
+
+def test_invalid_partition():
+    with pytest.raises(ValueError):
+        build_simulator( switching="store_and_forward", link_latency=0, num_vcs=1 ).run_parallel( 2 )
+
+    with pytest.raises(ValueError):
+        build_simulator( link_latency=0 ).run_parallel( 2 )
+
+    with pytest.raises(ValueError):
+        build_simulator( routing="adaptive" ).run_parallel( 2 )
+
+    # Only the links between the regions need the latency
+    links = { ( (x, 2), (x, 3) ): 1 for x in range(6) }
+    links.update( { ( (x, 3), (x, 2) ): 1 for x in range(6) } )
+    assert build_simulator( link_latency=links ).run_parallel( 2 ) == build_simulator( link_latency=links ).run()
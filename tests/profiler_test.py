@@ -0,0 +1,143 @@
+import json
+import pytest
+import time
+import random
+import statistics
+
+from src.buffer             import Buffer
+from src.router             import Router
+from src.profiler           import call_counter
+from src.processing_element import TaskInfo, RequireInfo, TransmitInfo
+from src.simulator          import Simulator, Map, GraphMap
+
+from benchmarks.graphs      import random_dag
+
+
+def get_simple_mapping_list() -> list[Map]:
+    """
+    R(0,0) to R(2,2), same as test_sim_simple in sim_test.py
+    """
+    task_0  = TaskInfo(
+                task_id                     = 0,
+                processing_cycles           = 4,
+                expected_generated_packets  = 2,
+                require_list                = [],
+                is_transmit_task            = True,
+                transmit_list               = [TransmitInfo(id=1, require=2)]
+            )
+
+    task_1  = TaskInfo(
+                task_id                     = 1,
+                processing_cycles           = 4,
+                expected_generated_packets  = 1,
+                require_list                = [RequireInfo(
+                                                require_type_id=0,
+                                                required_packets=2)],
+                is_transmit_task            = False,
+            )
+
+    return [ Map( task=task_0, assigned_pe=(0,0) ),
+             Map( task=task_1, assigned_pe=(2,2) ) ]
+
+
+def test_profile_report(tmp_path):
+    """
+    Profiling should not change the latency and should count the hot functions.
+    """
+    sim = Simulator(num_rows=3, num_cols=3, max_cycles=100, profile=True)
+    sim.map(get_simple_mapping_list())
+    latency = sim.run()
+
+    assert latency == 56
+
+    filename    = tmp_path / "profile.json"
+    report      = sim.get_profile_report(filename=filename)
+
+    assert report["runs"]   == 1
+    assert report["cycles"] == latency + 1
+
+    for phase in ("pe_process", "forward_output_buffer_flits", "router_process", "other"):
+        assert report["phases"][phase]["time_ns"] >= 0
+
+    assert report["calls"]["is_full"]["count"]                  > 0
+    assert report["calls"]["_can_accept_new_packet"]["count"]   > 0
+    assert report["calls"]["_compute_next_hop"]["count"]        > 0
+
+    with open(filename) as file:
+        assert json.load(file)["cycles"] == report["cycles"]
+
+
+def test_profile_flit_level():
+    """
+    The flit-level modes use FifoBuffer and allocate output virtual channels instead of _compute_next_hop.
+    """
+    sim = Simulator(num_rows=3, num_cols=3, max_cycles=100, profile=True, switching="wormhole")
+    sim.map(get_simple_mapping_list())
+    latency = sim.run()
+
+    assert latency == 25
+
+    calls = sim.get_profile_report()["calls"]
+    assert calls["_compute_next_hop"]["count"]          == 0
+    assert calls["_allocate_output_vc"]["count"]        > 0
+    assert calls["is_full"]["count"]                    > 0
+    assert calls["_can_accept_new_packet"]["count"]     > 0
+
+
+
+def test_profile_counters_only_during_run():
+    """
+    The hot functions count themselves only during a profiled run, they are never replaced.
+    """
+    is_full     = Buffer.is_full
+    next_hop    = Router._compute_next_hop
+
+    sim = Simulator(num_rows=3, num_cols=3, max_cycles=100, profile=True)
+    sim.map(get_simple_mapping_list())
+    sim.run()
+
+    assert Buffer.is_full               is is_full
+    assert Router._compute_next_hop     is next_hop
+    assert not call_counter.active
+
+    # Runs without profiling do not count
+    calls   = sim.get_profile_report()["calls"]["is_full"]["count"]
+    plain   = Simulator(num_rows=3, num_cols=3, max_cycles=100)
+    plain.map(get_simple_mapping_list())
+    plain.run()
+    assert sim.get_profile_report()["calls"]["is_full"]["count"] == calls
+
+    sim.clear()
+    assert sim.get_profile_report()["cycles"] == 0
+
+
+def get_mapped_simulator(profile: bool) -> Simulator:
+    sim         = Simulator(num_rows=6, num_cols=6, max_cycles=100000, profile=profile, switching="wormhole")
+    task_list   = sim.graph_to_task(random_dag(20, "medium", seed=1))
+    rng         = random.Random(0)
+    positions   = [ (x, y) for x in range(6) for y in range(6) ]
+    sim.map(sim.set_assigned_mapping_list(task_list, [ GraphMap(task.task_id, rng.choice(positions)) for task in task_list ]))
+    return sim
+
+
+def test_profile_overhead():
+    """
+    Profiling costs a few percent at most: median of interleaved plain and profiled runs. 
+    Wall clock timings are noisy on shared machines, the measure is repeated before failing.
+    """
+    plain, profiled = get_mapped_simulator(False), get_mapped_simulator(True)
+
+    def get_run_time(sim: Simulator) -> float:
+        start = time.perf_counter()
+        sim.run()
+        run_time = time.perf_counter() - start
+        sim.reset(keep_mapping=True)
+        return run_time
+
+    overheads = []
+    for _ in range(3):
+        overheads.append(statistics.median( get_run_time(profiled) / get_run_time(plain) for _ in range(15) ) - 1)
+        if overheads[-1] < 0.05:
+            return
+
+    pytest.fail(f"Profiling overhead {[ f'{100 * overhead:.1f}%' for overhead in overheads ]}")
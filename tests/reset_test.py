@@ -0,0 +1,90 @@
+import random
+import pytest
+
+from src.router     import Router
+from src.simulator  import Simulator, GraphMap
+
+from benchmarks.graphs      import random_dag
+from tests.profiler_test    import get_simple_mapping_list
+
+
+def get_task_report(sim: Simulator) -> list[tuple]:
+    return [ ( map.task.task_id, map.assigned_pe, map.task.start_cycle, map.task.end_cycle ) for map in sim.get_mapping_list() ]
+
+
+def get_random_mapping(task_list: list, seed: int) -> list[GraphMap]:
+    rng         = random.Random( seed )
+    positions   = [ ( x, y ) for x in range(4) for y in range(4) ]
+    return [ GraphMap( task_id=task.task_id, assigned_pe=rng.choice( positions ) ) for task in task_list ]
+
+
+@pytest.mark.parametrize("switching", [ "store_and_forward", "wormhole" ])
+def test_run_again(switching, capsys):
+    sim = Simulator( num_rows=3, num_cols=3, max_cycles=100, switching=switching )
+    sim.map( get_simple_mapping_list() )
+
+    cycles = sim.run()
+    report = get_task_report( sim )
+
+    sim.reset( keep_mapping=True )
+    assert capsys.readouterr().out == ""
+
+    assert sim.run() == cycles
+    assert get_task_report( sim ) == report
+
+
+@pytest.mark.parametrize("kwargs", [ dict(), dict( switching="wormhole", num_vcs=2, link_latency=1 ) ])
+def test_mappings_of_the_same_tasks(kwargs):
+    """ The task list is built once, each mapping gives the same result as a new simulator """
+    graph       = random_dag( 12, "high", seed=5 )
+    sim         = Simulator( num_rows=4, num_cols=4, max_cycles=20000, **kwargs )
+    task_list   = sim.graph_to_task( graph )
+
+    for seed in range(4):
+        sim.map( sim.set_assigned_mapping_list( task_list, get_random_mapping( task_list, seed ) ) )
+        cycles = sim.run()
+
+        new_sim         = Simulator( num_rows=4, num_cols=4, max_cycles=20000, **kwargs )
+        new_task_list   = new_sim.graph_to_task( graph )
+        new_sim.map( new_sim.set_assigned_mapping_list( new_task_list, get_random_mapping( new_task_list, seed ) ) )
+
+        assert cycles == new_sim.run()
+        assert get_task_report( sim ) == get_task_report( new_sim )
+
+        sim.reset()
+
+
+def test_only_used_routers_are_cleared(monkeypatch):
+    sim = Simulator( num_rows=6, num_cols=6, max_cycles=100 )
+    sim.map( get_simple_mapping_list() )
+    sim.run()
+
+    cleared = []
+    reset   = Router.reset
+
+    def record_reset(router, clear_buffers=True):
+        if clear_buffers:
+            cleared.append( router.get_pos() )
+        reset( router, clear_buffers )
+
+    monkeypatch.setattr( Router, "reset", record_reset )
+    sim.reset()
+
+    # The XY route from (0, 0) to (2, 2) and its neighbours
+    assert ( 0, 0 ) in cleared and ( 2, 2 ) in cleared
+    assert ( 5, 5 ) not in cleared
+    assert all( router._cycle == 0 for router in sim._routers.values() )
+
+
+@pytest.mark.parametrize("switching, cycles", [ ( "store_and_forward", 56 ), ( "wormhole", 25 ) ])
+def test_reset_after_an_aborted_run(switching, cycles):
+    """ Flits are left in the network when the run stops early """
+    sim = Simulator( num_rows=3, num_cols=3, max_cycles=cycles - 10, switching=switching )
+    sim.map( get_simple_mapping_list() )
+
+    with pytest.raises(AssertionError):
+        sim.run()
+
+    sim._max_cycles = 100
+    sim.reset( keep_mapping=True )
+    assert sim.run() == cycles
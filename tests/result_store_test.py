@@ -0,0 +1,75 @@
+import os
+import pytest
+import numpy as np
+
+from src.dataset        import DatasetConfig, generate_dataset, generate_shard, get_shard_path
+from src.result_store   import ResultStore, append_samples, write_index, NO_CYCLE
+
+
+CONFIG = DatasetConfig( num_shards=3, samples_per_shard=4, seed=7, mesh_size=3, min_tasks=3, max_tasks=6 )
+
+
+def without_latencies(samples: list[dict]) -> list[dict]:
+    return [ { key: value for key, value in sample.items() if key != "latencies" } for sample in samples ]
+
+
+def test_round_trip(tmp_path):
+    """ The samples read back are the ones written, shard after shard """
+    shards = [ generate_shard( CONFIG, shard_index ) for shard_index in range(2) ]
+    for samples in shards:
+        append_samples( tmp_path, samples )
+
+    store   = ResultStore( tmp_path )
+    samples = without_latencies( shards[0] + shards[1] )
+
+    assert store.get_num_shards() == 2 and len( store ) == len( samples )
+    assert [ store.get_sample( index ) for index in range( len( store ) ) ] == samples
+
+    with pytest.raises(IndexError):
+        store.get_sample( len( store ) )
+
+
+def test_columns(tmp_path):
+    samples = generate_shard( CONFIG, 0 ) + generate_shard( CONFIG, 1 )
+    append_samples( tmp_path, samples[:3] )
+    append_samples( tmp_path, samples[3:] )
+
+    store           = ResultStore( tmp_path )
+    node_offsets    = store.get_column( "node_offsets" )
+    edge_offsets    = store.get_column( "edge_offsets" )
+    end_cycles      = store.get_column( "end_cycle" )
+
+    assert isinstance( store.get_shard_column( 0, "end_cycle" ), np.memmap )
+    assert np.array_equal( store.get_column( "makespan" ), [ sample["makespan"] for sample in samples ] )
+    assert len( node_offsets ) == len( samples ) + 1
+
+    for index, sample in enumerate( samples ):
+        assert end_cycles[ node_offsets[index]:node_offsets[index + 1] ].tolist() == sample["end_cycles"]
+        assert store.get_column( "weight" )[ edge_offsets[index]:edge_offsets[index + 1] ].tolist() == [ edge[2] for edge in sample["edges"] ]
+
+    with pytest.raises(ValueError):
+        store.get_column( "latency" )
+
+
+def test_missing_cycles(tmp_path):
+    sample = dict( nodes=[ [ 5, 2, 1 ] ], edges=[], mapping=[ [ 5, 0, 1 ] ], start_cycles=[ None ], end_cycles=[ None ], makespan=0 )
+    append_samples( tmp_path, [ sample ] )
+
+    assert ResultStore( tmp_path ).get_sample( 0 )["start_cycles"] == [ NO_CYCLE ]
+    assert write_index( tmp_path )["shards"][0]["num_nodes"] == 1
+
+
+def test_columnar_dataset(tmp_path):
+    """ The dataset shards written in parallel, the same samples as the JSON Lines dataset """
+    config = DatasetConfig( **{ **vars( CONFIG ), "format": "columnar" } )
+    assert generate_dataset( tmp_path, config, num_workers=2 ) == [ 0, 1, 2 ]
+
+    store = ResultStore( tmp_path )
+    assert len( store ) == 12
+    assert [ store.get_sample( index ) for index in range(4, 8) ] == without_latencies( generate_shard( CONFIG, 1 ) )
+
+    # Resumed, the missing shard is in the index again
+    os.rename( get_shard_path( tmp_path, 1, "columnar" ), get_shard_path( tmp_path, 1, "columnar" ) + ".1.tmp" )
+    assert generate_dataset( tmp_path, config ) == [ 1 ]
+    assert len( ResultStore( tmp_path ) ) == 12
+    assert not any( name.endswith( ".tmp" ) for name in os.listdir( tmp_path ) )
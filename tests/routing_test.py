@@ -0,0 +1,161 @@
+import pytest
+import networkx as nx
+
+from dataclasses import dataclass
+
+from src.router     import Router
+from src.flit       import BufferLocation
+from src.packet     import Packet
+from src.routing    import ( ROUTING_ALGORITHMS, DIRECTION_OFFSETS, OddEvenRouting,
+                             XYRouting, get_routing_algorithm )
+from src.simulator  import Simulator, GraphMap
+
+
+MESH_SIZE = 4
+
+
+@dataclass
+class FakeTask:
+    task_id: int
+
+@dataclass 
+class FakeMap:
+    task: FakeTask
+    assigned_pe: tuple[int, int]
+
+
+def walk_route(algorithm, src: tuple, dest: tuple, pick: int) -> list[BufferLocation]:
+    """Follows the candidates from src to dest, `pick` selects the candidate at each hop."""
+    current     = src
+    directions  = []
+
+    while True:
+        candidates = algorithm.get_candidates( current, dest, is_source_column=current[0] == src[0] )
+        assert len(candidates) > 0, f"No candidate at {current} for {src} -> {dest}"
+
+        direction = candidates[ pick % len(candidates) ]
+        if direction is BufferLocation.LOCAL:
+            return directions
+
+        directions.append( direction )
+        dx, dy, _   = DIRECTION_OFFSETS[direction]
+        current     = ( current[0] + dx, current[1] + dy )
+
+
+@pytest.mark.parametrize("name", ROUTING_ALGORITHMS.keys())
+def test_routes_are_minimal(name):
+    """
+    Every candidate is a productive direction, so any choice reaches the destination
+    in the manhattan distance.
+    """
+    algorithm   = get_routing_algorithm( name )
+    positions   = [ (x, y) for x in range(MESH_SIZE) for y in range(MESH_SIZE) ]
+
+    for src in positions:
+        for dest in positions:
+            distance = abs(src[0] - dest[0]) + abs(src[1] - dest[1])
+            for pick in ( 0, 1 ):
+                assert len( walk_route( algorithm, src, dest, pick ) ) == distance
+
+
+def test_odd_even_turns():
+    """
+    East -> north/south turns are not taken in even columns,
+    north/south -> west turns are not taken in odd columns.
+    """
+    algorithm   = OddEvenRouting()
+    positions   = [ (x, y) for x in range(MESH_SIZE) for y in range(MESH_SIZE) ]
+    vertical    = ( BufferLocation.NORTH, BufferLocation.SOUTH )
+
+    for src in positions:
+        for dest in positions:
+            for pick in ( 0, 1 ):
+                directions  = walk_route( algorithm, src, dest, pick )
+                current     = src
+
+                for prev_direction, next_direction in zip( directions, directions[1:] ):
+                    dx, dy, _   = DIRECTION_OFFSETS[prev_direction]
+                    current     = ( current[0] + dx, current[1] + dy )
+
+                    if prev_direction is BufferLocation.EAST and next_direction in vertical:
+                        assert current[0] % 2 == 1
+                    if prev_direction in vertical and next_direction is BufferLocation.WEST:
+                        assert current[0] % 2 == 0
+
+
+def test_unknown_routing():
+    with pytest.raises(ValueError):
+        Simulator(num_rows=2, num_cols=2, routing="diagonal")
+
+
+def test_route_table():
+    """
+    Candidates are computed once per destination when the mapping is set.
+    """
+    router = Router( pos=(1, 1), routing=XYRouting() )
+    router.set_mapping_list( [ FakeMap( FakeTask(0), (3, 2) ) ] )
+
+    assert router._route_table == { (3, 2): ( ( BufferLocation.EAST, ), ( BufferLocation.EAST, ) ) }
+
+    header      = Packet( source_xy=(1, 1), dest_id=0, source_task_id=1 ).pop_flit()[1]
+    next_hop    = router._compute_next_hop( header )
+
+    assert ( next_hop.x, next_hop.y )   == ( 2, 1 )
+    assert next_hop.output_buffer       is BufferLocation.EAST
+    assert next_hop.next_input_buffer   is BufferLocation.WEST
+
+
+def test_adaptive_selects_less_loaded_output():
+    """
+    With the east output occupied, the adaptive router goes north.
+    """
+    router_lookup = { pos: Router( pos, routing="adaptive" ) for pos in [ (0, 0), (1, 0), (0, 1) ] }
+    for router in router_lookup.values():
+        router.set_neighbours( router_lookup )
+
+    router = router_lookup[(0, 0)]
+    router.set_mapping_list( [ FakeMap( FakeTask(0), (1, 1) ) ] )
+
+    header = Packet( source_xy=(0, 0), dest_id=0, source_task_id=1 ).pop_flit()[1]
+    assert router._compute_next_hop( header ).output_buffer is BufferLocation.EAST
+
+    router._get_buffer( BufferLocation.EAST, is_input=False ).fill_with_packet(
+        Packet( source_xy=(0, 0), dest_id=0, source_task_id=2 ) )
+
+    assert router._compute_next_hop( header ).output_buffer is BufferLocation.NORTH
+
+
+def run_flows(routing: str, flows: list[tuple[tuple, tuple]], weight: int = 6) -> int:
+    """Each flow is a pair of tasks, the source sends `weight` packets to the sink."""
+    graph   = nx.DiGraph()
+    pes     = {}
+
+    for i, ( src, dest ) in enumerate(flows):
+        graph.add_node(2 * i,     type="task", processing_time=2)
+        graph.add_node(2 * i + 1, type="task", processing_time=2, generate=1)
+        graph.add_edge(2 * i, 2 * i + 1, weight=weight)
+        pes[2 * i], pes[2 * i + 1] = src, dest
+
+    sim         = Simulator( num_rows=MESH_SIZE, num_cols=MESH_SIZE, max_cycles=5000, routing=routing )
+    task_list   = sim.graph_to_task( graph )
+    mapping     = [ GraphMap( task_id=task.task_id, assigned_pe=pes[task.task_id] ) for task in task_list ]
+    sim.map( sim.set_assigned_mapping_list( task_list, mapping ) )
+
+    return sim.run()
+
+
+ROW_CONTENTION_FLOWS = [ ( (0, 0), (3, 3) ), ( (1, 0), (3, 2) ), ( (2, 0), (3, 1) ) ]
+
+
+def test_adaptive_routing_row_contention():
+    """
+    With XY all the flows share the east links of row 0.
+    YX and the adaptive algorithms spread them over the rows.
+    """
+    latencies = { name: run_flows( name, ROW_CONTENTION_FLOWS ) for name in ROUTING_ALGORITHMS }
+
+    assert latencies["xy"] == 115
+    assert latencies["yx"] == 83
+
+    for name in ( "west_first", "odd_even", "adaptive" ):
+        assert latencies[name] < latencies["xy"]
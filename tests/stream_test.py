@@ -0,0 +1,85 @@
+import networkx as nx
+
+from src.simulator  import Simulator, GraphMap
+from src.stream     import get_steady_state_start
+
+
+def get_fork_join_sim() -> Simulator:
+    r"""
+       - 1 -
+      /     \
+     0       3
+      \     /
+       - 2 -
+    """
+    graph = nx.DiGraph()
+    graph.add_node(0, processing_time=4)
+    graph.add_node(1, processing_time=3)
+    graph.add_node(2, processing_time=5)
+    graph.add_node(3, processing_time=2, generate=1)
+
+    graph.add_edge(0, 1, weight=2)
+    graph.add_edge(0, 2, weight=3)
+    graph.add_edge(1, 3, weight=2)
+    graph.add_edge(2, 3, weight=2)
+
+    sim         = Simulator(num_rows=3, num_cols=3)
+    task_list   = sim.graph_to_task(graph)
+    mapping     = [ GraphMap( task_id=0, assigned_pe=(0,0) ),
+                    GraphMap( task_id=1, assigned_pe=(1,0) ),
+                    GraphMap( task_id=2, assigned_pe=(0,1) ),
+                    GraphMap( task_id=3, assigned_pe=(2,2) ) ]
+
+    sim.map(sim.set_assigned_mapping_list(task_list, mapping))
+    return sim
+
+
+def test_single_iteration_matches_run():
+    latency = get_fork_join_sim().run()
+    report  = get_fork_join_sim().run_stream(num_iterations=1)
+
+    assert report.total_cycles == latency
+
+
+def test_periodic_stream():
+    """
+    With a period longer than the latency, iterations do not overlap.
+    Throughput is one iteration per period and the TaskInfo objects are reused.
+    """
+    sim         = get_fork_join_sim()
+    task_list   = [ map.task for map in sim.get_mapping_list() ]
+    latency     = get_fork_join_sim().run()
+    period      = 2 * latency
+
+    report = sim.run_stream(num_iterations=8, period=period)
+
+    assert report.is_steady
+    assert report.throughput == 1000 / period
+    assert set(report.latencies) == { report.latencies[0] }
+    assert report.iteration_start_cycles == [ 1 + i * period for i in range(8) ]
+
+    for map, task in zip(sim.get_mapping_list(), task_list):
+        assert map.task is task
+        assert task.iteration == 7
+
+
+def test_backpressure_stream():
+    """
+    Without a period, iterations overlap and the throughput is higher than one over the latency.
+    """
+    sim     = get_fork_join_sim()
+    report  = sim.run_stream(num_iterations=12, max_inflight_iterations=2)
+
+    assert report.is_steady
+    assert report.throughput > 1000 / report.mean_latency
+
+
+def test_steady_state_start():
+    # Two warm-up iterations, then one iteration every 10 cycles
+    end_cycles = [ 50, 80, 100, 110, 120, 130, 140, 150 ]
+    assert get_steady_state_start(end_cycles) == 2
+
+    # Completions in bursts of 2 iterations
+    end_cycles = [ 10, 12, 30, 32, 50, 52, 70, 72 ]
+    assert get_steady_state_start(end_cycles, window=1) is None
+    assert get_steady_state_start(end_cycles, window=2) == 0
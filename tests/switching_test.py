@@ -0,0 +1,85 @@
+import pytest
+import networkx as nx
+
+from src.router     import Router, SWITCHING_MODES
+from src.packet     import Packet
+from src.buffer     import FifoBuffer
+from src.simulator  import Simulator, GraphMap
+
+from tests.profiler_test import get_simple_mapping_list
+
+
+def get_pair_latency(switching: str, dest: tuple) -> int:
+    """ Task 0 at PE(0, 0) sends 2 packets to task 1 at `dest` """
+    graph = nx.DiGraph()
+    graph.add_node(0, type="task", processing_time=4)
+    graph.add_node(1, type="task", processing_time=4, generate=1)
+    graph.add_edge(0, 1, weight=2)
+
+    sim         = Simulator( num_rows=4, num_cols=4, max_cycles=1000, switching=switching )
+    task_list   = sim.graph_to_task( graph )
+    mapping     = [ GraphMap( task_id=0, assigned_pe=(0, 0) ), GraphMap( task_id=1, assigned_pe=dest ) ]
+    sim.map( sim.set_assigned_mapping_list( task_list, mapping ) )
+
+    return sim.run()
+
+
+def test_store_and_forward_is_default():
+    sim = Simulator( num_rows=3, num_cols=3, max_cycles=100 )
+    sim.map( get_simple_mapping_list() )
+    assert sim.run() == 56
+
+
+@pytest.mark.parametrize("switching", SWITCHING_MODES)
+def test_per_hop_latency(switching):
+    """
+    Store and forward waits for the whole packet at each hop,
+    wormhole and virtual cut-through forward the header right away.
+    """
+    latencies   = [ get_pair_latency( switching, (x, 0) ) for x in range(1, 4) ]
+    per_hop     = { latencies[i + 1] - latencies[i] for i in range(len(latencies) - 1) }
+
+    if switching == "store_and_forward":
+        assert per_hop == { 7 }
+    else:
+        assert per_hop == { 1 }
+
+
+@pytest.mark.parametrize("switching", [ "wormhole", "virtual_cut_through" ])
+def test_cut_through_simple(switching):
+    sim = Simulator( num_rows=3, num_cols=3, max_cycles=100, switching=switching )
+    sim.map( get_simple_mapping_list() )
+    assert sim.run() == 25
+
+    # Routes and output allocations are released with the tail flits
+    for router in sim._routers.values():
+        assert not router.is_active()
+        assert router._input_routes == {}
+        assert all( owner is None for owner in router._output_owners.values() )
+
+
+def test_virtual_cut_through_needs_room_for_packet():
+    """
+    The wormhole header advances with a single free slot,
+    the virtual cut-through header needs room for the whole packet.
+    """
+    wormhole    = Router( pos=(0, 0), buffer_size=8, switching="wormhole" )
+    cut_through = Router( pos=(0, 0), buffer_size=8, switching="virtual_cut_through" )
+
+    next_buffer = FifoBuffer( 8 )
+    filler      = Packet( source_xy=(0, 0), dest_id=0, source_task_id=0 )
+    for _ in range(5):
+        next_buffer.add_flit( filler.pop_flit()[1] )
+
+    header = Packet( source_xy=(0, 0), dest_id=0, source_task_id=1 ).pop_flit()[1]
+
+    assert     wormhole._can_advance( header, next_buffer )
+    assert not cut_through._can_advance( header, next_buffer )
+
+
+def test_unknown_switching():
+    with pytest.raises(ValueError):
+        Simulator( num_rows=2, num_cols=2, switching="circuit" )
+
+    with pytest.raises(ValueError):
+        Router( pos=(0, 0), buffer_size=2, switching="virtual_cut_through" )
@@ -0,0 +1,111 @@
+import pytest
+import numpy as np
+import networkx as nx
+
+from src.processing_element import TaskStatus
+from src.simulator          import Simulator
+from src.task_graph         import TaskGraph, TaskState, NO_CYCLE
+
+from benchmarks.graphs  import random_dag
+from tests.reset_test   import get_random_mapping, get_task_report
+
+
+def run_tasks(task_list: list, seed: int = 0, **kwargs) -> Simulator:
+    sim = Simulator( num_rows=4, num_cols=4, max_cycles=20000, **kwargs )
+    sim.map( sim.set_assigned_mapping_list( task_list, get_random_mapping( task_list, seed ) ) )
+    sim.run()
+    return sim
+
+
+def test_compiled_arrays():
+    graph = nx.DiGraph()
+    graph.add_node(0, processing_time=2)
+    graph.add_node(1, processing_time=3, generate=1)
+    graph.add_node(2, processing_time=4, generate=1)
+    graph.add_edge(0, 1, weight=2, multicast="a")
+    graph.add_edge(0, 2, weight=2, multicast="a")
+
+    task_graph = TaskGraph.from_tasks( Simulator( num_rows=2, num_cols=2, switching="wormhole" ).graph_to_task( graph ) )
+
+    assert task_graph.processing_cycles.tolist()   == [ 2, 3, 4 ]
+    assert task_graph.require_offsets.tolist()     == [ 0, 0, 1, 2 ]
+    assert task_graph.require_sources.tolist()     == [ 0, 0 ]
+    assert task_graph.transmit_offsets.tolist()    == [ 0, 1, 1, 1 ]
+    assert task_graph.transmit_dests.tolist()      == [ 1, 2 ]
+
+    with pytest.raises(ValueError):
+        task_graph.processing_cycles[0] = 1
+
+    assert [ task.transmit_list for task in task_graph.to_tasks() ] == [ task.transmit_list for task in
+                                                                         Simulator( num_rows=2, num_cols=2, switching="wormhole" ).graph_to_task( graph ) ]
+
+
+def test_to_tasks_runs_the_same():
+    task_list   = Simulator( num_rows=4, num_cols=4 ).graph_to_task( random_dag( 20, "high", seed=2 ) )
+    task_graph  = TaskGraph.from_tasks( task_list )
+
+    assert get_task_report( run_tasks( task_graph.to_tasks() ) ) == get_task_report( run_tasks( task_list ) )
+
+
+@pytest.mark.parametrize("transmit_order", [ "shortest_first", "round_robin" ])
+def test_save_and_load_state(transmit_order):
+    task_list   = Simulator( num_rows=4, num_cols=4 ).graph_to_task( random_dag( 20, "high", seed=2 ) )
+    task_graph  = TaskGraph.from_tasks( task_list )
+    initial     = task_graph.get_initial_state()
+
+    assert np.array_equal( task_graph.save_state( task_list ).buffer, initial.buffer )
+
+    sim         = run_tasks( task_list, transmit_order=transmit_order )
+    report      = get_task_report( sim )
+    state       = task_graph.save_state( task_list )
+
+    assert all( state.get_status( index ) is TaskStatus.DONE for index in range( task_graph.get_num_tasks() ) )
+    assert NO_CYCLE not in state.get_cycles()[1]
+
+    # Clones are independent
+    clone = state.copy()
+    clone.tasks[:] = 0
+    assert state.get_cycles()[0].tolist() == [ task.start_cycle for task in task_list ]
+
+    task_graph.load_state( task_list, initial )
+    assert all( task.status is TaskStatus.IDLE and task.start_cycle is None for task in task_list )
+
+    sim.reset( keep_mapping=True )
+    sim.run()
+    assert get_task_report( sim ) == report
+    assert np.array_equal( task_graph.save_state( task_list ).buffer, state.buffer )
+
+    task_graph.load_state( task_list, initial )
+    assert np.array_equal( task_graph.save_state( task_list ).buffer, initial.buffer )
+
+
+def test_simulator_reset_restores_initial_state(monkeypatch):
+    """ Simulator.reset loads the initial state of the tasks, compiled once for all the mappings """
+    sim         = Simulator( num_rows=4, num_cols=4 )
+    task_list   = sim.graph_to_task( random_dag( 12, "high", seed=3 ) )
+
+    compiled    = []
+    from_tasks  = TaskGraph.from_tasks.__func__
+    monkeypatch.setattr( TaskGraph, "from_tasks", classmethod( lambda cls, tasks: compiled.append( tasks ) or from_tasks( cls, tasks ) ) )
+
+    for seed in range(3):
+        sim.map( sim.set_assigned_mapping_list( task_list, get_random_mapping( task_list, seed ) ) )
+        sim.run()
+
+        state = sim.get_task_state()
+        assert state.get_cycles()[1].tolist() == [ task.end_cycle for task in task_list ]
+
+        sim.reset()
+        assert all( task.status is TaskStatus.IDLE and task.start_cycle is None for task in task_list )
+
+    assert len( compiled ) == 1
+
+
+def test_compact_template():
+    """ The template and a state snapshot take a few words per task and per edge """
+    graph       = random_dag( 1000, "high", seed=1 )
+    task_graph  = TaskGraph.from_tasks( Simulator( num_rows=4, num_cols=4 ).graph_to_task( graph ) )
+    state       = task_graph.get_initial_state()
+
+    assert task_graph.nbytes + state.buffer.nbytes < 8 * ( 20 * graph.number_of_nodes() + 10 * graph.number_of_edges() )
+    assert TaskState.get_size( task_graph ) == state.buffer.size
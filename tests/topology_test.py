@@ -0,0 +1,123 @@
+import pytest
+import networkx as nx
+
+from src.flit       import BufferLocation
+from src.deadlock   import DeadlockError
+from src.topology   import TOPOLOGIES, GraphTopology, get_topology
+from src.simulator  import Simulator, GraphMap
+
+
+def get_pair_latency(dest: tuple, topology="mesh", switching: str = "wormhole") -> int:
+    """ Task 0 at PE(0, 0) sends 2 packets to task 1 at `dest` on a 4x4 network """
+    graph = nx.DiGraph()
+    graph.add_node(0, type="task", processing_time=4)
+    graph.add_node(1, type="task", processing_time=4, generate=1)
+    graph.add_edge(0, 1, weight=2)
+
+    sim         = Simulator( num_rows=4, num_cols=4, max_cycles=1000, switching=switching, topology=topology )
+    task_list   = sim.graph_to_task( graph )
+    mapping     = [ GraphMap( task_id=0, assigned_pe=(0, 0) ), GraphMap( task_id=1, assigned_pe=dest ) ]
+    sim.map( sim.set_assigned_mapping_list( task_list, mapping ) )
+
+    return sim.run()
+
+
+def run_tornado(topology: str, switching: str, num_vcs: int, size: int = 5) -> int:
+    """ Each PE of row 0 sends 10 packets half way around the row """
+    graph   = nx.DiGraph()
+    pes     = {}
+
+    for x in range(size):
+        graph.add_node(2 * x,     type="task", processing_time=1)
+        graph.add_node(2 * x + 1, type="task", processing_time=1, generate=1)
+        graph.add_edge(2 * x, 2 * x + 1, weight=10)
+        pes[2 * x], pes[2 * x + 1] = (x, 0), ( (x + size // 2) % size, 0 )
+
+    sim         = Simulator( num_rows=size, num_cols=size, max_cycles=5000, topology=topology,
+                             switching=switching, num_vcs=num_vcs )
+    task_list   = sim.graph_to_task( graph )
+    mapping     = [ GraphMap( task_id=task.task_id, assigned_pe=pes[task.task_id] ) for task in task_list ]
+    sim.map( sim.set_assigned_mapping_list( task_list, mapping ) )
+
+    return sim.run()
+
+
+@pytest.mark.parametrize("name", TOPOLOGIES.keys())
+def test_links_are_symmetric(name):
+    """ Each link leads back on the port it came from """
+    topology = get_topology( name, 4, 5 )
+
+    assert len( topology.get_positions() ) == 20
+
+    for position in topology.get_positions():
+        for direction, link in topology.get_links( position ).items():
+            back = topology.get_links( link.neighbour )[link.next_input]
+            assert ( back.neighbour, back.next_input ) == ( position, direction )
+
+
+def test_average_hop_count():
+    """ The wraparound links cut the average distance by a quarter on large meshes """
+    mesh    = get_topology( "mesh",  16, 16 )
+    torus   = get_topology( "torus", 16, 16 )
+
+    assert get_topology( "mesh", 4, 4 ).get_average_hop_count() == pytest.approx( 8 / 3 )
+    assert torus.get_average_hop_count() / mesh.get_average_hop_count() == pytest.approx( 0.75, abs=0.01 )
+
+
+@pytest.mark.parametrize("switching", [ "store_and_forward", "wormhole" ])
+def test_torus_wraparound(switching):
+    """ The far corner of the torus is two hops away """
+    assert get_pair_latency( (3, 0), "torus", switching ) == get_pair_latency( (1, 0), "mesh", switching )
+    assert get_pair_latency( (3, 3), "torus", switching ) == get_pair_latency( (1, 1), "mesh", switching )
+
+
+def test_ring():
+    """ All the positions on one ring, the closing link is the dateline """
+    topology    = get_topology( "ring", 4, 4 )
+    datelines   = [ ( position, link.neighbour ) for position in topology.get_positions()
+                    for link in topology.get_links( position ).values() if link.is_dateline ]
+
+    assert all( len( topology.get_links( position ) ) == 2 for position in topology.get_positions() )
+    assert sorted( datelines ) == [ ( (0, 0), (0, 3) ), ( (0, 3), (0, 0) ) ]
+    assert topology.get_next_hops( (0, 0), (1, 3) ) == ( BufferLocation.NORTH, )
+
+    assert get_pair_latency( (0, 3), "ring" ) == get_pair_latency( (1, 0), "mesh" )
+
+
+def test_graph_topology():
+    """ A grid graph gets the mesh ports, so it behaves like the mesh """
+    graph = nx.grid_2d_graph( 4, 4 )
+
+    for dest in [ (1, 0), (3, 3), (2, 1) ]:
+        assert get_pair_latency( dest, graph ) == get_pair_latency( dest, "mesh" )
+
+    # Shortcut from the origin to the far corner, on the free west port
+    graph.add_edge( (0, 0), (3, 3) )
+    topology = GraphTopology( graph )
+
+    assert topology.get_links( (0, 0) )[BufferLocation.WEST].neighbour == (3, 3)
+    assert get_pair_latency( (3, 3), topology ) == get_pair_latency( (1, 0), "mesh" )
+
+
+def test_dateline_channels():
+    """ Traffic around the rings of the torus deadlocks without the dateline channels """
+    with pytest.raises(DeadlockError):
+        run_tornado( "torus", "wormhole", num_vcs=1 )
+
+    assert run_tornado( "torus", "wormhole",            num_vcs=2 ) > 0
+    assert run_tornado( "torus", "virtual_cut_through", num_vcs=2 ) > 0
+
+
+def test_invalid_topology():
+    with pytest.raises(ValueError):
+        Simulator( num_rows=2, num_cols=2, topology="hypercube" )
+
+    with pytest.raises(ValueError):
+        Simulator( num_rows=4, num_cols=4, topology="torus", routing="west_first" )
+
+    star = nx.star_graph( 5 )
+    with pytest.raises(ValueError):
+        GraphTopology( nx.relabel_nodes( star, { node: (node, 0) for node in star } ) )
+
+    with pytest.raises(ValueError):
+        GraphTopology( nx.path_graph( 3 ) )
@@ -0,0 +1,92 @@
+import pytest
+import networkx as nx
+
+from src.processing_element import ProcessingElement
+from src.simulator          import Simulator, GraphMap
+
+
+def get_fork(num_successors: int = 4) -> nx.DiGraph:
+    """ Task 0 sends 3 packets to each successor i, which computes 10 * i cycles per packet for its sink 10 + i """
+    graph = nx.DiGraph()
+    graph.add_node(0, processing_time=2)
+
+    for i in range(1, num_successors + 1):
+        graph.add_node(i, processing_time=10 * i)
+        graph.add_node(10 + i, processing_time=5, generate=1)
+        graph.add_edge(0, i, weight=3)
+        graph.add_edge(i, 10 + i, weight=1)
+
+    return graph
+
+
+def run_graph(graph: nx.DiGraph, pes: dict, transmit_order: str) -> tuple[Simulator, int]:
+    sim         = Simulator( num_rows=4, num_cols=4, max_cycles=5000, switching="wormhole", transmit_order=transmit_order )
+    task_list   = sim.graph_to_task( graph )
+    mapping     = [ GraphMap( task_id=task.task_id, assigned_pe=pes[task.task_id] ) for task in task_list ]
+    sim.map( sim.set_assigned_mapping_list( task_list, mapping ) )
+
+    return sim, sim.run()
+
+
+def run_fork(transmit_order: str) -> tuple[Simulator, int]:
+    pes = { 0: (0, 0), 1: (1, 0), 2: (2, 0), 3: (3, 0), 4: (0, 1), 11: (1, 1), 12: (2, 1), 13: (3, 1), 14: (0, 2) }
+    return run_graph( get_fork(), pes, transmit_order )
+
+
+def get_start_cycles(sim: Simulator, task_ids: list) -> list[int]:
+    tasks = { map.task.task_id: map.task for map in sim.get_mapping_list() }
+    return [ tasks[task_id].start_cycle for task_id in task_ids ]
+
+
+def test_critical_path_first():
+    sim = Simulator( num_rows=4, num_cols=4, transmit_order="critical_path" )
+    assert [ transmit.id for transmit in sim.graph_to_task( get_fork() )[0].transmit_list ] == [ 4, 3, 2, 1 ]
+
+    sim, cycles = run_fork( "critical_path" )
+    _, shortest_first_cycles = run_fork( "shortest_first" )
+
+    assert get_start_cycles( sim, [ 4, 3, 2, 1 ] ) == sorted( get_start_cycles( sim, [ 4, 3, 2, 1 ] ) )
+    assert cycles < shortest_first_cycles
+
+
+def test_round_robin():
+    """ One packet per successor in turn, the successors start at about the same time """
+    sim, _                  = run_fork( "round_robin" )
+    shortest_first_sim, _   = run_fork( "shortest_first" )
+
+    start_cycles                = get_start_cycles( sim, [ 1, 2, 3, 4 ] )
+    shortest_first_start_cycles = get_start_cycles( shortest_first_sim, [ 1, 2, 3, 4 ] )
+
+    assert max( start_cycles ) - min( start_cycles ) < max( shortest_first_start_cycles ) - min( shortest_first_start_cycles )
+    assert all( map.task.generated_packet_count == map.task.expected_generated_packets for map in sim.get_mapping_list() )
+
+
+def test_readiness():
+    """ Task 1 also waits for the long task 5, the packets of task 0 go to task 2 first """
+    graph = nx.DiGraph()
+    graph.add_node(0, processing_time=2)
+    graph.add_node(5, processing_time=100)
+    graph.add_node(1, processing_time=2, generate=1)
+    graph.add_node(2, processing_time=2, generate=1)
+    graph.add_edge(0, 1, weight=2)
+    graph.add_edge(0, 2, weight=2)
+    graph.add_edge(5, 1, weight=1)
+
+    pes = { 0: (0, 0), 1: (2, 0), 2: (0, 2), 5: (3, 3) }
+
+    sim, _                  = run_graph( graph, pes, "readiness" )
+    shortest_first_sim, _   = run_graph( graph, pes, "shortest_first" )
+
+    assert get_start_cycles( sim, [ 2 ] )[0] < get_start_cycles( shortest_first_sim, [ 2 ] )[0]
+
+
+def test_unknown_order():
+    with pytest.raises(ValueError):
+        ProcessingElement( (0, 0), transmit_order="largest_first" )
+
+    sim = Simulator( num_rows=4, num_cols=4, switching="wormhole", link_latency=1, transmit_order="readiness" )
+    sim.graph_to_task( get_fork() )
+    sim.get_random_mapping( do_map=True )
+
+    with pytest.raises(ValueError):
+        sim.run_parallel( 2 ) # The successors can be in other regions
@@ -0,0 +1,113 @@
+import pytest
+import networkx as nx
+
+from dataclasses import dataclass
+
+from src.router     import Router
+from src.packet     import Packet
+from src.flit       import BufferLocation
+from src.deadlock   import DeadlockError
+from src.simulator  import Simulator, GraphMap
+
+from tests.profiler_test import get_simple_mapping_list
+
+
+@dataclass
+class FakeTask:
+    task_id: int
+
+@dataclass
+class FakeMap:
+    task: FakeTask
+    assigned_pe: tuple[int, int]
+
+
+def run_flows(flows: list[tuple[tuple, tuple]], routing: str, num_vcs: int, weight: int = 20) -> int:
+    """Each flow is a pair of tasks, the source sends `weight` packets to the sink."""
+    graph   = nx.DiGraph()
+    pes     = {}
+
+    for i, ( src, dest ) in enumerate(flows):
+        graph.add_node(2 * i,     type="task", processing_time=1)
+        graph.add_node(2 * i + 1, type="task", processing_time=1, generate=1)
+        graph.add_edge(2 * i, 2 * i + 1, weight=weight)
+        pes[2 * i], pes[2 * i + 1] = src, dest
+
+    sim         = Simulator( num_rows=4, num_cols=4, max_cycles=5000, routing=routing,
+                             switching="wormhole", num_vcs=num_vcs )
+    task_list   = sim.graph_to_task( graph )
+    mapping     = [ GraphMap( task_id=task.task_id, assigned_pe=pes[task.task_id] ) for task in task_list ]
+    sim.map( sim.set_assigned_mapping_list( task_list, mapping ) )
+
+    return sim.run()
+
+
+# Random permutation traffic that deadlocks minimal adaptive routing without virtual channels
+PERMUTATION_FLOWS = [ ( (0, 0), (2, 0) ), ( (0, 1), (1, 2) ), ( (0, 2), (2, 1) ), ( (0, 3), (3, 3) ),
+                      ( (1, 0), (1, 3) ), ( (1, 1), (3, 2) ), ( (1, 2), (1, 0) ), ( (1, 3), (2, 2) ),
+                      ( (2, 0), (0, 1) ), ( (2, 1), (0, 3) ), ( (2, 2), (0, 0) ), ( (3, 0), (1, 1) ),
+                      ( (3, 2), (3, 0) ), ( (3, 3), (0, 2) ) ]
+
+
+def test_virtual_channel_buffers():
+    """
+    Router to router ports get one buffer per virtual channel, the local ports only one.
+    """
+    router = Router( pos=(0, 0), switching="wormhole", num_vcs=3 )
+
+    assert len( router._input_buffers )     == 1 + 4 * 3
+    assert len( router._output_buffers )    == 1 + 4 * 3
+
+    assert [ buffer.get_name() for buffer in router._input_vcs[BufferLocation.EAST] ] == \
+           [ "east_input", "east_input_vc1", "east_input_vc2" ]
+    assert len( router._output_vcs[BufferLocation.LOCAL] ) == 1
+
+    with pytest.raises(ValueError):
+        Router( pos=(0, 0), num_vcs=2 ) # Store and forward
+
+
+@pytest.mark.parametrize("num_vcs", [ 1, 2, 4 ])
+def test_simple_latency(num_vcs):
+    """ A single flow does not compete for channels """
+    sim = Simulator( num_rows=3, num_cols=3, max_cycles=100, switching="wormhole", num_vcs=num_vcs )
+    sim.map( get_simple_mapping_list() )
+    assert sim.run() == 25
+
+
+def test_head_of_line_bypass():
+    """
+    The packet in east_input is blocked by a full west output,
+    the packet behind it in the second virtual channel still goes south.
+    """
+    router = Router( pos=(1, 1), switching="wormhole", num_vcs=2 )
+    router.set_mapping_list( [ FakeMap( FakeTask(0), (0, 1) ), FakeMap( FakeTask(1), (1, 0) ) ] )
+
+    west_output = router._output_vcs[BufferLocation.WEST][0]
+    filler      = Packet( source_xy=(2, 1), dest_id=0, source_task_id=2 )
+    for _ in range(4):
+        west_output.add_flit( filler.pop_flit()[1] )
+
+    blocked     = Packet( source_xy=(2, 1), dest_id=0, source_task_id=3 )
+    bypassing   = Packet( source_xy=(2, 1), dest_id=1, source_task_id=4 )
+
+    router._input_vcs[BufferLocation.EAST][0].add_flit( blocked.pop_flit()[1] )
+    router._input_vcs[BufferLocation.EAST][1].add_flit( bypassing.pop_flit()[1] )
+
+    router.process()
+    router.process()
+
+    assert router._input_vcs[BufferLocation.EAST][0].get_occupancy()        == 1
+    assert router._input_vcs[BufferLocation.EAST][1].get_occupancy()        == 0
+    assert router._output_vcs[BufferLocation.SOUTH][0].get_occupancy()      == 1
+
+
+def test_escape_channel_avoids_deadlock():
+    """
+    Minimal adaptive routing deadlocks with one virtual channel.
+    With two, the first one is an XY escape channel.
+    """
+    with pytest.raises(DeadlockError):
+        run_flows( PERMUTATION_FLOWS, routing="adaptive", num_vcs=1 )
+
+    assert run_flows( PERMUTATION_FLOWS, routing="adaptive", num_vcs=2 ) > 0
+    assert run_flows( PERMUTATION_FLOWS, routing="xy",       num_vcs=2 ) > 0